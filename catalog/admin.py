@@ -1,6 +1,10 @@
 from django.contrib import admin
 
+from common.admin import ReferenceAutocompleteMixin, reference_filter
+from common.reference import regions
+
 from .models import Client, Product, Unit
+from .reference import active_clients, active_products
 
 
 @admin.register(Unit)
@@ -10,7 +14,9 @@ class UnitAdmin(admin.ModelAdmin):
 
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
+class ProductAdmin(ReferenceAutocompleteMixin, admin.ModelAdmin):
+    # O autocomplete (pedidos, ofertas) oferece apenas produtos ativos
+    reference_table = active_products
     list_display = ['name', 'is_active', 'created_at']
     list_filter = ['is_active']
     search_fields = ['name']
@@ -43,9 +49,11 @@ class ProductAdmin(admin.ModelAdmin):
 
 
 @admin.register(Client)
-class ClientAdmin(admin.ModelAdmin):
+class ClientAdmin(ReferenceAutocompleteMixin, admin.ModelAdmin):
+    # O autocomplete (pedidos) oferece apenas clientes ativos
+    reference_table = active_clients
     list_display = ['name', 'region', 'is_active', 'created_at']
-    list_filter = ['is_active', 'region']
+    list_filter = ['is_active', ('region', reference_filter(regions))]
     search_fields = ['name']
 
     readonly_fields = ['created_by', 'created_at', 'updated_by', 'updated_at']
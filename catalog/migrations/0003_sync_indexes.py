@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("catalog", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                fields=["updated_at", "id"], name="client_updated_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["updated_at", "id"], name="product_updated_at_id_idx"
+            ),
+        ),
+    ]
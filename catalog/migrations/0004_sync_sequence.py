@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0003_sync_indexes"),
+        ("common", "0003_sync_sequence"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="client",
+            options={
+                "base_manager_name": "objects",
+                "verbose_name": "Cliente",
+                "verbose_name_plural": "Clientes",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="product",
+            options={
+                "base_manager_name": "objects",
+                "verbose_name": "Produto",
+                "verbose_name_plural": "Produtos",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="client",
+            name="client_updated_at_id_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="product",
+            name="product_updated_at_id_idx",
+        ),
+        migrations.AddField(
+            model_name="client",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="client",
+            index=models.Index(
+                fields=["sync_sequence", "id"], name="client_sync_seq_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["sync_sequence", "id"], name="product_sync_seq_id_idx"
+            ),
+        ),
+    ]
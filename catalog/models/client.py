@@ -1,15 +1,15 @@
 from django.db import models
 
-from common.models import Region
+from common.models import Region, SyncedManager, SyncedModel
 from users.models import User
 
 
-class ActiveClientManager(models.Manager):
+class ActiveClientManager(SyncedManager):
     def get_queryset(self):
         return super().get_queryset().filter(is_active=True)
 
 
-class Client(models.Model):
+class Client(SyncedModel):
     name = models.CharField(max_length=199, unique=True)
     region = models.ForeignKey(Region, on_delete=models.SET_NULL, null=True)
     created_by = models.ForeignKey(
@@ -22,12 +22,16 @@ class Client(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
-    objects = models.Manager()
+    objects = SyncedManager()
     active_objects = ActiveClientManager()
 
     def __str__(self):
         return self.name
 
-    class Meta:
+    class Meta(SyncedModel.Meta):
         verbose_name = 'Cliente'
         verbose_name_plural = 'Clientes'
+        indexes = [
+            # Sincronização incremental: (sync_sequence, id)
+            models.Index(fields=['sync_sequence', 'id'], name='client_sync_seq_id_idx'),
+        ]
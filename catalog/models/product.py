@@ -1,9 +1,10 @@
 from django.db import models
 
+from common.models import SyncedManager, SyncedModel
 from users.models import User
 
 
-class ActiveProductManager(models.Manager):
+class ActiveProductManager(SyncedManager):
     def get_queryset(self):
         return super().get_queryset().filter(is_active=True)
 
@@ -20,7 +21,7 @@ class Unit(models.Model):
         verbose_name_plural = 'Unidades'
 
 
-class Product(models.Model):
+class Product(SyncedModel):
     name = models.CharField(max_length=125, null=False)
     unit = models.ForeignKey(Unit, on_delete=models.SET_NULL, null=True)
     production_time = models.IntegerField(null=False, blank=False)
@@ -38,7 +39,7 @@ class Product(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
 
-    objects = models.Manager()
+    objects = SyncedManager()
     active_objects = ActiveProductManager()
 
     def save(self, *args, **kwargs):
@@ -50,6 +51,10 @@ class Product(models.Model):
     def __str__(self):
         return self.name
 
-    class Meta:
+    class Meta(SyncedModel.Meta):
         verbose_name = 'Produto'
         verbose_name_plural = 'Produtos'
+        indexes = [
+            # Sincronização incremental: (sync_sequence, id)
+            models.Index(fields=['sync_sequence', 'id'], name='product_sync_seq_id_idx'),
+        ]
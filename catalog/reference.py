@@ -0,0 +1,14 @@
+"""Tabelas de referência do catálogo em memória (ver common.reference)."""
+
+from common.reference import ReferenceTable
+
+from .models import Client, Product, Unit
+
+units = ReferenceTable('units', lambda: Unit.objects.order_by('name'))
+active_products = ReferenceTable(
+    'active_products',
+    lambda: Product.active_objects.select_related('unit').order_by('name'),
+)
+active_clients = ReferenceTable(
+    'active_clients', lambda: Client.active_objects.order_by('name')
+)
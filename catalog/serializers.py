@@ -0,0 +1,52 @@
+from rest_framework import serializers
+
+from common.serializers import ReferenceField
+
+from .models import Client, Product
+from .reference import units
+
+
+class ClientSummarySerializer(serializers.ModelSerializer):
+    """Representação curta usada em ?expand=client."""
+
+    class Meta:
+        model = Client
+        fields = ['id', 'name']
+        read_only_fields = fields
+
+
+class ProductSummarySerializer(serializers.ModelSerializer):
+    """Representação curta usada em ?expand=product."""
+
+    unit_symbol = ReferenceField(units, 'symbol', source='unit_id')
+
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'unit_symbol']
+        read_only_fields = fields
+
+
+class ProductSerializer(serializers.ModelSerializer):
+    unit_symbol = ReferenceField(units, 'symbol', source='unit_id')
+
+    class Meta:
+        model = Product
+        fields = [
+            'id',
+            'name',
+            'unit',
+            'unit_symbol',
+            'production_time',
+            'default_purchase_value',
+            'shelf_life',
+            'is_active',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class ClientSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Client
+        fields = ['id', 'name', 'region', 'is_active', 'updated_at']
+        read_only_fields = fields
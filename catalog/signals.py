@@ -0,0 +1,10 @@
+from common.generations import track_generations
+
+from .models import Client, Product, Unit
+from .reference import active_clients, active_products, units
+
+units.connect(Unit)
+# O nome e o símbolo da unidade aparecem nos produtos carregados
+active_products.connect(Product, Unit)
+active_clients.connect(Client)
+track_generations(Unit, Product, Client)
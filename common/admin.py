@@ -1,6 +1,37 @@
 from django.contrib import admin
+from django.urls import reverse
 
 from .models import Macroregion, MacroregionAffinity, Region
+from .reference import macroregions
+
+
+class ReferenceListFilter(admin.RelatedFieldListFilter):
+    """Filtro lateral por chave estrangeira com as opções vindas da memória."""
+
+    table = None
+
+    def field_choices(self, field, request, model_admin):
+        return [(row.pk, str(row)) for row in self.table.all()]
+
+
+def reference_filter(table):
+    """ReferenceListFilter para uma common.reference.ReferenceTable."""
+    return type(f'{table.name.title()}ListFilter', (ReferenceListFilter,), {'table': table})
+
+
+class ReferenceAutocompleteMixin:
+    """Busca do autocomplete do admin feita na tabela de referência em memória.
+
+    A consulta restante só carrega a página de resultados pelos ids encontrados.
+    """
+
+    reference_table = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term and request.path == reverse('admin:autocomplete'):
+            ids = self.reference_table.search(search_term)
+            return queryset.filter(pk__in=ids), False
+        return super().get_search_results(request, queryset, search_term)
 
 
 @admin.register(Macroregion)
@@ -29,7 +60,7 @@ class MacroregionAdmin(admin.ModelAdmin):
 @admin.register(Region)
 class RegionAdmin(admin.ModelAdmin):
     list_display = ['name', 'macroregion']
-    list_filter = ['macroregion']
+    list_filter = [('macroregion', reference_filter(macroregions))]
     search_fields = ['name']
 
 
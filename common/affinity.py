@@ -0,0 +1,115 @@
+"""Matriz de afinidade entre macroregiões mantida em memória.
+
+MacroregionAffinity.value funciona como custo: a própria macroregião vale 1 e valores
+maiores indicam regiões menos próximas. A matriz é montada uma vez por processo e
+descartada quando Macroregion, Region ou MacroregionAffinity mudam (ver signals.py).
+Como nas tabelas de referência (common.reference), a troca é anunciada aos outros
+processos por uma versão no cache compartilhado, conferida uma vez por requisição.
+"""
+
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .models import Macroregion, MacroregionAffinity, Region
+from .request_cache import forget, memoize
+
+SAME_MACROREGION_VALUE = 1
+
+
+class AffinityMatrix:
+    """Matriz densa de afinidades indexada pelo id das macroregiões."""
+
+    def __init__(self, macroregion_ids, affinities, region_macroregions):
+        self.index = {pk: position for position, pk in enumerate(sorted(macroregion_ids))}
+        size = len(self.index)
+        self.values = [[None] * size for _ in range(size)]
+        for position in range(size):
+            self.values[position][position] = SAME_MACROREGION_VALUE
+        for macroregion1_id, macroregion2_id, value in affinities:
+            i = self.index[macroregion1_id]
+            j = self.index[macroregion2_id]
+            self.values[i][j] = self.values[j][i] = value
+        self.region_macroregions = dict(region_macroregions)
+        known = [value for _, _, value in affinities] or [SAME_MACROREGION_VALUE]
+        self.max_value = max(max(known), SAME_MACROREGION_VALUE)
+
+    @classmethod
+    def build(cls):
+        """Monta a matriz com três consultas."""
+        return cls(
+            Macroregion.objects.values_list('pk', flat=True),
+            list(
+                MacroregionAffinity.objects.values_list(
+                    'macroregion1_id', 'macroregion2_id', 'value'
+                )
+            ),
+            Region.objects.values_list('pk', 'macroregion_id'),
+        )
+
+    def value(self, macroregion1_id, macroregion2_id, default=None):
+        """Afinidade entre duas macroregiões, ou default se não cadastrada."""
+        i = self.index.get(macroregion1_id)
+        j = self.index.get(macroregion2_id)
+        if i is None or j is None:
+            return default
+        value = self.values[i][j]
+        return default if value is None else value
+
+    def region_value(self, region1_id, region2_id, default=None):
+        """Afinidade entre as macroregiões de duas regiões."""
+        return self.value(
+            self.region_macroregions.get(region1_id),
+            self.region_macroregions.get(region2_id),
+            default,
+        )
+
+    def region_cost(self, region1_id, region2_id):
+        """Como region_value, mas pares sem cadastro custam mais que qualquer outro."""
+        return self.region_value(region1_id, region2_id, default=self.max_value + 1)
+
+
+CACHE_ALIAS = getattr(settings, 'REFERENCE_CACHE_ALIAS', 'default')
+VERSION_KEY = 'reference:affinity_matrix'
+
+_lock = threading.Lock()
+# (versão compartilhada, matriz)
+_matrix = None
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+def _shared_version():
+    return caches[CACHE_ALIAS].get_or_set(VERSION_KEY, _new_version, None)
+
+
+def get_affinity_matrix():
+    """Retorna a matriz do processo, remontando-a quando a versão compartilhada muda."""
+    global _matrix
+    version = memoize(VERSION_KEY, _shared_version)
+    loaded = _matrix
+    if loaded is None or loaded[0] != version:
+        with _lock:
+            loaded = _matrix
+            if loaded is None or loaded[0] != version:
+                loaded = _matrix = (version, AffinityMatrix.build())
+    return loaded[1]
+
+
+def invalidate_affinity_matrix(**kwargs):
+    """Descarta a matriz e troca a versão compartilhada no commit.
+
+    A próxima chamada a get_affinity_matrix(), neste ou em outro processo, a reconstrói.
+    """
+    global _matrix
+    with _lock:
+        _matrix = None
+    forget(VERSION_KEY)
+    transaction.on_commit(
+        lambda: caches[CACHE_ALIAS].set(VERSION_KEY, _new_version(), None)
+    )
@@ -0,0 +1,152 @@
+"""Execução das sub-requisições do endpoint de lote (common.views.BatchView).
+
+Cada sub-requisição vira um HttpRequest montado a partir da requisição original e é
+entregue diretamente à view resolvida pela URL, sem nova autenticação (o usuário já
+foi autenticado na requisição do lote) e sem passar de novo pelos middlewares.
+"""
+
+import asyncio
+import io
+import json
+import logging
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.db import transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+
+from .request_cache import request_cache
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/api/'
+MAX_REQUESTS = 20
+# Cabeçalhos repassados da sub-requisição e devolvidos na resposta
+FORWARDED_HEADERS = ('If-None-Match', 'If-Modified-Since')
+RETURNED_HEADERS = ('ETag', 'Last-Modified', 'Location', 'Content-Type')
+
+
+class BatchAbortedError(Exception):
+    pass
+
+
+async def _await(coroutine):
+    return await coroutine
+
+
+def _error(status, detail):
+    return {'status': status, 'headers': {}, 'body': {'detail': detail}}
+
+
+def build_request(parent, method, path, body=None, headers=None):
+    """HttpRequest da sub-requisição, com o usuário e a sessão da requisição original."""
+    url = urlsplit(path)
+    request = HttpRequest()
+    request.method = method
+    request.path = request.path_info = url.path
+    request.META = {
+        key: value
+        for key, value in parent.META.items()
+        if key.startswith(('HTTP_', 'SERVER_', 'REMOTE_')) or key == 'wsgi.url_scheme'
+    }
+    request.META.update(
+        REQUEST_METHOD=method,
+        PATH_INFO=url.path,
+        QUERY_STRING=url.query,
+        CONTENT_LENGTH='0',
+    )
+    # Cabeçalhos condicionais da requisição do lote não valem para as sub-requisições
+    request.META.pop('HTTP_IF_NONE_MATCH', None)
+    request.META.pop('HTTP_IF_MODIFIED_SINCE', None)
+    for name, value in (headers or {}).items():
+        if name in FORWARDED_HEADERS:
+            request.META['HTTP_' + name.upper().replace('-', '_')] = value
+    request.GET = QueryDict(url.query)
+    if body is not None:
+        data = json.dumps(body).encode()
+        request.META['CONTENT_TYPE'] = 'application/json'
+        request.META['CONTENT_LENGTH'] = str(len(data))
+        request._stream = io.BytesIO(data)
+    request._read_started = False
+    request.user = parent.user
+
+    async def auser():
+        return parent.user
+
+    request.auser = auser
+    if hasattr(parent, 'session'):
+        request.session = parent.session
+    # O DRF usa este usuário em vez de autenticar de novo (sem CSRF nem senha)
+    request._force_auth_user = parent.user
+    return request
+
+
+def run_request(parent, item, exclude_view=None):
+    """Executa uma sub-requisição e retorna {'status', 'headers', 'body'}."""
+    path = item['path']
+    if not path.startswith(API_PREFIX):
+        return _error(400, f'Apenas caminhos sob {API_PREFIX} são aceitos.')
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return _error(404, 'Não encontrado.')
+    if exclude_view is not None and getattr(match.func, 'view_class', None) is exclude_view:
+        return _error(400, 'Lotes não podem ser aninhados.')
+
+    request = build_request(
+        parent, item['method'], path, item.get('body'), item.get('headers')
+    )
+    request.resolver_match = match
+    response = match.func(request, *match.args, **match.kwargs)
+    if asyncio.iscoroutine(response):
+        # Views assíncronas (common.views.AsyncAPIView)
+        response = async_to_sync(_await)(response)
+    if getattr(response, 'streaming', False):
+        return _error(400, 'Respostas em streaming não são suportadas no lote.')
+    if hasattr(response, 'render'):
+        response.render()
+
+    content = response.content.decode()
+    if response.get('Content-Type', '').startswith('application/json') and content:
+        content = json.loads(content)
+    return {
+        'status': response.status_code,
+        'headers': {name: response[name] for name in RETURNED_HEADERS if name in response},
+        'body': content,
+    }
+
+
+def run_batch(parent, items, atomic=False, exclude_view=None):
+    """Executa as sub-requisições em ordem, no mesmo escopo de cache.
+
+    Com atomic, tudo roda em uma transação: a primeira resposta com erro (4xx/5xx)
+    desfaz as anteriores, e as seguintes não são executadas (424).
+    """
+    results = []
+    with request_cache():
+        if not atomic:
+            for item in items:
+                try:
+                    results.append(run_request(parent, item, exclude_view))
+                except Exception:
+                    logger.exception(
+                        'Erro na sub-requisição %s %s', item['method'], item['path']
+                    )
+                    results.append(_error(500, 'Erro interno.'))
+            return results
+
+        try:
+            with transaction.atomic():
+                for item in items:
+                    result = run_request(parent, item, exclude_view)
+                    results.append(result)
+                    if result['status'] >= 400:
+                        raise BatchAbortedError
+        except BatchAbortedError:
+            skipped = len(items) - len(results)
+            results.extend(
+                _error(424, 'Não executada: uma requisição anterior do lote falhou.')
+                for _ in range(skipped)
+            )
+    return results
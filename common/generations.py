@@ -0,0 +1,83 @@
+"""Contadores de geração por modelo, usados pelo cache de respostas da API.
+
+Cada modelo tem uma geração no cache compartilhado entre os processos
+(settings.GENERATION_CACHE_ALIAS): um valor aleatório trocado sempre que alguma
+linha do modelo muda. Uma resposta guardada leva na chave as gerações dos modelos
+de que depende (common.mixins.ResponseCacheMixin); quando uma delas muda, a chave
+muda junto e a entrada antiga simplesmente deixa de ser lida, sem precisar saber
+quais chaves apagar.
+
+post_save/post_delete trocam a geração (track_generations). Escritas em lote
+(bulk_create, queryset.update) não disparam sinais; chame bump().
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+CACHE_ALIAS = getattr(settings, 'GENERATION_CACHE_ALIAS', 'default')
+
+
+def _new_generation():
+    return uuid.uuid4().hex
+
+
+def generation_key(model):
+    return f'generation:{model._meta.label_lower}'
+
+
+def get_generations(models):
+    """Gerações atuais de `models`, na mesma ordem, com uma leitura do cache."""
+    cache = caches[CACHE_ALIAS]
+    keys = [generation_key(model) for model in models]
+    current = cache.get_many(keys)
+    missing = {key: _new_generation() for key in keys if key not in current}
+    if missing:
+        # Dois processos podem iniciar a mesma geração ao mesmo tempo: no pior caso,
+        # uma resposta guardada com o valor perdido não é lida
+        cache.set_many(missing, None)
+        current.update(missing)
+    return [current[key] for key in keys]
+
+
+def bump(*models):
+    """Troca a geração dos modelos agora e de novo no commit da transação atual.
+
+    Agora, para que a própria transação não leia respostas anteriores à escrita; no
+    commit, porque antes dele outro processo pode ter guardado a resposta antiga
+    sob a geração nova.
+    """
+    keys = [generation_key(model) for model in models]
+
+    def set_new():
+        caches[CACHE_ALIAS].set_many({key: _new_generation() for key in keys}, None)
+
+    set_new()
+    transaction.on_commit(set_new)
+
+
+def track_generations(*models, ignore_fields=()):
+    """Troca a geração dos modelos a cada save/delete.
+
+    Saves com update_fields contido em `ignore_fields` (last_login do usuário, por
+    exemplo) não mudam o que a API mostra e são ignorados.
+    """
+    ignore_fields = set(ignore_fields)
+
+    def changed(sender, update_fields=None, **kwargs):
+        if ignore_fields and update_fields is not None:
+            if set(update_fields) <= ignore_fields:
+                return
+        bump(sender)
+
+    for model in models:
+        for signal, action in ((post_save, 'save'), (post_delete, 'delete')):
+            signal.connect(
+                changed,
+                sender=model,
+                weak=False,
+                dispatch_uid=f'generation_{action}_{model._meta.label_lower}',
+            )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from common.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Apaga os registros de remoção antigos da sincronização incremental
+    """
+
+    help = 'Apaga as remoções mais antigas que o prazo de retenção da sincronização.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Prazo de retenção em dias (padrão: SYNC_TOMBSTONE_RETENTION_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        count = prune_tombstones(days=options.get('days'))
+        self.stdout.write(f'{count} remoções apagadas.')
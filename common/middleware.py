@@ -0,0 +1,26 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .request_cache import request_cache
+
+
+class RequestCacheMiddleware:
+    """Abre o escopo do cache por requisição (ver common.request_cache)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Sob ASGI, não obriga as views assíncronas a passarem por uma thread
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_cache():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with request_cache():
+            return await self.get_response(request)
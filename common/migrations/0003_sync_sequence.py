@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:00
+
+from django.db import migrations, models
+
+
+def create_counter(apps, schema_editor):
+    SyncSequence = apps.get_model("common", "SyncSequence")
+    SyncSequence.objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("common", "0002_sync_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("value", models.PositiveBigIntegerField(default=0)),
+                ("pruned_sequence", models.PositiveBigIntegerField(default=0)),
+                ("pruned_id", models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "Sequência de sincronização",
+                "verbose_name_plural": "Sequência de sincronização",
+            },
+        ),
+        migrations.RunPython(create_counter, migrations.RunPython.noop),
+        migrations.AlterModelOptions(
+            name="region",
+            options={
+                "base_manager_name": "objects",
+                "verbose_name": "Região",
+                "verbose_name_plural": "Regiões",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="region",
+            name="region_updated_at_id_idx",
+        ),
+        migrations.AddField(
+            model_name="region",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="tombstone",
+            name="sequence",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="region",
+            index=models.Index(
+                fields=["sync_sequence", "id"], name="region_sync_seq_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["sequence", "id"], name="tombstone_sequence_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(fields=["deleted_at"], name="tombstone_deleted_at_idx"),
+        ),
+    ]
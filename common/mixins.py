@@ -0,0 +1,264 @@
+"""Mixins compartilhados pelas views da API."""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag, urlencode
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from .generations import get_generations
+
+RESPONSE_CACHE_ALIAS = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+RESPONSE_CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+
+
+class QueryParamFilterMixin:
+    """Filtros simples por igualdade: ?status=OPEN&product=3.
+
+    Cada valor é convertido pelo campo do modelo no fim do lookup; valores inválidos
+    (?product=abc, ?status=XYZ) respondem 400 em vez de chegar ao filter().
+    """
+
+    filter_params = {}
+
+    def _filter_field(self, model, lookup):
+        *path, name = lookup.split('__')
+        for part in path:
+            model = model._meta.get_field(part).related_model
+        return model._meta.get_field(name)
+
+    def _filter_value(self, model, param, lookup, value):
+        field = self._filter_field(model, lookup)
+        try:
+            value = field.to_python(value)
+            if field.choices and not field.is_relation:
+                field.validate(value, None)
+        except DjangoValidationError as exc:
+            raise ValidationError({param: exc.messages}) from None
+        return value
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        for param, lookup in self.filter_params.items():
+            value = self.request.query_params.get(param)
+            if value:
+                value = self._filter_value(queryset.model, param, lookup, value)
+                queryset = queryset.filter(**{lookup: value})
+        return queryset
+
+
+class CooperatedScopeMixin:
+    """Administradores veem tudo; cooperados apenas as próprias linhas."""
+
+    cooperated_lookup = None
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_admin or user.is_superuser:
+            return queryset
+        return self.scope_queryset(queryset, user)
+
+    def scope_queryset(self, queryset, user):
+        return queryset.filter(**{self.cooperated_lookup: user})
+
+
+class SparseFieldsMixin:
+    """?fields=id,quantity e ?expand=product: menos campos na resposta e no SELECT.
+
+    O serializer precisa de common.serializers.SparseFieldsSerializerMixin. O
+    queryset passa a carregar com only() apenas as colunas dos campos pedidos e a
+    fazer select_related apenas das relações que eles usam.
+    """
+
+    fields_query_param = 'fields'
+    expand_query_param = 'expand'
+
+    def _param_set(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return {item.strip() for item in value.split(',') if item.strip()}
+
+    @property
+    def sparse_fields(self):
+        return self._param_set(self.fields_query_param)
+
+    @property
+    def expanded_fields(self):
+        return self._param_set(self.expand_query_param) or set()
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.sparse_fields)
+        kwargs.setdefault('expand', self.expanded_fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        related, columns = self.get_serializer_class().query_plan(
+            queryset.model,
+            fields=self.sparse_fields,
+            expand=self.expanded_fields,
+            annotations=queryset.query.annotations,
+        )
+        if columns is None:
+            return queryset
+        # Colunas lidas pela própria view: validador de cache e cursor da paginação
+        for name in (
+            getattr(self, 'updated_field', None),
+            getattr(self.paginator, 'field_name', None),
+        ):
+            if name:
+                columns.add(name)
+        # select_related() sem argumentos seguiria todas as FKs
+        queryset = queryset.select_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.only(*columns)
+
+
+class ConditionalGetMixin:
+    """ETag e Last-Modified a partir de updated_at em list e retrieve.
+
+    Na listagem, o validador vem de um único MAX(updated_at), COUNT(*) sobre o
+    queryset filtrado; se o cliente já tem a versão atual, a resposta é 304 sem
+    carregar nem serializar as linhas. O ETag inclui a URL (filtros e cursor), o
+    usuário, pois o escopo dos dados depende dele, e as gerações
+    (common.generations) dos modelos em `validator_models`: os serializers embutem
+    nomes de cliente, produto e cooperado, que mudam sem tocar o updated_at da linha.
+    Com esses modelos, If-Modified-Since sozinho não gera 304; só o ETag.
+    """
+
+    updated_field = 'updated_at'
+    # None = os cache_models de ResponseCacheMixin, se houver
+    validator_models = None
+
+    def get_validator_models(self):
+        if self.validator_models is not None:
+            return self.validator_models
+        return getattr(self, 'cache_models', ())
+
+    def _validators(self, request, last_modified, *parts):
+        key = '|'.join(
+            str(part)
+            for part in (
+                request.get_full_path(),
+                request.user.pk,
+                last_modified.isoformat() if last_modified else '',
+                *parts,
+                *get_generations(self.get_validator_models()),
+            )
+        )
+        etag = quote_etag(hashlib.sha1(key.encode()).hexdigest())
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return etag, timestamp
+
+    def _conditional_response(self, request, etag, timestamp):
+        # Last-Modified não acompanha os modelos relacionados: vale só o ETag
+        if self.get_validator_models():
+            timestamp = None
+        return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    def _with_validators(self, response, etag, timestamp):
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            # O cliente pode guardar a resposta, mas deve revalidar a cada uso
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        state = queryset.order_by().aggregate(
+            last_modified=Max(self.updated_field), count=Count('pk')
+        )
+        etag, timestamp = self._validators(request, state['last_modified'], state['count'])
+        response = self._conditional_response(request, etag, timestamp)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return self._with_validators(response, etag, timestamp)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag, timestamp = self._validators(request, getattr(instance, self.updated_field))
+        response = self._conditional_response(request, etag, timestamp)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        return self._with_validators(response, etag, timestamp)
+
+
+class ResponseCacheMixin:
+    """Cache das respostas de list e retrieve, invalidado por geração de modelo.
+
+    A chave junta a URL, os parâmetros da query em ordem, o escopo do usuário e as
+    gerações (common.generations) dos modelos em `cache_models`. Enquanto nenhuma
+    geração muda, a resposta sai do cache sem consultar o banco, inclusive o 304
+    quando o cliente manda o ETag guardado. Deve vir antes de ConditionalGetMixin
+    nas bases, para guardar também os validadores.
+
+    `cache_models` precisa listar todos os modelos cujos dados aparecem na resposta.
+    """
+
+    cache_models = ()
+    cache_timeout = RESPONSE_CACHE_TIMEOUT
+    cached_headers = ('ETag', 'Last-Modified', 'Cache-Control')
+
+    def get_cache_scope(self, request):
+        # Administradores veem as mesmas linhas; cooperados, cada um as suas
+        user = request.user
+        if user.is_admin or user.is_superuser:
+            return 'admin'
+        return f'user:{user.pk}'
+
+    def _response_cache_key(self, request):
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        parts = (
+            request.build_absolute_uri(request.path),
+            query,
+            self.get_cache_scope(request),
+            *get_generations(self.cache_models),
+        )
+        digest = hashlib.sha1('|'.join(parts).encode()).hexdigest()
+        return f'response:{digest}'
+
+    def _cached_response(self, request, action, *args, **kwargs):
+        cache = caches[RESPONSE_CACHE_ALIAS]
+        key = self._response_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            response = action(request, *args, **kwargs)
+            if response.status_code == 200:
+                headers = {
+                    name: response[name]
+                    for name in self.cached_headers
+                    if response.has_header(name)
+                }
+                cache.set(key, (response.data, headers), self.cache_timeout)
+            return response
+
+        data, headers = entry
+        last_modified = parse_http_date_safe(headers.get('Last-Modified'))
+        get_validator_models = getattr(self, 'get_validator_models', None)
+        if get_validator_models and get_validator_models():
+            # Como em ConditionalGetMixin: com modelos relacionados, só o ETag vale
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=headers.get('ETag'), last_modified=last_modified
+        )
+        if response is None:
+            response = Response(data)
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(request, super().retrieve, *args, **kwargs)
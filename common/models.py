@@ -1,4 +1,112 @@
-from django.db import models
+from functools import partial
+
+from django.db import models, router, transaction
+from django.db.transaction import TransactionManagementError
+from django.utils import timezone
+
+
+class SyncSequence(models.Model):
+    """Contador da sincronização incremental (common.sync), em uma única linha.
+
+    Cada transação que grava um modelo sincronizado soma um ao contador e grava o
+    número nas linhas (SyncedModel.sync_sequence) e nos Tombstones. O UPDATE mantém
+    a linha bloqueada até o fim da transação, então a seguinte só recebe o próximo
+    número depois do commit da anterior: a ordem dos números é a ordem dos commits.
+    """
+
+    value = models.PositiveBigIntegerField(default=0)
+    # Maior (sequence, id) entre os Tombstones já apagados pela retenção
+    pruned_sequence = models.PositiveBigIntegerField(default=0)
+    pruned_id = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Sequência de sincronização'
+        verbose_name_plural = 'Sequência de sincronização'
+
+    @classmethod
+    def current(cls, using=None):
+        """Número da transação em curso; o primeiro pedido da transação incrementa."""
+        using = using or router.db_for_write(cls)
+        connection = transaction.get_connection(using)
+        if not connection.in_atomic_block:
+            raise TransactionManagementError(
+                'SyncSequence.current() precisa de uma transação.'
+            )
+        # O callback registrado com o número sai da fila no commit, no rollback e no
+        # rollback do savepoint em que o número foi obtido
+        cached = getattr(connection, 'sync_sequence', None)
+        if cached is not None:
+            marker, value = cached
+            if any(func is marker for _, func, _ in connection.run_on_commit):
+                return value
+
+        counter = cls.objects.using(using).filter(pk=1)
+        if counter.update(value=models.F('value') + 1):
+            value = counter.values_list('value', flat=True).get()
+        else:
+            # Tabela vazia (banco recém-esvaziado, como no flush dos testes)
+            value = cls.objects.using(using).create(pk=1, value=1).value
+        marker = partial(setattr, connection, 'sync_sequence', None)
+        transaction.on_commit(marker, using=using)
+        connection.sync_sequence = (marker, value)
+        return value
+
+
+class SyncedQuerySet(models.QuerySet):
+    """Escritas em massa que gravam o número da transação em sync_sequence."""
+
+    def update(self, **kwargs):
+        with transaction.atomic(using=self.db, savepoint=False):
+            kwargs.setdefault('sync_sequence', SyncSequence.current(self.db))
+            return super().update(**kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if kwargs.get('update_fields'):
+            kwargs['update_fields'] = [*kwargs['update_fields'], 'sync_sequence']
+        with transaction.atomic(using=self.db, savepoint=False):
+            sequence = SyncSequence.current(self.db)
+            for obj in objs:
+                obj.sync_sequence = sequence
+            return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db, savepoint=False):
+            sequence = SyncSequence.current(self.db)
+            for obj in objs:
+                obj.sync_sequence = sequence
+            return super().bulk_update(objs, [*fields, 'sync_sequence'], *args, **kwargs)
+
+
+class SyncedManager(models.Manager.from_queryset(SyncedQuerySet)):
+    pass
+
+
+class SyncedModel(models.Model):
+    """Base dos modelos entregues pela sincronização incremental (common.sync).
+
+    save(), update(), bulk_create() e bulk_update() gravam em sync_sequence o número
+    da transação (SyncSequence). Querysets próprios devem herdar de SyncedQuerySet, e
+    o Meta dos modelos, de SyncedModel.Meta: o gerenciador base também é usado nos
+    UPDATEs de on_delete=SET_NULL.
+    """
+
+    sync_sequence = models.PositiveBigIntegerField(default=0, editable=False)
+
+    objects = SyncedManager()
+
+    class Meta:
+        abstract = True
+        base_manager_name = 'objects'
+
+    def save(self, *args, using=None, update_fields=None, **kwargs):
+        using = using or router.db_for_write(self.__class__, instance=self)
+        if update_fields:
+            update_fields = [*update_fields, 'sync_sequence']
+        with transaction.atomic(using=using, savepoint=False):
+            self.sync_sequence = SyncSequence.current(using)
+            super().save(*args, using=using, update_fields=update_fields, **kwargs)
 
 
 class Macroregion(models.Model):
@@ -12,18 +120,23 @@ class Macroregion(models.Model):
         verbose_name_plural = 'Macroregiões'
 
 
-class Region(models.Model):
+class Region(SyncedModel):
     name = models.CharField(max_length=100, unique=True, null=False)
     macroregion = models.ForeignKey(
         Macroregion, on_delete=models.SET_NULL, null=True, related_name='regions'
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
-    class Meta:
+    class Meta(SyncedModel.Meta):
         verbose_name = 'Região'
         verbose_name_plural = 'Regiões'
+        indexes = [
+            # Sincronização incremental: (sync_sequence, id)
+            models.Index(fields=['sync_sequence', 'id'], name='region_sync_seq_id_idx'),
+        ]
 
 
 class MacroregionAffinity(models.Model):
@@ -56,3 +169,28 @@ class MacroregionAffinity(models.Model):
 
     def __str__(self):
         return f'{self.name} -{self.value}'
+
+
+class Tombstone(models.Model):
+    """Registro de uma linha removida, para a sincronização incremental (common.sync).
+
+    `sequence` é o número da transação que removeu a linha (SyncSequence); o cliente
+    guarda o último (sequence, id) recebido. Apagados depois de
+    SYNC_TOMBSTONE_RETENTION_DAYS por common.sync.prune_tombstones.
+    """
+
+    model = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    sequence = models.PositiveBigIntegerField(default=0)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Remoção'
+        verbose_name_plural = 'Remoções'
+        indexes = [
+            models.Index(fields=['sequence', 'id'], name='tombstone_sequence_id_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.model}#{self.object_id}'
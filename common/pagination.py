@@ -0,0 +1,155 @@
+"""Paginação por cursor (keyset) para as listagens da API.
+
+O cursor guarda o último par (campo de ordenação, id) entregue; a próxima página é
+filtrada por (campo, id) > cursor usando o índice composto correspondente, então a
+página 1000 custa o mesmo que a primeira. Ao contrário da CursorPagination do DRF,
+empates no campo de ordenação (vários pedidos na mesma data) não viram OFFSET.
+"""
+
+import base64
+import json
+from collections import OrderedDict
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginação por (ordering, id); subclasses definem `ordering`."""
+
+    # Campo de ordenação; '-' para ordem decrescente. O desempate é sempre por id
+    ordering = '-created_at'
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    invalid_cursor_message = 'Cursor inválido.'
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 50
+        value = request.query_params.get(self.page_size_query_param)
+        if value:
+            try:
+                page_size = int(value)
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    @property
+    def field_name(self):
+        return self.ordering.lstrip('-')
+
+    @property
+    def descending(self):
+        return self.ordering.startswith('-')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            field = model._meta.get_field(self.field_name)
+            return field.to_python(data['v']), int(data['id']), bool(data.get('r'))
+        except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message) from None
+
+    def encode_cursor(self, instance, reverse):
+        value = getattr(instance, self.field_name)
+        data = {'v': value.isoformat(), 'id': instance.pk, 'r': int(reverse)}
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+    def _after(self, value, pk, forward):
+        # (campo, id) depois do cursor no sentido da leitura. O primeiro termo limita
+        # o intervalo do índice; o OR resolve o desempate por id.
+        if forward != self.descending:
+            bound, strict, tie = 'gte', 'gt', 'pk__gt'
+        else:
+            bound, strict, tie = 'lte', 'lt', 'pk__lt'
+        field = self.field_name
+        return Q(**{f'{field}__{bound}': value}) & (
+            Q(**{f'{field}__{strict}': value}) | Q(**{field: value, tie: pk})
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request, queryset.model)
+        reverse = bool(cursor and cursor[2])
+
+        forward_order = [self.ordering, '-pk' if self.descending else 'pk']
+        if reverse:
+            order = [f[1:] if f.startswith('-') else f'-{f}' for f in forward_order]
+        else:
+            order = forward_order
+        queryset = queryset.order_by(*order)
+        if cursor:
+            queryset = queryset.filter(self._after(cursor[0], cursor[1], not reverse))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        self.page = rows
+        if reverse:
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[-1], False)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.page[0], True)
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ('next', self.get_next_link()),
+                    ('previous', self.get_previous_link()),
+                    ('results', data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class CreatedAtKeysetPagination(KeysetPagination):
+    """Mais recentes primeiro: (created_at, id) decrescente."""
+
+    ordering = '-created_at'
+
+
+class DeliveryDateKeysetPagination(KeysetPagination):
+    """Entregas mais próximas primeiro: (delivery_date, id) crescente."""
+
+    ordering = 'delivery_date'
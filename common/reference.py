@@ -0,0 +1,123 @@
+"""Cache em memória das tabelas de referência (regiões, unidades, produtos ativos...).
+
+Tabelas pequenas, que mudam raramente e são lidas em quase toda operação, ficam
+carregadas no processo e indexadas por id e por nome. Cada tabela tem uma versão
+no cache compartilhado entre os processos (settings.REFERENCE_CACHE_ALIAS):
+post_save/post_delete descartam a cópia local na hora e trocam a versão depois do
+commit, e os outros processos recarregam a tabela na primeira leitura seguinte.
+Dentro de uma requisição (common.request_cache) a versão é conferida uma vez só.
+
+As instâncias são compartilhadas entre threads e requisições: não as altere.
+Escritas em lote (queryset.update) não disparam sinais; chame invalidate().
+"""
+
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from .models import Macroregion, Region
+from .request_cache import forget, memoize
+
+CACHE_ALIAS = getattr(settings, 'REFERENCE_CACHE_ALIAS', 'default')
+
+
+def _new_version():
+    return uuid.uuid4().hex
+
+
+class ReferenceTable:
+    """Uma tabela de referência: get_queryset() define as linhas carregadas."""
+
+    def __init__(self, name, get_queryset, name_field='name'):
+        self.name = name
+        self.get_queryset = get_queryset
+        self.name_field = name_field
+        self.version_key = f'reference:{name}'
+        self._lock = threading.Lock()
+        # (versão, {id: instância}, {nome: instância})
+        self._loaded = None
+
+    def __deepcopy__(self, memo):
+        # Uma instância por tabela (os campos do DRF copiam seus argumentos)
+        return self
+
+    def _shared_version(self):
+        return caches[CACHE_ALIAS].get_or_set(self.version_key, _new_version, None)
+
+    def _tables(self):
+        version = memoize(self.version_key, self._shared_version)
+        loaded = self._loaded
+        if loaded is None or loaded[0] != version:
+            with self._lock:
+                loaded = self._loaded
+                if loaded is None or loaded[0] != version:
+                    # A versão foi lida antes das linhas: uma troca durante a carga
+                    # só faz a próxima leitura recarregar de novo
+                    rows = list(self.get_queryset())
+                    loaded = (
+                        version,
+                        {row.pk: row for row in rows},
+                        {getattr(row, self.name_field): row for row in rows},
+                    )
+                    self._loaded = loaded
+        return loaded
+
+    def get(self, pk, default=None):
+        """Instância pelo id, ou default."""
+        return self._tables()[1].get(pk, default)
+
+    def get_by_name(self, name, default=None):
+        """Instância pelo nome exato, ou default."""
+        return self._tables()[2].get(name, default)
+
+    def in_bulk(self, ids):
+        """Como QuerySet.in_bulk(ids): {id: instância} apenas para os ids existentes."""
+        if not ids:
+            return {}
+        by_id = self._tables()[1]
+        return {pk: by_id[pk] for pk in ids if pk in by_id}
+
+    def all(self):
+        """Todas as instâncias, na ordem de get_queryset()."""
+        return list(self._tables()[1].values())
+
+    def search(self, term):
+        """Ids cujo nome contém `term`, sem diferenciar maiúsculas."""
+        term = term.casefold()
+        return [
+            pk
+            for pk, row in self._tables()[1].items()
+            if term in str(getattr(row, self.name_field)).casefold()
+        ]
+
+    def invalidate(self, **kwargs):
+        """Descarta a cópia deste processo e troca a versão compartilhada no commit.
+
+        Assinatura compatível com os receptores de post_save/post_delete.
+        """
+        self._loaded = None
+        forget(self.version_key)
+        transaction.on_commit(
+            lambda: caches[CACHE_ALIAS].set(self.version_key, _new_version(), None)
+        )
+
+    def connect(self, *models):
+        """Invalida a tabela quando qualquer um dos modelos muda."""
+        for model in models:
+            for signal, action in ((post_save, 'save'), (post_delete, 'delete')):
+                signal.connect(
+                    self.invalidate,
+                    sender=model,
+                    weak=False,
+                    dispatch_uid=f'reference_{self.name}_{action}_{model.__name__}',
+                )
+
+
+macroregions = ReferenceTable('macroregions', lambda: Macroregion.objects.order_by('name'))
+regions = ReferenceTable(
+    'regions', lambda: Region.objects.select_related('macroregion').order_by('name')
+)
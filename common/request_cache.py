@@ -0,0 +1,60 @@
+"""Cache de consultas com escopo de requisição, guardado em um ContextVar.
+
+RequestCacheMiddleware abre um escopo por requisição; o endpoint de lote
+(common.views.BatchView) executa todas as sub-requisições no mesmo escopo, então
+produtos e cooperados buscados por uma sub-requisição são reaproveitados pelas
+seguintes. Fora de um escopo (comandos, worker) nada é guardado.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_store = ContextVar('request_cache', default=None)
+
+
+@contextmanager
+def request_cache():
+    """Abre um escopo de cache; dentro de um escopo existente, reaproveita-o."""
+    if _store.get() is not None:
+        yield
+        return
+    token = _store.set({})
+    try:
+        yield
+    finally:
+        _store.reset(token)
+
+
+def cached_in_bulk(manager, ids):
+    """Como manager.in_bulk(ids), consultando apenas os ids ainda não vistos no escopo.
+
+    Ids inexistentes também são lembrados, para não serem buscados de novo.
+    """
+    ids = set(ids)
+    store = _store.get()
+    if store is None:
+        return manager.in_bulk(ids)
+    cache = store.setdefault((manager.model._meta.label_lower, manager.name), {})
+    missing = ids - cache.keys()
+    if missing:
+        found = manager.in_bulk(missing)
+        for pk in missing:
+            cache[pk] = found.get(pk)
+    return {pk: cache[pk] for pk in ids if cache[pk] is not None}
+
+
+def memoize(key, compute):
+    """compute() uma vez por escopo; fora de um escopo, a cada chamada."""
+    store = _store.get()
+    if store is None:
+        return compute()
+    if key not in store:
+        store[key] = compute()
+    return store[key]
+
+
+def forget(key):
+    """Descarta um valor guardado por memoize() no escopo atual."""
+    store = _store.get()
+    if store is not None:
+        store.pop(key, None)
@@ -0,0 +1,143 @@
+"""Campos esparsos (?fields=) e expansão de relações (?expand=) nos serializers.
+
+O serializer remove os campos não pedidos e troca os ids das relações expandidas
+pelo serializer aninhado. query_plan() traduz os campos que restaram nos caminhos
+do ORM necessários, para que a view aplique only() e select_related apenas às
+colunas e relações realmente usadas.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+from .batch import MAX_REQUESTS
+from .models import Region
+
+
+class SparseFieldsSerializerMixin:
+    # {campo: serializer aninhado usado em ?expand=campo}
+    expandable_fields = {}
+    # {campo calculado: caminhos do ORM que ele lê}, para fontes que não são campos
+    # do modelo (métodos, propriedades, SerializerMethodField)
+    field_dependencies = {}
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in expand:
+            if name in self.expandable_fields and name in self.fields:
+                self.fields[name] = self.expandable_fields[name](read_only=True)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def query_plan(cls, model, fields=None, expand=(), annotations=()):
+        """Retorna (select_related, only) para os campos pedidos.
+
+        `only` é None quando algum campo tem fonte desconhecida; nesse caso a view
+        deve carregar as colunas normalmente.
+        """
+        serializer = cls(fields=fields, expand=expand)
+        related = set()
+        columns = set()
+        for field in serializer.fields.values():
+            paths = _field_paths(field, model, serializer.field_dependencies, annotations)
+            if paths is None:
+                return related, None
+            for path in paths:
+                parts = path.split('__')
+                for i in range(1, len(parts) + 1):
+                    columns.add('__'.join(parts[:i]))
+                related.update(
+                    '__'.join(parts[:i])
+                    for i in range(1, len(parts))
+                    if _is_relation(model, parts[:i])
+                )
+        return related, columns
+
+
+def _is_relation(model, parts):
+    for part in parts:
+        field = model._meta.get_field(part)
+        model = field.related_model
+    return field.is_relation
+
+
+def _field_paths(field, model, dependencies, annotations, prefix=''):
+    """Caminhos do ORM lidos por um campo do serializer, ou None se desconhecidos."""
+    if field.field_name in dependencies:
+        return [f'{prefix}{path}' for path in dependencies[field.field_name]]
+    if field.source == '*':
+        return None
+    if not prefix and field.source in annotations:
+        return []
+
+    path = []
+    current = model
+    for attr in field.source_attrs:
+        if current is None:
+            return None
+        try:
+            model_field = current._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None
+        if model_field.is_relation and not (
+            model_field.many_to_one or model_field.one_to_one
+        ):
+            return None
+        path.append(model_field.name)
+        current = model_field.related_model
+
+    if isinstance(field, serializers.BaseSerializer):
+        # Relação expandida: as colunas do serializer aninhado, a partir dela
+        if not hasattr(field, 'fields') or current is None:
+            return None
+        relation = prefix + '__'.join(path)
+        nested_prefix = f'{relation}__'
+        nested_dependencies = getattr(field, 'field_dependencies', {})
+        paths = [relation]
+        for nested in field.fields.values():
+            nested_paths = _field_paths(
+                nested, current, nested_dependencies, (), nested_prefix
+            )
+            if nested_paths is None:
+                return None
+            paths.extend(nested_paths)
+        return paths
+    return [prefix + '__'.join(path)]
+
+
+class ReferenceField(serializers.ReadOnlyField):
+    """Atributo de um registro de referência, resolvido em memória pelo id.
+
+    `source` aponta para a coluna da chave estrangeira (ex.: 'unit_id'), então a
+    consulta não precisa do JOIN; `table` é uma common.reference.ReferenceTable.
+    """
+
+    def __init__(self, table, attribute='name', **kwargs):
+        self.table = table
+        self.attribute = attribute
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        row = self.table.get(value)
+        return None if row is None else getattr(row, self.attribute)
+
+
+class RegionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Region
+        fields = ['id', 'name', 'macroregion', 'updated_at']
+        read_only_fields = fields
+
+
+class SubRequestSerializer(serializers.Serializer):
+    id = serializers.CharField(max_length=100, required=False)
+    method = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'])
+    path = serializers.CharField(max_length=2000)
+    body = serializers.JSONField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False, max_length=MAX_REQUESTS)
+    atomic = serializers.BooleanField(default=False)
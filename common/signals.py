@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+
+from .affinity import invalidate_affinity_matrix
+from .generations import track_generations
+from .models import Macroregion, MacroregionAffinity, Region
+from .reference import macroregions, regions
+
+for model in (Macroregion, Region, MacroregionAffinity):
+    post_save.connect(
+        invalidate_affinity_matrix,
+        sender=model,
+        dispatch_uid=f'affinity_matrix_save_{model.__name__}',
+    )
+    post_delete.connect(
+        invalidate_affinity_matrix,
+        sender=model,
+        dispatch_uid=f'affinity_matrix_delete_{model.__name__}',
+    )
+
+macroregions.connect(Macroregion)
+regions.connect(Region, Macroregion)
+track_generations(Macroregion, Region)
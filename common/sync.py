@@ -0,0 +1,212 @@
+"""Sincronização incremental para clientes offline (aplicativo de campo).
+
+Cada fonte (SyncSource) é lida em ordem de (sync_sequence, id) a partir da marca
+d'água do cliente, usando o índice composto do modelo: uma sincronização sem mudanças
+custa uma consulta vazia por fonte, mais uma para as remoções e uma para a retenção.
+Remoções ficam em Tombstone; linhas desativadas (is_active=False) também vão para a
+lista de remoções.
+
+sync_sequence é o número da transação que gravou a linha (common.models.SyncSequence)
+e os números seguem a ordem dos commits: quando o cliente recebe o número N, nenhuma
+transação com número menor ainda está em andamento. Ao contrário de updated_at, que
+é lido do relógio antes do commit, a marca d'água não pula transações demoradas.
+
+A marca d'água é um texto opaco com o último (sync_sequence, id) entregue de cada
+fonte e o último (sequence, id) dos Tombstones. Os Tombstones são apagados depois de
+SYNC_TOMBSTONE_RETENTION_DAYS (prune_tombstones); uma marca d'água anterior aos
+apagados recebe 'reset': a sincronização recomeça do início e o cliente descarta os
+dados locais.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from .models import SyncSequence, Tombstone
+
+DEFAULT_LIMIT = 200
+MAX_LIMIT = 1000
+
+
+class InvalidWatermarkError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class SyncSource:
+    name: str
+    model: type
+    serializer_class: type
+    # Queryset base (select_related/anotações); padrão: todas as linhas
+    get_queryset: object = None
+    # Restrição para usuários que não são administradores; None = tudo visível
+    scope: object = None
+    admin_only: bool = False
+    # Campo booleano cujas linhas falsas são entregues como remoção
+    active_field: str = None
+
+    @property
+    def label(self):
+        return self.model._meta.label_lower
+
+    def visible_to(self, user):
+        return not self.admin_only or _is_admin(user)
+
+    def queryset(self, user):
+        if self.get_queryset is not None:
+            queryset = self.get_queryset()
+        else:
+            queryset = self.model._default_manager.all()
+        if self.scope is not None and not _is_admin(user):
+            queryset = self.scope(queryset, user)
+        return queryset
+
+
+def _is_admin(user):
+    return user.is_admin or user.is_superuser
+
+
+def _record_deletion(sender, instance, using, **kwargs):
+    Tombstone.objects.using(using).create(
+        model=sender._meta.label_lower,
+        object_id=instance.pk,
+        sequence=SyncSequence.current(using),
+    )
+
+
+def track_deletions(*models):
+    """Passa a registrar um Tombstone a cada remoção das instâncias dos modelos."""
+    for model in models:
+        post_delete.connect(
+            _record_deletion,
+            sender=model,
+            dispatch_uid=f'tombstone_{model._meta.label_lower}',
+        )
+
+
+def encode_watermark(state):
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def decode_watermark(value):
+    if not value:
+        return {'c': {}, 's': (0, 0)}
+    try:
+        state = json.loads(base64.urlsafe_b64decode(value.encode()).decode())
+        cursors = {
+            name: (int(sequence), int(pk)) for name, (sequence, pk) in state['c'].items()
+        }
+        sequence, pk = state['s']
+        return {'c': cursors, 's': (int(sequence), int(pk))}
+    except (ValueError, KeyError, TypeError, UnicodeDecodeError, AttributeError):
+        raise InvalidWatermarkError from None
+
+
+def _after(field, sequence, pk):
+    # (field, id) > cursor; o primeiro termo limita o intervalo do índice
+    return Q(**{f'{field}__gte': sequence}) & (
+        Q(**{f'{field}__gt': sequence}) | Q(**{field: sequence, 'pk__gt': pk})
+    )
+
+
+def _pruned():
+    """(sequence, id) do último Tombstone apagado pela retenção."""
+    pruned = SyncSequence.objects.values_list('pruned_sequence', 'pruned_id').first()
+    return pruned or (0, 0)
+
+
+def prune_tombstones(days=None):
+    """Apaga os Tombstones mais antigos que `days` (SYNC_TOMBSTONE_RETENTION_DAYS).
+
+    Guarda o maior (sequence, id) apagado: marcas d'água anteriores a ele recebem
+    'reset' em collect_changes. Retorna o número de Tombstones apagados.
+    """
+    if days is None:
+        days = getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30)
+    tombstones = Tombstone.objects.filter(
+        deleted_at__lt=timezone.now() - timedelta(days=days)
+    )
+    with transaction.atomic():
+        counter, _ = SyncSequence.objects.select_for_update().get_or_create(pk=1)
+        last = tombstones.order_by('-sequence', '-pk').values_list('sequence', 'pk').first()
+        if last is None:
+            return 0
+        if last > (counter.pruned_sequence, counter.pruned_id):
+            counter.pruned_sequence, counter.pruned_id = last
+            counter.save(update_fields=['pruned_sequence', 'pruned_id'])
+        count, _ = tombstones.delete()
+    return count
+
+
+def collect_changes(sources, user, watermark=None, limit=DEFAULT_LIMIT):
+    """Mudanças desde `watermark`, até `limit` linhas por fonte e `limit` remoções.
+
+    Retorna {'watermark', 'has_more', 'reset', 'changes': {fonte: [...]},
+    'deleted': [...]}; com has_more o cliente repete a chamada com a nova marca
+    d'água. Com reset, a marca d'água é anterior aos Tombstones já apagados: as
+    mudanças vêm do início e o cliente descarta os dados locais antes de aplicá-las.
+    """
+    state = decode_watermark(watermark)
+    pruned = _pruned()
+    reset = bool(watermark) and state['s'] < pruned
+    if reset:
+        state = decode_watermark(None)
+    # Quem começa do início não precisa dos Tombstones já apagados
+    state['s'] = max(state['s'], pruned)
+    sources = [source for source in sources if source.visible_to(user)]
+
+    has_more = False
+    changes = {}
+    deleted = []
+    cursors = dict(state['c'])
+    for source in sources:
+        queryset = source.queryset(user)
+        cursor = state['c'].get(source.name)
+        if cursor:
+            queryset = queryset.filter(_after('sync_sequence', *cursor))
+        rows = list(queryset.order_by('sync_sequence', 'pk')[: limit + 1])
+        if len(rows) > limit:
+            has_more = True
+            rows = rows[:limit]
+        if rows:
+            cursors[source.name] = (rows[-1].sync_sequence, rows[-1].pk)
+        active = []
+        for row in rows:
+            if source.active_field and not getattr(row, source.active_field):
+                deleted.append({'model': source.name, 'id': row.pk, 'reason': 'inactive'})
+            else:
+                active.append(row)
+        changes[source.name] = source.serializer_class(active, many=True).data
+
+    names = {source.label: source.name for source in sources}
+    tombstones = list(
+        Tombstone.objects.filter(_after('sequence', *state['s']), model__in=names).order_by(
+            'sequence', 'pk'
+        )[: limit + 1]
+    )
+    if len(tombstones) > limit:
+        has_more = True
+        tombstones = tombstones[:limit]
+    last = (tombstones[-1].sequence, tombstones[-1].pk) if tombstones else state['s']
+    deleted.extend(
+        {'model': names[tombstone.model], 'id': tombstone.object_id, 'reason': 'deleted'}
+        for tombstone in tombstones
+    )
+
+    watermark = encode_watermark(
+        {'c': {name: list(cursor) for name, cursor in cursors.items()}, 's': list(last)}
+    )
+    return {
+        'watermark': watermark,
+        'has_more': has_more,
+        'reset': reset,
+        'changes': changes,
+        'deleted': deleted,
+    }
@@ -1,3 +1,188 @@
-from django.test import TestCase
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from catalog.models import Client, Product
+from catalog.reference import active_products
+from coopapp.test_runner import LOCAL_CACHES
+from operations.models import Distribution, Offer, Order
+from users.models import User
+
+from .affinity import VERSION_KEY, get_affinity_matrix, invalidate_affinity_matrix
+from .models import Macroregion, MacroregionAffinity, Region, SyncSequence
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class AffinityMatrixTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.north = Macroregion.objects.create(name='Norte')
+        cls.south = Macroregion.objects.create(name='Sul')
+        cls.east = Macroregion.objects.create(name='Leste')
+        MacroregionAffinity.objects.create(
+            macroregion1=cls.south, macroregion2=cls.north, value=4
+        )
+        cls.north_region = Region.objects.create(name='Norte 1', macroregion=cls.north)
+        cls.south_region = Region.objects.create(name='Sul 1', macroregion=cls.south)
+        cls.east_region = Region.objects.create(name='Leste 1', macroregion=cls.east)
+
+    def setUp(self):
+        invalidate_affinity_matrix()
+
+    def test_values_are_symmetric_with_defaults(self):
+        matrix = get_affinity_matrix()
+        self.assertEqual(matrix.value(self.north.pk, self.south.pk), 4)
+        self.assertEqual(matrix.value(self.south.pk, self.north.pk), 4)
+        self.assertEqual(matrix.value(self.east.pk, self.east.pk), 1)
+        self.assertIsNone(matrix.value(self.north.pk, self.east.pk))
+        self.assertEqual(matrix.region_value(self.north_region.pk, self.south_region.pk), 4)
+        # Pares sem cadastro custam mais que o maior valor conhecido
+        self.assertEqual(matrix.region_cost(self.north_region.pk, self.east_region.pk), 5)
+        self.assertEqual(matrix.region_cost(self.north_region.pk, None), 5)
+
+    def test_cached_until_a_change(self):
+        matrix = get_affinity_matrix()
+        with self.assertNumQueries(0):
+            self.assertIs(get_affinity_matrix(), matrix)
+
+        MacroregionAffinity.objects.create(
+            macroregion1=self.north, macroregion2=self.east, value=7
+        )
+        self.assertEqual(get_affinity_matrix().value(self.east.pk, self.north.pk), 7)
+
+    def test_reloads_when_another_process_changes_the_version(self):
+        matrix = get_affinity_matrix()
+        # update() não dispara sinais: só a versão compartilhada avisa a mudança
+        MacroregionAffinity.objects.update(value=6)
+        self.assertIs(get_affinity_matrix(), matrix)
+        caches[settings.REFERENCE_CACHE_ALIAS].set(VERSION_KEY, uuid.uuid4().hex)
+        self.assertEqual(get_affinity_matrix().value(self.north.pk, self.south.pk), 6)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ReferenceCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(
+            name='Alface', production_time=1, default_purchase_value=2, shelf_life=5
+        )
+
+    def test_lookups_follow_saves_and_shared_version(self):
+        self.assertEqual(active_products.get_by_name('Alface'), self.product)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                active_products.in_bulk([self.product.pk, 999]),
+                {self.product.pk: self.product},
+            )
+
+        # post_save descarta a cópia local na hora
+        self.product.is_active = False
+        self.product.save()
+        self.assertIsNone(active_products.get(self.product.pk))
+
+        # Outro processo trocou a versão compartilhada: a tabela é recarregada
+        Product.objects.filter(pk=self.product.pk).update(is_active=True)
+        self.assertIsNone(active_products.get(self.product.pk))
+        caches[settings.REFERENCE_CACHE_ALIAS].set(
+            active_products.version_key, uuid.uuid4().hex
+        )
+        self.assertEqual(active_products.get(self.product.pk), self.product)
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class ResponseCacheTests(TestCase):
+    # Validador de cache + SELECT da página (ver operations.tests.ApiTestCase)
+    LIST_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_admin_user('admin', 'admin@example.com', 'Admin')
+        cls.product = Product.objects.create(
+            name='Alface', production_time=1, default_purchase_value=2, shelf_life=5
+        )
+        cls.client_record = Client.objects.create(name='Escola')
+
+    def setUp(self):
+        # O rollback de cada teste desfaz as linhas, mas não as gerações
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def create_rows(self, count):
+        for i in range(count):
+            cooperated = User.objects.create_user(f'coop{i}', full_name=f'Cooperado {i}')
+            order = Order.objects.create(
+                client=self.client_record,
+                product=self.product,
+                quantity=10,
+                unit_price=3,
+                total_value=30,
+                delivery_date=date(2030, 1, 1) + timedelta(days=i % 5),
+            )
+            offer = Offer.objects.create(
+                product=self.product,
+                cooperated=cooperated,
+                quantity=20,
+                start_date=date(2030, 1, 1),
+                end_date=date(2030, 1, 11),
+            )
+            Distribution.objects.create(order=order, offer=offer, quantity=4)
+
+    def test_cached_until_a_dependent_generation_changes(self):
+        self.create_rows(3)
+        response = self.api.get('/api/orders/?status=PARTIAL&page_size=2')
+        # Mesma URL com os parâmetros em outra ordem: sai do cache, sem consultas
+        with self.assertNumQueries(0):
+            cached = self.api.get('/api/orders/?page_size=2&status=PARTIAL')
+        self.assertEqual(cached.data, response.data)
+
+        self.product.name = 'Alface crespa'
+        self.product.save()
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.api.get('/api/orders/?status=PARTIAL&page_size=2')
+        self.assertEqual(response.data['results'][0]['product_name'], 'Alface crespa')
+
+    def test_bulk_writes_change_generations(self):
+        self.create_rows(2)
+        self.assertEqual(len(self.api.get('/api/distributions/').data['results']), 2)
+        Distribution.objects.update(source=Distribution.DistributionSource.MANUAL)
+        results = self.api.get('/api/distributions/').data['results']
+        self.assertEqual({row['source'] for row in results}, {'MANUAL'})
+
+        offer = Offer.objects.order_by('pk').first()
+        self.api.get(f'/api/offers/{offer.pk}/')
+        Distribution.objects.filter(offer=offer).delete()
+        response = self.api.get(f'/api/offers/{offer.pk}/')
+        self.assertEqual(Decimal(response.data['allocated_quantity']), Decimal(0))
+
+    def test_scope_is_part_of_the_key(self):
+        self.create_rows(3)
+        self.assertEqual(len(self.api.get('/api/offers/').data['results']), 3)
+        cooperated = Offer.objects.order_by('pk').first().cooperated
+        self.api.force_authenticate(cooperated)
+        self.assertEqual(len(self.api.get('/api/offers/').data['results']), 1)
+
+
+class SyncSequenceTests(TestCase):
+    def test_one_number_per_transaction(self):
+        with self.assertNumQueries(2):
+            value = SyncSequence.current()
+        region = Region.objects.create(name='Centro 1')
+        with self.assertNumQueries(0):
+            self.assertEqual(SyncSequence.current(), value)
+        self.assertEqual(region.sync_sequence, value)
+
+    def test_rolled_back_savepoint_takes_a_new_number(self):
+        # O rollback do savepoint desfaz o incremento e solta o bloqueio do contador
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                value = SyncSequence.current()
+                raise DatabaseError
+        with self.assertNumQueries(2):
+            self.assertEqual(SyncSequence.current(), value)
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'common'
+
+urlpatterns = [
+    path('batch/', views.BatchView.as_view(), name='batch'),
+]
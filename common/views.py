@@ -1,3 +1,97 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 
-# Create your views here.
+from .batch import run_batch
+from .serializers import BatchRequestSerializer
+
+
+class AsyncAPIView(View):
+    """
+    Base das views assíncronas de leitura (agregados pesados), servidas sob ASGI.
+
+    O DRF só executa views síncronas; aqui as authentication_classes do DRF (sessão e
+    Basic, como no resto da API) rodam em uma thread (sync_to_async), as
+    permission_classes são verificadas sobre o usuário e as respostas são
+    JsonResponse no mesmo formato da API. Subclasses implementam `async def get` e
+    retornam self.respond(dados).
+    """
+
+    http_method_names = ['get', 'head', 'options']
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    permission_classes = [IsAuthenticated]
+    not_authenticated_message = 'As credenciais de autenticação não foram fornecidas.'
+    denied_message = 'Você não tem permissão para executar esta ação.'
+
+    def authenticate(self, request):
+        """(usuário, auth) pelos autenticadores do DRF; consulta o banco."""
+        drf_request = Request(
+            request, authenticators=[auth() for auth in self.authentication_classes]
+        )
+        return drf_request.user, drf_request.auth
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user, request.auth = await sync_to_async(self.authenticate)(request)
+        except APIException as exc:
+            # Como APIView.handle_exception: sem cabeçalho WWW-Authenticate do primeiro
+            # autenticador (sessão), a falha de autenticação vira 403
+            header = self.authentication_classes[0]().authenticate_header(request)
+            if not header:
+                return self.error(403, exc.detail)
+            response = self.error(exc.status_code, exc.detail)
+            response['WWW-Authenticate'] = header
+            return response
+        for permission in self.permission_classes:
+            permission = permission()
+            if not permission.has_permission(request, self):
+                if not request.user.is_authenticated:
+                    return self.error(403, self.not_authenticated_message)
+                return self.error(403, getattr(permission, 'message', self.denied_message))
+        return await super().dispatch(request, *args, **kwargs)
+
+    def respond(self, data, status=200):
+        return JsonResponse(
+            data,
+            status=status,
+            json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+        )
+
+    def error(self, status, detail):
+        return self.respond(
+            detail if isinstance(detail, dict) else {'detail': detail}, status
+        )
+
+
+class BatchView(APIView):
+    """
+    Várias requisições da API em uma só ida e volta.
+
+    POST /api/batch/ {"requests": [{"id", "method", "path", "body", "headers"}, ...],
+                      "atomic": false}
+    As sub-requisições rodam em ordem, com o usuário da requisição do lote, e
+    compartilham o cache de consultas da requisição. Com "atomic", a primeira
+    falha desfaz as anteriores e as seguintes retornam 424.
+    """
+
+    def post(self, request):
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['requests']
+        results = run_batch(
+            request._request,
+            items,
+            atomic=serializer.validated_data['atomic'],
+            exclude_view=type(self),
+        )
+        responses = [
+            {'id': item['id'], **result} if 'id' in item else result
+            for item, result in zip(items, results, strict=True)
+        ]
+        return Response({'responses': responses})
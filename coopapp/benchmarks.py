@@ -0,0 +1,225 @@
+"""Suíte de benchmarks dos caminhos críticos: tempo e número de consultas.
+
+Cada cenário recebe o BenchmarkContext e devolve a função a ser medida; o preparo
+fica fora da medição. Tudo roda dentro de uma transação desfeita ao final, então os
+cenários podem escrever à vontade sem alterar os dados (ver generate_synthetic_data).
+"""
+
+import statistics
+import time
+from dataclasses import asdict, dataclass
+
+from django.contrib.auth import get_user_model
+from django.db import connection, models, transaction
+from django.db.models.functions import Coalesce, TruncMonth
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from operations.models import Distribution, Offer, Order
+from operations.services import (
+    ALLOCATORS,
+    allocate,
+    offer_candidates,
+    plan_distributions,
+    recalculate,
+    validate_distributions,
+)
+from transactions.models import Buy, Sell
+
+SCENARIOS = {}
+
+
+def scenario(name, description):
+    """Registra um cenário da suíte."""
+
+    def register(func):
+        SCENARIOS[name] = (description, func)
+        return func
+
+    return register
+
+
+@dataclass
+class BenchmarkContext:
+    # Produto com mais ofertas: o caso mais pesado para os caminhos por produto
+    product_id: int
+
+    @classmethod
+    def build(cls):
+        busiest = (
+            Offer.objects.values('product_id')
+            .annotate(total=models.Count('pk'))
+            .order_by('-total')
+            .first()
+        )
+        if busiest is None:
+            return None
+        return cls(product_id=busiest['product_id'])
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    seconds: float
+    queries: int
+    runs: int
+
+
+def run_scenario(name, context, repeat=3):
+    """Executa o cenário `repeat` vezes e retorna a mediana do tempo."""
+    _, func = SCENARIOS[name]
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with transaction.atomic():
+            measured = func(context)
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                measured()
+                timings.append(time.perf_counter() - started)
+            queries = len(captured)
+            transaction.set_rollback(True)
+    return BenchmarkResult(name, statistics.median(timings), queries, repeat)
+
+
+def compare(results, baseline, tolerance):
+    """Lista as regressões em relação a um resultado salvo anteriormente."""
+    previous = {row['name']: row for row in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get(result.name)
+        if before is None:
+            continue
+        if result.queries > before['queries']:
+            regressions.append(
+                f'{result.name}: {before["queries"]} -> {result.queries} consultas'
+            )
+        if result.seconds > before['seconds'] * (1 + tolerance):
+            regressions.append(
+                f'{result.name}: {before["seconds"]:.3f}s -> {result.seconds:.3f}s'
+            )
+    return regressions
+
+
+def as_rows(results):
+    return [asdict(result) for result in results]
+
+
+# Distribuição
+
+
+@scenario('validacao', 'validate_distributions alterando até 500 distribuições')
+def validation(context):
+    queryset = Distribution.objects.filter(order__product_id=context.product_id)
+    distributions = list(queryset.order_by('pk')[:500])
+    for distribution in distributions:
+        distribution.quantity += 1
+    return lambda: validate_distributions(distributions)
+
+
+@scenario('candidatos', 'offer_candidates para os pedidos pendentes do produto')
+def candidates(context):
+    orders = list(
+        Order.objects.pending()
+        .filter(product_id=context.product_id)
+        .values_list('pk', flat=True)
+    )
+    return lambda: offer_candidates(orders)
+
+
+@scenario('plano', 'plan_distributions do produto (sem gravar)')
+def plan(context):
+    return lambda: plan_distributions(products=[context.product_id])
+
+
+def _allocation(allocator):
+    def prepare(context):
+        # Distribuições já compradas (Buy) ficam: fazem parte do histórico
+        Distribution.objects.filter(
+            order__product_id=context.product_id,
+            source=Distribution.DistributionSource.AUTO,
+            buy__isnull=True,
+        ).delete()
+        return lambda: allocate(context.product_id, allocator=allocator)
+
+    return prepare
+
+
+for _method, _allocator in ALLOCATORS.items():
+    scenario(
+        f'alocacao_{_method}',
+        f'allocate do produto sem distribuições AUTO não compradas ({_method})',
+    )(_allocation(_allocator))
+
+
+@scenario('recalculo', 'recalculate do produto inteiro')
+def recalculation(context):
+    offer = Offer.objects.filter(product_id=context.product_id).order_by('pk').first()
+    Offer.objects.filter(pk=offer.pk).update(quantity=models.F('quantity') + 10)
+    return lambda: recalculate(products=[context.product_id])
+
+
+# Admin
+
+
+def _changelist(model):
+    def prepare(context):
+        user = get_user_model().objects.create_superuser(
+            'benchmark-admin', 'benchmark-admin@example.com'
+        )
+        client = Client()
+        client.force_login(user)
+        url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+
+        def measured():
+            with override_settings(ALLOWED_HOSTS=['testserver']):
+                response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+        return measured
+
+    return prepare
+
+
+for _model in (Order, Offer, Distribution, Buy, Sell):
+    scenario(
+        f'admin_{_model._meta.model_name}',
+        f'changelist do admin de {_model._meta.verbose_name_plural}',
+    )(_changelist(_model))
+
+
+# Relatórios
+
+
+@scenario('relatorio_compras', 'total comprado por cooperado e mês')
+def buy_report(context):
+    def measured():
+        return list(
+            Buy.objects.annotate(
+                cooperated_ref=Coalesce('cooperated', 'distribution__offer__cooperated'),
+                month=TruncMonth('delivery_date'),
+            )
+            .values('cooperated_ref', 'month')
+            .annotate(
+                quantity=models.Sum('quantity_received'), value=models.Sum('total_value')
+            )
+            .order_by('cooperated_ref', 'month')
+        )
+
+    return measured
+
+
+@scenario('relatorio_vendas', 'total vendido por cliente e produto')
+def sell_report(context):
+    def measured():
+        return list(
+            Sell.objects.values('order__client', 'order__product')
+            .annotate(
+                delivered=models.Sum('quantity_delivered'),
+                missing=models.Sum('missing_quantity'),
+            )
+            .order_by('order__client', 'order__product')
+        )
+
+    return measured
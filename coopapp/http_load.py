@@ -0,0 +1,93 @@
+"""Carga HTTP concorrente contra um servidor em execução: latência p50/p99.
+
+Usado por benchmark_http para comparar o mesmo endpoint servido por WSGI (ex.:
+gunicorn coopapp.wsgi) e por ASGI (ex.: uvicorn coopapp.asgi:application). Cada
+worker mantém a própria conexão keep-alive e dispara requisições em sequência até
+o total ser atingido; as latências de todas são juntadas no final.
+"""
+
+import http.client
+import itertools
+import statistics
+import threading
+import time
+from dataclasses import asdict, dataclass
+from urllib.parse import urlsplit
+
+
+@dataclass
+class LoadResult:
+    server: str
+    path: str
+    requests: int
+    errors: int
+    p50_ms: float
+    p99_ms: float
+    requests_per_second: float
+
+
+def percentile(values, fraction):
+    """Percentil por posição na lista ordenada (sem interpolação)."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def _connection(base_url, timeout):
+    url = urlsplit(base_url)
+    connection_class = (
+        http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+    )
+    return connection_class(url.hostname, url.port, timeout=timeout)
+
+
+def run_load(server, base_url, path, headers, concurrency=16, total=500, timeout=30):
+    """Faz `total` GETs em `path` com `concurrency` conexões simultâneas."""
+    counter = itertools.count()
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        connection = _connection(base_url, timeout)
+        own_latencies, own_errors = [], 0
+        while next(counter) < total:
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status >= 400:
+                    own_errors += 1
+            except (OSError, http.client.HTTPException):
+                own_errors += 1
+                connection.close()
+                connection = _connection(base_url, timeout)
+            own_latencies.append(time.perf_counter() - started)
+        connection.close()
+        with lock:
+            latencies.extend(own_latencies)
+            errors.append(own_errors)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return LoadResult(
+        server=server,
+        path=path,
+        requests=len(latencies),
+        errors=sum(errors),
+        p50_ms=statistics.median(latencies) * 1000 if latencies else 0.0,
+        p99_ms=percentile(latencies, 0.99) * 1000,
+        requests_per_second=len(latencies) / elapsed if elapsed else 0.0,
+    )
+
+
+def as_rows(results):
+    return [asdict(result) for result in results]
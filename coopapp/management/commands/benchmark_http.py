@@ -0,0 +1,82 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from coopapp.http_load import as_rows, run_load
+
+DEFAULT_PATHS = ['/api/dashboard/', '/api/calendar/?start=2024-01-01&end=2024-12-31']
+
+
+class Command(BaseCommand):
+    """
+    Compara latência (p50/p99) e vazão dos endpoints servidos por WSGI e por ASGI
+    """
+
+    help = (
+        'Dispara requisições concorrentes contra servidores já em execução, ex.: '
+        '"gunicorn coopapp.wsgi -w 4 -b :8000" e '
+        '"uvicorn coopapp.asgi:application --workers 4 --port 8001", '
+        'autenticado pela sessão de --username.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*', help=f'Caminhos (padrão: {", ".join(DEFAULT_PATHS)})'
+        )
+        parser.add_argument('--wsgi', help='URL base do servidor WSGI')
+        parser.add_argument('--asgi', help='URL base do servidor ASGI')
+        parser.add_argument('--username', required=True)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=20,
+            help='Requisições descartadas antes da medição',
+        )
+        parser.add_argument('--save', help='Grava os resultados neste arquivo JSON')
+
+    def session_headers(self, username):
+        try:
+            user = get_user_model().objects.get(username=username)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Usuário {username} não encontrado.') from None
+        client = Client()
+        client.force_login(user)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME].value
+        return {'Cookie': f'{settings.SESSION_COOKIE_NAME}={cookie}'}
+
+    def handle(self, *args, **options):
+        servers = [(name, options[name]) for name in ('wsgi', 'asgi') if options[name]]
+        if not servers:
+            raise CommandError('Informe --wsgi e/ou --asgi.')
+        paths = options['paths'] or DEFAULT_PATHS
+
+        headers = self.session_headers(options['username'])
+        results = []
+        for name, base_url in servers:
+            for path in paths:
+                if options['warmup']:
+                    run_load(name, base_url, path, headers, 1, options['warmup'])
+                result = run_load(
+                    name,
+                    base_url,
+                    path,
+                    headers,
+                    concurrency=options['concurrency'],
+                    total=options['requests'],
+                )
+                results.append(result)
+                self.stdout.write(
+                    f'{name:<5} {path:<48} p50 {result.p50_ms:8.1f} ms '
+                    f'p99 {result.p99_ms:8.1f} ms {result.requests_per_second:8.1f} req/s '
+                    f'{result.errors:5d} erros'
+                )
+
+        if options['save']:
+            with open(options['save'], 'w') as output:
+                json.dump(as_rows(results), output, indent=2)
@@ -0,0 +1,70 @@
+import json
+
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+
+from coopapp.benchmarks import (
+    SCENARIOS,
+    BenchmarkContext,
+    as_rows,
+    compare,
+    run_scenario,
+)
+
+
+class Command(BaseCommand):
+    """
+    Mede tempo e consultas dos caminhos críticos sobre os dados atuais do banco
+    """
+
+    help = (
+        'Executa a suíte de benchmarks (validação, alocação, admin, relatórios). '
+        'Use --save para gravar um resultado e --compare para detectar regressões.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios',
+            nargs='*',
+            help=f'Cenários (padrão: todos). Disponíveis: {", ".join(SCENARIOS)}',
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--save', help='Grava os resultados neste arquivo JSON')
+        parser.add_argument('--compare', help='Compara com um arquivo salvo por --save')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Aumento de tempo aceito antes de acusar regressão (padrão: 0.25)',
+        )
+
+    def handle(self, *args, **options):
+        names = options['scenarios'] or list(SCENARIOS)
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f'Cenários desconhecidos: {", ".join(unknown)}')
+
+        context = BenchmarkContext.build()
+        if context is None:
+            raise CommandError('Sem ofertas no banco; rode generate_synthetic_data antes.')
+
+        results = []
+        for name in names:
+            result = run_scenario(name, context, repeat=options['repeat'])
+            results.append(result)
+            self.stdout.write(
+                f'{name:<28} {result.seconds * 1000:10.1f} ms {result.queries:6d} consultas'
+            )
+
+        if options['save']:
+            with open(options['save'], 'w') as output:
+                json.dump(as_rows(results), output, indent=2)
+
+        if options['compare']:
+            with open(options['compare']) as baseline:
+                regressions = compare(results, json.load(baseline), options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stderr.write(regression)
+                raise CommandError(f'{len(regressions)} regressões encontradas.')
+            self.stdout.write(self.style.SUCCESS('Sem regressões.'))
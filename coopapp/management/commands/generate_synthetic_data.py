@@ -0,0 +1,55 @@
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+
+from coopapp.synthetic import SyntheticSizes, generate, seed_exists
+
+
+class Command(BaseCommand):
+    """
+    Gera dados sintéticos reprodutíveis (mesmo seed, mesmos dados)
+    """
+
+    help = (
+        'Cria macroregiões, regiões, cooperados, clientes, produtos, ofertas, pedidos, '
+        'distribuições, compras e vendas sintéticos para testes de carga.'
+    )
+
+    def add_arguments(self, parser):
+        defaults = SyntheticSizes()
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--scale',
+            type=float,
+            default=1.0,
+            help='Multiplica cooperados, clientes, ofertas e pedidos (padrão: 1.0)',
+        )
+        parser.add_argument('--macroregions', type=int, default=defaults.macroregions)
+        parser.add_argument('--regions', type=int, default=defaults.regions)
+        parser.add_argument('--cooperated', type=int, default=defaults.cooperated)
+        parser.add_argument('--clients', type=int, default=defaults.clients)
+        parser.add_argument('--products', type=int, default=defaults.products)
+        parser.add_argument('--offers', type=int, default=defaults.offers)
+        parser.add_argument('--orders', type=int, default=defaults.orders)
+
+    def handle(self, *args, **options):
+        if seed_exists(options['seed']):
+            raise CommandError(
+                f'Já existem dados sintéticos para o seed {options["seed"]}; '
+                'use outro --seed.'
+            )
+        sizes = SyntheticSizes(
+            macroregions=options['macroregions'],
+            regions=options['regions'],
+            cooperated=options['cooperated'],
+            clients=options['clients'],
+            products=options['products'],
+            offers=options['offers'],
+            orders=options['orders'],
+        ).scaled(options['scale'])
+        counts = generate(options['seed'], sizes, stdout=self.stdout)
+        self.stdout.write(
+            self.style.SUCCESS(
+                'Dados gerados: '
+                + ', '.join(f'{name}={count}' for name, count in counts.items())
+            )
+        )
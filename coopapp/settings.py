@@ -44,10 +44,25 @@ INSTALLED_APPS = [
     'catalog',
     'operations',
     'transactions',
+    'jobs',
 ]
 
 AUTH_USER_MODEL = 'users.User'
 
+# Permissões em cache entre requisições e processos (ver users.backends)
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+PERMISSION_CACHE_ALIAS = 'permissions'
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_PAGINATION_CLASS': 'common.pagination.CreatedAtKeysetPagination',
+    'PAGE_SIZE': 50,
+}
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -56,10 +71,45 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'common.middleware.RequestCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'coopapp.urls'
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Visível a todos os processos da máquina: versões das tabelas de referência
+    # (common.reference), permissões e gerações dos modelos (common.generations).
+    # Em produção com várias máquinas, trocar por Redis/Memcached. Os testes usam
+    # caches em memória (coopapp.test_runner).
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        # Gerações por modelo e por painel de cooperado, além das versões
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Uma entrada por usuário: separada para não disputar espaço (e descarte) com
+    # as versões e gerações acima
+    'permissions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'permissions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+REFERENCE_CACHE_ALIAS = 'shared'
+
+# Cache de respostas da API (common.mixins.ResponseCacheMixin): as gerações dos
+# modelos precisam ser vistas por todos os processos; as respostas podem ficar em
+# cada processo, pois a chave já muda quando os dados mudam.
+GENERATION_CACHE_ALIAS = 'shared'
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+
+TEST_RUNNER = 'coopapp.test_runner.LocalCacheRunner'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
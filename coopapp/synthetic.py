@@ -0,0 +1,349 @@
+"""Gerador de dados sintéticos da cooperativa para medir o sistema em escala.
+
+Tudo é derivado de um random.Random(seed), então o mesmo seed gera sempre os mesmos
+dados. Macroregiões, regiões e unidades são compartilhadas entre execuções; usuários,
+clientes e produtos recebem o prefixo do seed para não colidirem.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import models, transaction
+from django.utils import timezone
+
+from catalog.models import Client, Product, Unit
+from catalog.reference import active_clients, active_products
+from common.generations import bump
+from common.models import Macroregion, MacroregionAffinity, Region
+from operations.models import Distribution, Offer, Order
+from operations.services import allocate
+from transactions.models import Buy, Sell
+from users.models import User
+
+# Nomes com as duas primeiras letras distintas: MacroregionAffinity.name usa esse prefixo
+MACROREGIONS = [
+    'Norte',
+    'Sul',
+    'Leste',
+    'Oeste',
+    'Centro',
+    'Litoral',
+    'Serra',
+    'Vale',
+    'Planalto',
+]
+UNITS = [('Quilograma', 'kg'), ('Unidade', 'un'), ('Maço', 'mç'), ('Caixa', 'cx')]
+PRODUCT_NAMES = [
+    'Alface',
+    'Tomate',
+    'Cenoura',
+    'Beterraba',
+    'Couve',
+    'Abobrinha',
+    'Batata-doce',
+    'Mandioca',
+    'Banana',
+    'Laranja',
+    'Mamão',
+    'Repolho',
+    'Pepino',
+    'Milho verde',
+    'Feijão',
+    'Cebolinha',
+]
+BATCH_SIZE = 1000
+
+
+@dataclass
+class SyntheticSizes:
+    macroregions: int = 5
+    regions: int = 30
+    cooperated: int = 2000
+    clients: int = 300
+    products: int = 40
+    offers: int = 20000
+    orders: int = 8000
+    # Fração das distribuições/pedidos já vencidos que recebem compra/venda
+    delivered: float = 0.7
+    # Fração dos pedidos não vendidos e das ofertas não entregues que são canceladas
+    cancelled: float = 0.05
+
+    def scaled(self, factor):
+        return SyntheticSizes(
+            macroregions=self.macroregions,
+            regions=self.regions,
+            cooperated=max(int(self.cooperated * factor), 1),
+            clients=max(int(self.clients * factor), 1),
+            products=self.products,
+            offers=max(int(self.offers * factor), 1),
+            orders=max(int(self.orders * factor), 1),
+            delivered=self.delivered,
+            cancelled=self.cancelled,
+        )
+
+
+def _prefix(seed):
+    return f'sint{seed}'
+
+
+def seed_exists(seed):
+    return User.objects.filter(username__startswith=f'{_prefix(seed)}-').exists()
+
+
+def _regions(rng, sizes):
+    macroregions = [
+        Macroregion.objects.get_or_create(name=name)[0]
+        for name in MACROREGIONS[: min(sizes.macroregions, len(MACROREGIONS))]
+    ]
+    for i, macroregion1 in enumerate(macroregions):
+        for macroregion2 in macroregions[i + 1 :]:
+            if not MacroregionAffinity.objects.filter(
+                macroregion1__in=[macroregion1, macroregion2],
+                macroregion2__in=[macroregion1, macroregion2],
+            ).exists():
+                MacroregionAffinity.objects.create(
+                    macroregion1=macroregion1,
+                    macroregion2=macroregion2,
+                    value=rng.randint(2, 9),
+                )
+    return [
+        Region.objects.get_or_create(
+            name=f'{macroregions[i % len(macroregions)].name} {i // len(macroregions) + 1}',
+            defaults={'macroregion': macroregions[i % len(macroregions)]},
+        )[0]
+        for i in range(sizes.regions)
+    ]
+
+
+def _set_status(model, ids, status):
+    """Troca o status por UPDATE, em lotes; status pode ser uma expressão."""
+    ids = list(ids)
+    now = timezone.now()
+    for start in range(0, len(ids), BATCH_SIZE):
+        model.objects.filter(pk__in=ids[start : start + BATCH_SIZE]).update(
+            status=status, updated_at=now
+        )
+
+
+def _season_date(rng, today, peak):
+    # Ofertas e pedidos concentrados em torno do pico de safra do produto
+    offset = int(rng.gauss(peak, 30))
+    return today + timedelta(days=max(min(offset, 180), -120))
+
+
+def generate(seed=42, sizes=None, stdout=None):
+    """Gera o conjunto completo em uma transação e retorna as contagens por modelo."""
+    sizes = sizes or SyntheticSizes()
+    rng = random.Random(seed)
+    prefix = _prefix(seed)
+    today = timezone.now().date()
+
+    def log(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    with transaction.atomic():
+        regions = _regions(rng, sizes)
+        units = [
+            Unit.objects.get_or_create(symbol=symbol, defaults={'name': name})[0]
+            for name, symbol in UNITS
+        ]
+
+        admin = User.objects.create_admin_user(
+            f'{prefix}-admin', f'{prefix}-admin@example.com', f'Admin {prefix}'
+        )
+        password = make_password(None)
+        cooperated = User.objects.bulk_create(
+            [
+                User(
+                    username=f'{prefix}-coop{i}',
+                    password=password,
+                    full_name=f'Cooperado {i} {prefix}',
+                    region=rng.choice(regions),
+                    created_by=admin,
+                )
+                for i in range(sizes.cooperated)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        clients = Client.objects.bulk_create(
+            [
+                Client(name=f'Cliente {i} {prefix}', region=rng.choice(regions))
+                for i in range(sizes.clients)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        products = []
+        for i in range(sizes.products):
+            unit = rng.choice(units)
+            name = f'{PRODUCT_NAMES[i % len(PRODUCT_NAMES)]} {prefix}-{i}'
+            products.append(
+                Product(
+                    # Product.save() acrescenta o símbolo da unidade; bulk_create não
+                    name=f'{name} ({unit.symbol})',
+                    unit=unit,
+                    production_time=rng.randint(0, 5),
+                    default_purchase_value=Decimal(rng.randint(100, 1500)) / 100,
+                    shelf_life=rng.randint(2, 20),
+                    created_by=admin,
+                )
+            )
+        products = Product.objects.bulk_create(products, batch_size=BATCH_SIZE)
+        # bulk_create não dispara post_save
+        active_clients.invalidate()
+        active_products.invalidate()
+        peaks = {product.pk: rng.randint(-90, 120) for product in products}
+        log(
+            f'{len(regions)} regiões, {len(cooperated)} cooperados, {len(clients)} '
+            f'clientes, {len(products)} produtos'
+        )
+
+        offers = []
+        for _ in range(sizes.offers):
+            product = rng.choice(products)
+            start = _season_date(rng, today, peaks[product.pk])
+            offers.append(
+                Offer(
+                    product=product,
+                    cooperated=rng.choice(cooperated),
+                    quantity=Decimal(rng.randint(5, 300)),
+                    start_date=start,
+                    end_date=start + timedelta(days=rng.randint(3, 21)),
+                    created_by=admin,
+                )
+            )
+        Offer.objects.bulk_create(offers, batch_size=BATCH_SIZE)
+
+        orders = []
+        for _ in range(sizes.orders):
+            product = rng.choice(products)
+            quantity = Decimal(rng.randint(10, 800))
+            unit_price = (product.default_purchase_value * Decimal('1.3')).quantize(
+                Decimal('0.01')
+            )
+            orders.append(
+                Order(
+                    client=rng.choice(clients),
+                    product=product,
+                    quantity=quantity,
+                    unit_price=unit_price,
+                    total_value=quantity * unit_price,
+                    delivery_date=_season_date(rng, today, peaks[product.pk]),
+                    created_by=admin,
+                )
+            )
+        Order.objects.bulk_create(orders, batch_size=BATCH_SIZE)
+        log(f'{len(offers)} ofertas, {len(orders)} pedidos')
+
+        distributions = 0
+        for product in products:
+            distributions += len(allocate(product, user=admin))
+        log(f'{distributions} distribuições')
+
+        buys = []
+        prices = {product.pk: product.default_purchase_value for product in products}
+        delivered = Distribution.objects.filter(
+            order__product__in=products, order__delivery_date__lt=today
+        ).values_list(
+            'pk', 'offer_id', 'quantity', 'order__delivery_date', 'order__product_id'
+        )
+        bought_offers = set()
+        for pk, offer_id, quantity, delivery_date, product_id in delivered:
+            if rng.random() >= sizes.delivered:
+                continue
+            bought_offers.add(offer_id)
+            received = (quantity * Decimal(rng.uniform(0.85, 1.1))).quantize(
+                Decimal('0.01')
+            )
+            received = max(received, Decimal('0.01'))
+            buys.append(
+                Buy(
+                    distribution_id=pk,
+                    quantity_received=received,
+                    excess_quantity=max(received - quantity, Decimal(0)),
+                    missing_quantity=max(quantity - received, Decimal(0)),
+                    unity_price=prices[product_id],
+                    total_value=received * prices[product_id],
+                    delivery_date=delivery_date,
+                    created_by=admin,
+                )
+            )
+        Buy.objects.bulk_create(buys, batch_size=BATCH_SIZE)
+
+        sells = []
+        for order in orders:
+            if order.delivery_date >= today or rng.random() >= sizes.delivered:
+                continue
+            fraction = Decimal(min(rng.uniform(0.8, 1.05), 1))
+            delivered_quantity = max(
+                (order.quantity * fraction).quantize(Decimal('0.01')), Decimal('0.01')
+            )
+            sells.append(
+                Sell(
+                    order=order,
+                    quantity_delivered=delivered_quantity,
+                    missing_quantity=order.quantity - delivered_quantity,
+                    delivery_date=order.delivery_date,
+                    created_by=admin,
+                )
+            )
+        Sell.objects.bulk_create(sells, batch_size=BATCH_SIZE)
+
+        # Histórico: pedidos vendidos são encerrados e ofertas com compra e janela
+        # vencida, entregues; uma parte dos demais é cancelada
+        sold_orders = {sell.order.pk for sell in sells}
+        delivered_offers = {
+            offer.pk
+            for offer in offers
+            if offer.pk in bought_offers and offer.end_date < today
+        }
+        cancelled_orders = [
+            order.pk
+            for order in orders
+            if order.pk not in sold_orders and rng.random() < sizes.cancelled
+        ]
+        cancelled_offers = [
+            offer.pk
+            for offer in offers
+            if offer.pk not in delivered_offers and rng.random() < sizes.cancelled
+        ]
+        _set_status(
+            Order,
+            sold_orders,
+            models.Case(
+                models.When(
+                    allocated_quantity__gte=models.F('quantity'),
+                    then=models.Value(Order.OrderStatus.CLOSED_FILLED),
+                ),
+                default=models.Value(Order.OrderStatus.CLOSED_PARTIAL),
+            ),
+        )
+        _set_status(Order, cancelled_orders, Order.OrderStatus.CANCELLED)
+        _set_status(Offer, delivered_offers, Offer.OfferStatus.DELIVERED)
+        _set_status(Offer, cancelled_offers, Offer.OfferStatus.CANCELLED)
+        # Respostas da API em cache (as distribuições já avisam pelo próprio sinal)
+        bump(User, Client, Product, Offer, Order, Buy, Sell)
+        log(f'{len(buys)} compras, {len(sells)} vendas')
+        log(
+            f'{len(sold_orders)} pedidos encerrados, {len(cancelled_orders)} cancelados; '
+            f'{len(delivered_offers)} ofertas entregues, {len(cancelled_offers)} canceladas'
+        )
+
+    return {
+        'regions': len(regions),
+        'cooperated': len(cooperated),
+        'clients': len(clients),
+        'products': len(products),
+        'offers': len(offers),
+        'orders': len(orders),
+        'distributions': distributions,
+        'buys': len(buys),
+        'sells': len(sells),
+        'closed_orders': len(sold_orders),
+        'cancelled_orders': len(cancelled_orders),
+        'delivered_offers': len(delivered_offers),
+        'cancelled_offers': len(cancelled_offers),
+    }
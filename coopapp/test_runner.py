@@ -0,0 +1,34 @@
+"""Executor da suíte (settings.TEST_RUNNER): caches em memória no lugar dos em disco."""
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+# Um LocMemCache separado por alias, com as mesmas opções
+LOCAL_CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': alias,
+        'OPTIONS': config.get('OPTIONS', {}),
+    }
+    for alias, config in settings.CACHES.items()
+}
+
+
+class LocalCacheRunner(DiscoverRunner):
+    """Roda os testes com LOCAL_CACHES.
+
+    Toda escrita troca gerações e toda checagem de permissão preenche o cache de
+    permissões: sem isso, a suíte gravaria nos FileBasedCache de BASE_DIR/.cache,
+    que o servidor de desenvolvimento também lê, com ids de usuários do banco de
+    testes.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._local_caches = override_settings(CACHES=LOCAL_CACHES)
+        self._local_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._local_caches.disable()
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,63 @@
+from django.test import TestCase
+
+from operations.models import Offer, Order
+from operations.services import recalculate
+from transactions.models import Sell
+
+from .benchmarks import SCENARIOS, BenchmarkContext, as_rows, compare, run_scenario
+from .synthetic import SyntheticSizes, generate, seed_exists
+
+SIZES = SyntheticSizes(
+    macroregions=2,
+    regions=4,
+    cooperated=20,
+    clients=10,
+    products=3,
+    offers=300,
+    orders=150,
+    cancelled=0.2,
+)
+
+
+class SyntheticDataTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.counts = generate(seed=7, sizes=SIZES)
+
+    def test_counts_and_history(self):
+        self.assertTrue(seed_exists(7))
+        self.assertEqual(self.counts['offers'], Offer.objects.count())
+        self.assertEqual(self.counts['orders'], Order.objects.count())
+        self.assertEqual(self.counts['sells'], Sell.objects.count())
+        for key in ('closed_orders', 'cancelled_orders', 'delivered_offers'):
+            self.assertGreater(self.counts[key], 0, key)
+
+        # Pedidos vendidos são encerrados; nenhum pedido pendente tem venda
+        self.assertFalse(Order.objects.pending().filter(sell__isnull=False).exists())
+        self.assertEqual(Order.objects.closed().count(), self.counts['closed_orders'])
+        self.assertEqual(
+            Offer.objects.filter(status=Offer.OfferStatus.DELIVERED).count(),
+            self.counts['delivered_offers'],
+        )
+
+    def test_recalculation_over_the_history(self):
+        products = set(Order.objects.values_list('product_id', flat=True))
+        diff = recalculate(products=products)
+        self.assertTrue(
+            {order.status for order in diff.orders}.issubset(
+                {
+                    Order.OrderStatus.OPEN,
+                    Order.OrderStatus.PARTIAL,
+                    Order.OrderStatus.FILLED,
+                }
+            )
+        )
+
+    def test_every_benchmark_scenario_runs(self):
+        context = BenchmarkContext.build()
+        results = [run_scenario(name, context, repeat=1) for name in SCENARIOS]
+        self.assertEqual([result.name for result in results], list(SCENARIOS))
+        baseline = as_rows(results)
+        self.assertEqual(compare(results, baseline, tolerance=0.25), [])
+        baseline[0]['queries'] -= 1
+        self.assertEqual(len(compare(results, baseline, tolerance=0.25)), 1)
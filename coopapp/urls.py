@@ -16,8 +16,12 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/", include("operations.urls")),
+    path("api/", include("jobs.urls")),
+    path("api/", include("transactions.urls")),
+    path("api/", include("common.urls")),
 ]
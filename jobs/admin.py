@@ -0,0 +1,44 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+from .queue import cancel
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id',
+        'name',
+        'status',
+        'progress',
+        'attempts',
+        'run_at',
+        'finished_at',
+        'created_by',
+    )
+    list_filter = ('status', 'name')
+    search_fields = ('name',)
+    list_select_related = ('created_by',)
+    actions = ['requeue', 'cancel_jobs']
+    readonly_fields = [field.name for field in Job._meta.fields]
+
+    def has_add_permission(self, request):
+        # Jobs são criados pelo código (jobs.queue.enqueue), não pelo admin
+        return False
+
+    @admin.action(description='Recolocar na fila')
+    def requeue(self, request, queryset):
+        now = timezone.now()
+        count = queryset.exclude(status=Job.JobStatus.RUNNING).update(
+            status=Job.JobStatus.QUEUED,
+            attempts=0,
+            run_at=now,
+            finished_at=None,
+            updated_at=now,
+        )
+        self.message_user(request, f'{count} jobs recolocados na fila.')
+
+    @admin.action(description='Cancelar jobs na fila')
+    def cancel_jobs(self, request, queryset):
+        self.message_user(request, f'{cancel(queryset)} jobs cancelados.')
@@ -0,0 +1,72 @@
+import os
+import signal
+import socket
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import STALE_TIMEOUT, requeue_stale, run_next
+
+
+class Command(BaseCommand):
+    """
+    Executa os jobs da fila (tabela Job) fora das requisições web
+    """
+
+    help = 'Processa jobs da fila até ser interrompido (SIGINT/SIGTERM) ou com --once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true', help='Sai quando a fila estiver vazia'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='Segundos de espera quando a fila está vazia (padrão: 2)',
+        )
+        parser.add_argument(
+            '--max-jobs', type=int, default=0, help='Sai após N jobs (0 = sem limite)'
+        )
+        parser.add_argument(
+            '--stale-timeout',
+            type=int,
+            default=int(STALE_TIMEOUT.total_seconds()),
+            help='Segundos sem progresso para considerar um job abandonado',
+        )
+        parser.add_argument('--name', default=f'{socket.gethostname()}:{os.getpid()}')
+
+    def handle(self, *args, **options):
+        worker = options['name']
+        stale_timeout = timedelta(seconds=options['stale_timeout'])
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        processed = 0
+        self.stdout.write(f'Worker {worker} iniciado.')
+        while not self.stopping:
+            close_old_connections()
+            requeue_stale(stale_timeout)
+            job = run_next(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            processed += 1
+            self.stdout.write(
+                f'{job} (tentativa {job.attempts}/{job.max_attempts})'
+                + (f'\n{job.error}' if job.error and options['verbosity'] >= 2 else '')
+            )
+            if options['max_jobs'] and processed >= options['max_jobs']:
+                break
+
+        self.stdout.write(f'Worker {worker} finalizado: {processed} jobs executados.')
+
+    def stop(self, signum, frame):
+        # Termina o job atual antes de sair
+        self.stopping = True
@@ -0,0 +1,94 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from users.models import User
+
+
+class JobQuerySet(models.QuerySet):
+    def queued(self):
+        return self.filter(status=Job.JobStatus.QUEUED)
+
+    def running(self):
+        return self.filter(status=Job.JobStatus.RUNNING)
+
+    def ready(self, now=None):
+        """Jobs na fila cujo horário de execução já chegou, na ordem de execução."""
+        return (
+            self.queued().filter(run_at__lte=now or timezone.now()).order_by('run_at', 'pk')
+        )
+
+    def stale(self, timeout, now=None):
+        """Jobs em execução sem sinal do worker há mais de `timeout` (worker morto)."""
+        return self.running().filter(heartbeat_at__lt=(now or timezone.now()) - timeout)
+
+
+class Job(models.Model):
+    """Tarefa longa executada fora da requisição pelo comando run_worker.
+
+    A própria tabela é a fila: não há broker externo. Os handlers são registrados
+    por nome em <app>/jobs.py (ver jobs.registry).
+    """
+
+    class JobStatus(models.TextChoices):
+        QUEUED = 'QUEUED', 'Na fila'
+        RUNNING = 'RUNNING', 'Em execução'
+        SUCCEEDED = 'SUCCEEDED', 'Concluído'
+        FAILED = 'FAILED', 'Falhou'
+        CANCELLED = 'CANCELLED', 'Cancelado'
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=20, choices=JobStatus.choices, default=JobStatus.QUEUED
+    )
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Audit fields
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='created_jobs'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        indexes = [
+            # Consulta do worker: próximos jobs na fila por horário
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'Job #{self.pk}:{self.name}-{self.get_status_display()}'
+
+    @property
+    def is_finished(self):
+        return self.status in [
+            Job.JobStatus.SUCCEEDED,
+            Job.JobStatus.FAILED,
+            Job.JobStatus.CANCELLED,
+        ]
+
+    def set_progress(self, progress, message=''):
+        """Registra o progresso (0-100) sem sobrescrever os demais campos do job."""
+        self.progress = max(0, min(int(progress), 100))
+        self.progress_message = message[:255]
+        self.heartbeat_at = timezone.now()
+        Job.objects.filter(pk=self.pk, status=Job.JobStatus.RUNNING).update(
+            progress=self.progress,
+            progress_message=self.progress_message,
+            heartbeat_at=self.heartbeat_at,
+            updated_at=self.heartbeat_at,
+        )
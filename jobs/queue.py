@@ -0,0 +1,130 @@
+"""Fila de jobs sobre a tabela Job, sem broker externo.
+
+A reserva de um job é um UPDATE condicional (status QUEUED -> RUNNING): se dois
+workers disputam a mesma linha, apenas um UPDATE afeta uma linha, tanto no SQLite
+quanto no Postgres. Falhas voltam para a fila com espera exponencial até
+max_attempts; jobs de workers que morreram são devolvidos por requeue_stale().
+"""
+
+import traceback
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_handler
+
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+STALE_TIMEOUT = timedelta(minutes=10)
+
+
+def enqueue(name, payload=None, user=None, run_at=None, max_attempts=3):
+    """Coloca um job na fila; o nome precisa ter um handler registrado."""
+    get_handler(name)
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        created_by=user,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def backoff(attempts):
+    """Espera antes da próxima tentativa: 30s, 1min, 2min... limitada a 1h."""
+    return min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+
+
+def claim(worker, now=None):
+    """Reserva o próximo job pronto para `worker`, ou retorna None se não houver."""
+    now = now or timezone.now()
+    for pk in Job.objects.ready(now).values_list('pk', flat=True)[:10]:
+        claimed = Job.objects.filter(pk=pk, status=Job.JobStatus.QUEUED).update(
+            status=Job.JobStatus.RUNNING,
+            worker=worker,
+            attempts=models.F('attempts') + 1,
+            progress=0,
+            progress_message='',
+            started_at=now,
+            heartbeat_at=now,
+            updated_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def _finish(job, **fields):
+    # Só grava se o job ainda pertence a este worker (requeue_stale pode tê-lo tomado)
+    now = timezone.now()
+    fields.setdefault('finished_at', now)
+    Job.objects.filter(pk=job.pk, status=Job.JobStatus.RUNNING, worker=job.worker).update(
+        updated_at=now, **fields
+    )
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+
+def execute(job):
+    """Executa um job já reservado e grava o resultado ou a falha."""
+    try:
+        handler = get_handler(job.name)
+        result = handler(job)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            _finish(
+                job,
+                status=Job.JobStatus.QUEUED,
+                error=error,
+                run_at=timezone.now() + backoff(job.attempts),
+                finished_at=None,
+            )
+        else:
+            _finish(job, status=Job.JobStatus.FAILED, error=error)
+    else:
+        _finish(
+            job,
+            status=Job.JobStatus.SUCCEEDED,
+            result=result,
+            error='',
+            progress=100,
+        )
+    return job
+
+
+def run_next(worker):
+    """Reserva e executa um job; retorna o job executado ou None se a fila está vazia."""
+    job = claim(worker)
+    if job is None:
+        return None
+    return execute(job)
+
+
+def requeue_stale(timeout=STALE_TIMEOUT):
+    """Devolve à fila (ou marca como falhos) jobs de workers que pararam de responder."""
+    now = timezone.now()
+    stale = Job.objects.stale(timeout, now)
+    requeued = stale.filter(attempts__lt=models.F('max_attempts')).update(
+        status=Job.JobStatus.QUEUED,
+        error='Worker interrompido durante a execução',
+        run_at=now,
+        updated_at=now,
+    )
+    failed = stale.update(
+        status=Job.JobStatus.FAILED,
+        error='Worker interrompido durante a execução',
+        finished_at=now,
+        updated_at=now,
+    )
+    return requeued + failed
+
+
+def cancel(queryset):
+    """Cancela os jobs ainda na fila; jobs em execução não são interrompidos."""
+    now = timezone.now()
+    return queryset.queued().update(
+        status=Job.JobStatus.CANCELLED, finished_at=now, updated_at=now
+    )
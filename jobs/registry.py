@@ -0,0 +1,35 @@
+"""Registro dos handlers de job por nome.
+
+Os handlers ficam em <app>/jobs.py (carregados por JobsConfig.ready) e recebem o Job
+em execução; o valor retornado é gravado em Job.result:
+
+    @job('operations.recalculate')
+    def recalculate_job(job):
+        job.set_progress(50, 'Calculando')
+        return {...}
+"""
+
+_handlers = {}
+
+
+def job(name):
+    """Registra a função decorada como handler do job `name`."""
+
+    def register(func):
+        if name in _handlers and _handlers[name] is not func:
+            raise ValueError(f'Job "{name}" já registrado')
+        _handlers[name] = func
+        return func
+
+    return register
+
+
+def get_handler(name):
+    try:
+        return _handlers[name]
+    except KeyError:
+        raise ValueError(f'Job "{name}" não registrado') from None
+
+
+def registered():
+    return sorted(_handlers)
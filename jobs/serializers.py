@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+
+    class Meta:
+        model = Job
+        fields = [
+            'id',
+            'name',
+            'status',
+            'status_display',
+            'progress',
+            'progress_message',
+            'result',
+            'error',
+            'attempts',
+            'max_attempts',
+            'run_at',
+            'started_at',
+            'finished_at',
+            'created_at',
+        ]
+        read_only_fields = fields
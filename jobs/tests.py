@@ -0,0 +1,143 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from catalog.models import Client, Product
+from operations.models import Distribution, Offer, Order
+from users.models import User
+
+from .models import Job
+from .queue import backoff, cancel, claim, enqueue, execute, requeue_stale, run_next
+from .registry import job
+
+calls = []
+
+
+@job('tests.echo')
+def echo_job(job):
+    calls.append(job.pk)
+    if job.payload.get('fail'):
+        raise RuntimeError('falhou')
+    job.set_progress(50, 'Metade')
+    return {'echo': job.payload.get('value')}
+
+
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_claim_and_execute(self):
+        later = enqueue('tests.echo', {'value': 2}, run_at=timezone.now() + timedelta(1))
+        first = enqueue('tests.echo', {'value': 1})
+
+        claimed = claim('worker-1')
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual(claimed.status, Job.JobStatus.RUNNING)
+        self.assertEqual(claimed.attempts, 1)
+        # O job reservado não pode ser reservado de novo; o outro ainda não venceu
+        self.assertIsNone(claim('worker-2'))
+
+        execute(claimed)
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.JobStatus.SUCCEEDED)
+        self.assertEqual(first.result, {'echo': 1})
+        self.assertEqual(first.progress, 100)
+        self.assertIsNone(run_next('worker-1'))
+        later.refresh_from_db()
+        self.assertEqual(later.status, Job.JobStatus.QUEUED)
+
+    def test_double_claim_only_one_wins(self):
+        queued = enqueue('tests.echo')
+        # Outro worker reservou a linha entre a leitura e o UPDATE condicional
+        Job.objects.filter(pk=queued.pk).update(status=Job.JobStatus.RUNNING)
+        self.assertIsNone(claim('worker-2'))
+
+    def test_retry_with_backoff_then_fail(self):
+        failing = enqueue('tests.echo', {'fail': True}, max_attempts=2)
+        run_next('worker-1')
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, Job.JobStatus.QUEUED)
+        self.assertIn('RuntimeError', failing.error)
+        self.assertGreater(failing.run_at, timezone.now() + backoff(1) - timedelta(5))
+
+        self.assertIsNone(run_next('worker-1'))
+        execute(claim('worker-1', now=failing.run_at))
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, Job.JobStatus.FAILED)
+        self.assertEqual(failing.attempts, 2)
+        self.assertEqual(backoff(3), backoff(1) * 4)
+        self.assertEqual(backoff(30), timedelta(hours=1))
+
+    def test_requeue_stale(self):
+        stale = enqueue('tests.echo')
+        exhausted = enqueue('tests.echo', max_attempts=1)
+        alive = enqueue('tests.echo')
+        for _ in range(3):
+            claim('worker-1')
+        Job.objects.exclude(pk=alive.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=11)
+        )
+
+        self.assertEqual(requeue_stale(), 2)
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[stale.pk], Job.JobStatus.QUEUED)
+        self.assertEqual(statuses[exhausted.pk], Job.JobStatus.FAILED)
+        self.assertEqual(statuses[alive.pk], Job.JobStatus.RUNNING)
+
+        # O worker antigo não sobrescreve o job devolvido à fila
+        execute(Job.objects.get(pk=stale.pk))
+        self.assertEqual(Job.objects.get(pk=stale.pk).status, Job.JobStatus.QUEUED)
+
+    def test_cancel_only_queued(self):
+        queued = enqueue('tests.echo')
+        running = enqueue('tests.echo')
+        Job.objects.filter(pk=running.pk).update(status=Job.JobStatus.RUNNING)
+        self.assertEqual(cancel(Job.objects.all()), 1)
+        self.assertEqual(Job.objects.get(pk=queued.pk).status, Job.JobStatus.CANCELLED)
+        self.assertIsNone(run_next('worker-1'))
+        self.assertEqual(calls, [])
+
+    def test_unknown_job(self):
+        with self.assertRaises(ValueError):
+            enqueue('tests.unknown')
+
+
+class DistributionJobTests(TestCase):
+    def test_recalculate_reports_progress_per_product(self):
+        client = Client.objects.create(name='Escola')
+        cooperated = User.objects.create_user('produtor', full_name='Produtor')
+        products = []
+        for name in ('Alface', 'Couve'):
+            product = Product.objects.create(
+                name=name, production_time=1, default_purchase_value=2, shelf_life=5
+            )
+            products.append(product)
+            Order.objects.create(
+                client=client,
+                product=product,
+                quantity=5,
+                unit_price=1,
+                total_value=5,
+                delivery_date=timezone.now().date() + timedelta(days=5),
+            )
+            Offer.objects.create(
+                product=product,
+                cooperated=cooperated,
+                quantity=5,
+                start_date=timezone.now().date(),
+                end_date=timezone.now().date() + timedelta(days=10),
+            )
+        offer = Offer.objects.get(product=products[1])
+
+        for name in ('operations.plan', 'operations.recalculate'):
+            queued = enqueue(name, {'products': [products[0].pk], 'offers': [offer.pk]})
+            with mock.patch.object(Job, 'set_progress', autospec=True) as set_progress:
+                run_next('worker-1')
+            queued.refresh_from_db()
+            self.assertEqual(queued.status, Job.JobStatus.SUCCEEDED, queued.error)
+            self.assertEqual([c.args[1] for c in set_progress.call_args_list], [50, 100])
+
+        self.assertEqual(queued.result['created'], 2)
+        self.assertEqual(Distribution.objects.count(), 2)
@@ -0,0 +1,19 @@
+from rest_framework.generics import RetrieveAPIView
+
+from common.mixins import ConditionalGetMixin
+from users.permissions import IsCoopAdmin
+
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobStatusView(ConditionalGetMixin, RetrieveAPIView):
+    """
+    Status, progresso e resultado de um job.
+
+    GET /api/jobs/<id>/ (com If-None-Match, o polling recebe 304 até o job mudar)
+    """
+
+    permission_classes = [IsCoopAdmin]
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
@@ -1,18 +1,132 @@
+from django import forms
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.forms.models import BaseInlineFormSet, InlineForeignKeyField, construct_instance
+
+from jobs.queue import enqueue
 
 from .models import Distribution, Offer, Order
+from .services import (
+    create_offers,
+    recalculate,
+    shifted_offers,
+    validate_distributions,
+)
+
+
+class DistributionInlineForm(forms.ModelForm):
+    """Linha do inline; com batch_validated, as regras de negócio ficam para o formset.
+
+    Distribution.clean() e a restrição order_offer_unique consultam pedido, oferta e
+    produto por linha; validate_distributions verifica o mesmo para o lote inteiro.
+    Aqui sobram apenas as validações dos campos.
+    """
+
+    def __init__(self, *args, batch_validated=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batch_validated = batch_validated
+
+    def _post_clean(self):
+        if not self.batch_validated:
+            super()._post_clean()
+            return
+        exclude = self._get_validation_exclusions()
+        for name, field in self.fields.items():
+            # Chaves já resolvidas pelo ModelChoiceField não são consultadas de novo
+            if isinstance(field, (InlineForeignKeyField, forms.ModelChoiceField)):
+                exclude.add(name)
+        try:
+            self.instance = construct_instance(
+                self, self.instance, self._meta.fields, self._meta.exclude
+            )
+            self.instance.clean_fields(exclude=exclude)
+        except ValidationError as e:
+            self._update_errors(e)
+
+
+class DistributionInlineFormSet(BaseInlineFormSet):
+    """Valida todas as linhas do inline juntas, considerando o efeito acumulado."""
+
+    def get_form_kwargs(self, index):
+        kwargs = super().get_form_kwargs(index)
+        # Pai ainda não gravado: as linhas são validadas uma a uma (ver clean())
+        kwargs['batch_validated'] = self.instance.pk is not None
+        return kwargs
+
+    def clean(self):
+        super().clean()
+        if self.instance.pk is None:
+            # Pai ainda não gravado: Distribution.clean() por linha já basta
+            return
+        forms = []
+        deleted = []
+        for form in self.forms:
+            if not hasattr(form, 'cleaned_data') or form.errors:
+                continue
+            if self.can_delete and self._should_delete_form(form):
+                deleted.append(form.instance)
+            elif form.has_changed():
+                forms.append(form)
+        errors = validate_distributions([form.instance for form in forms], deleted)
+        for index, messages in errors.items():
+            for message in messages:
+                forms[index].add_error(None, message)
 
 
 class DistributionInline(admin.TabularInline):
     """Mostra distribuições diretamente no admin de Order ou Offer."""
 
     model = Distribution
+    form = DistributionInlineForm
+    formset = DistributionInlineFormSet
     extra = 0
     fields = ('offer', 'quantity', 'source', 'created_by', 'updated_by', 'updated_at')
     readonly_fields = ('created_at', 'updated_at')
     autocomplete_fields = ('offer', 'created_by', 'updated_by')
 
 
+@admin.action(description='Recalcular distribuições automáticas')
+def recalculate_distributions(modeladmin, request, queryset):
+    if queryset.model is Order:
+        diff = recalculate(orders=queryset, user=request.user)
+    else:
+        diff = recalculate(offers=queryset, user=request.user)
+    modeladmin.message_user(
+        request,
+        f'{len(diff.created)} distribuições criadas, {len(diff.updated)} alteradas e '
+        f'{len(diff.deleted)} removidas.',
+    )
+
+
+@admin.action(description='Recalcular distribuições automáticas em segundo plano')
+def recalculate_distributions_in_background(modeladmin, request, queryset):
+    key = 'orders' if queryset.model is Order else 'offers'
+    job = enqueue(
+        'operations.recalculate',
+        {key: list(queryset.values_list('pk', flat=True))},
+        user=request.user,
+    )
+    modeladmin.message_user(request, f'Recálculo agendado: job #{job.pk}.')
+
+
+@admin.action(description='Duplicar para a próxima semana')
+def duplicate_offers_next_week(modeladmin, request, queryset):
+    offers = list(queryset.order_by('pk'))
+    try:
+        created = create_offers(shifted_offers(offers), user=request.user)
+    except ValidationError as exc:
+        for index, errors in exc.message_dict.items():
+            source = offers[int(index)]
+            modeladmin.message_user(
+                request, f'Oferta #{source.pk}: {" ".join(errors)}', level='error'
+            )
+        modeladmin.message_user(request, 'Nenhuma oferta foi duplicada.', level='warning')
+        return
+    modeladmin.message_user(
+        request, f'{len(created)} ofertas criadas para a próxima semana.'
+    )
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     list_display = (
@@ -20,6 +134,7 @@ class OrderAdmin(admin.ModelAdmin):
         'client',
         'product',
         'quantity',
+        'allocated_quantity',
         'status',
         'delivery_date',
         'created_by',
@@ -29,8 +144,9 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ('client__name', 'product__name')
     date_hierarchy = 'delivery_date'
     inlines = [DistributionInline]
+    actions = [recalculate_distributions, recalculate_distributions_in_background]
     autocomplete_fields = ('client', 'product', 'created_by', 'updated_by')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('allocated_quantity', 'created_at', 'updated_at')
 
     def save_model(self, request, obj, form, change):
         if not change and not obj.created_by_id:
@@ -47,6 +163,7 @@ class OfferAdmin(admin.ModelAdmin):
         'product',
         'cooperated',
         'quantity',
+        'allocated_quantity',
         'status',
         'start_date',
         'end_date',
@@ -56,8 +173,13 @@ class OfferAdmin(admin.ModelAdmin):
     search_fields = ('product__name', 'cooperated__full_name')
     date_hierarchy = 'start_date'
     inlines = [DistributionInline]
+    actions = [
+        recalculate_distributions,
+        recalculate_distributions_in_background,
+        duplicate_offers_next_week,
+    ]
     autocomplete_fields = ('product', 'cooperated', 'created_by', 'updated_by')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('allocated_quantity', 'created_at', 'updated_at')
 
     def save_model(self, request, obj, form, change):
         if not change and not obj.created_by_id:
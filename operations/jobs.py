@@ -0,0 +1,92 @@
+"""Jobs de distribuição executados pelo worker (ver jobs.registry).
+
+Os jobs trabalham um produto por vez e registram o progresso a cada produto, o que
+também mantém o heartbeat do job (ver jobs.queue.requeue_stale).
+"""
+
+from collections import defaultdict
+
+from jobs.registry import job
+
+from .models import Offer, Order
+from .services import (
+    ALLOCATORS,
+    DistributionDiff,
+    DistributionPlan,
+    allocate,
+    plan_distributions,
+    recalculate,
+)
+
+DIFF_FIELDS = ('orders', 'offers', 'created', 'updated', 'deleted', 'unchanged')
+
+
+def _seeds_by_product(payload):
+    """Sementes do payload agrupadas por produto.
+
+    Os conjuntos recalculados nunca misturam produtos, então cada grupo pode ser
+    resolvido separadamente.
+    """
+    seeds = defaultdict(lambda: {'orders': [], 'offers': [], 'products': []})
+    for product_id in payload.get('products', []):
+        seeds[product_id]['products'].append(product_id)
+    for key, model in (('orders', Order), ('offers', Offer)):
+        rows = model.objects.filter(pk__in=payload.get(key, [])).values_list(
+            'pk', 'product_id'
+        )
+        for pk, product_id in rows:
+            seeds[product_id][key].append(pk)
+    return sorted(seeds.items())
+
+
+def _run_by_product(job, func):
+    """Chama func(**sementes, allocator=...) por produto, registrando o progresso."""
+    allocator = ALLOCATORS[job.payload.get('method', 'greedy')]
+    groups = _seeds_by_product(job.payload)
+    results = []
+    for position, (product_id, seeds) in enumerate(groups, start=1):
+        results.append(func(allocator=allocator, **seeds))
+        job.set_progress(position * 100 // len(groups), f'Produto #{product_id}')
+    return results
+
+
+@job('operations.allocate')
+def allocate_job(job):
+    """Distribui automaticamente os produtos do payload (padrão: todos pendentes)."""
+    products = job.payload.get('products') or list(
+        Order.objects.pending().order_by().values_list('product_id', flat=True).distinct()
+    )
+    allocator = ALLOCATORS[job.payload.get('method', 'greedy')]
+    created = 0
+    for position, product_id in enumerate(products, start=1):
+        created += len(allocate(product_id, user=job.created_by, allocator=allocator))
+        job.set_progress(position * 100 // len(products), f'Produto #{product_id}')
+    return {'products': len(products), 'created': created}
+
+
+@job('operations.recalculate')
+def recalculate_job(job):
+    diffs = _run_by_product(job, lambda **seeds: recalculate(user=job.created_by, **seeds))
+    return {
+        'orders': sum(len(diff.orders) for diff in diffs),
+        'offers': sum(len(diff.offers) for diff in diffs),
+        'created': sum(len(diff.created) for diff in diffs),
+        'changed': sum(len(diff.updated) for diff in diffs),
+        'removed': sum(len(diff.deleted) for diff in diffs),
+    }
+
+
+@job('operations.plan')
+def plan_job(job):
+    plans = _run_by_product(job, plan_distributions)
+    diff = DistributionDiff(
+        **{
+            name: [row for plan in plans for row in getattr(plan.diff, name)]
+            for name in DIFF_FIELDS
+        }
+    )
+    return DistributionPlan(
+        diff=diff,
+        orders=[change for plan in plans for change in plan.orders],
+        offers=[change for plan in plans for change in plan.offers],
+    ).as_dict()
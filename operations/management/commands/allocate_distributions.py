@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from operations.models import Order
+from operations.services import ALLOCATORS, allocate
+
+
+class Command(BaseCommand):
+    """
+    Gera distribuições automáticas para os pedidos pendentes
+    """
+
+    help = 'Distribui automaticamente as ofertas disponíveis entre os pedidos pendentes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--product',
+            type=int,
+            action='append',
+            dest='products',
+            help='ID do produto (pode ser repetido). Padrão: todos com pedidos pendentes',
+        )
+        parser.add_argument(
+            '--method',
+            choices=sorted(ALLOCATORS),
+            default='greedy',
+            help='greedy (primeiras ofertas primeiro) ou optimal (custo mínimo)',
+        )
+
+    def handle(self, *args, **options):
+        products = options.get('products')
+        if not products:
+            products = (
+                Order.objects.pending()
+                .order_by()
+                .values_list('product_id', flat=True)
+                .distinct()
+            )
+
+        allocator = ALLOCATORS[options['method']]
+        total = 0
+        for product_id in products:
+            created = allocate(product_id, allocator=allocator)
+            total += len(created)
+            if options.get('verbosity', 1) >= 2:
+                self.stdout.write(f'Produto #{product_id}: {len(created)} distribuições')
+
+        self.stdout.write(f'{total} distribuições automáticas criadas.')
@@ -0,0 +1,81 @@
+import json
+
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+
+from operations.services import ALLOCATORS, plan_distributions
+
+
+class Command(BaseCommand):
+    """
+    Mostra o que o recálculo de distribuições mudaria, sem gravar nada
+    """
+
+    help = (
+        'Calcula em memória as distribuições AUTO/SEMI_AUTO propostas para os pedidos, '
+        'ofertas ou produtos informados e mostra a diferença para as atuais.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--order', type=int, action='append', dest='orders', default=[])
+        parser.add_argument('--offer', type=int, action='append', dest='offers', default=[])
+        parser.add_argument(
+            '--product', type=int, action='append', dest='products', default=[]
+        )
+        parser.add_argument(
+            '--method',
+            choices=sorted(ALLOCATORS),
+            default='greedy',
+            help='greedy (primeiras ofertas primeiro) ou optimal (custo mínimo)',
+        )
+        parser.add_argument(
+            '--json', action='store_true', help='Imprime o plano completo em JSON'
+        )
+
+    def handle(self, *args, **options):
+        orders = options['orders']
+        offers = options['offers']
+        products = options['products']
+        if not (orders or offers or products):
+            raise CommandError('Informe ao menos um --order, --offer ou --product.')
+
+        plan = plan_distributions(
+            orders=orders,
+            offers=offers,
+            products=products,
+            allocator=ALLOCATORS[options['method']],
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(plan.as_dict(), indent=2, ensure_ascii=False))
+            return
+
+        data = plan.as_dict()
+        summary = data['summary']
+        self.stdout.write(
+            f'{summary["orders"]} pedidos e {summary["offers"]} ofertas analisados: '
+            f'{summary["created"]} distribuições novas, {summary["changed"]} alteradas, '
+            f'{summary["removed"]} removidas, {summary["unchanged"]} sem mudança.'
+        )
+        if options.get('verbosity', 1) < 2:
+            return
+
+        for row in data['created']:
+            self.stdout.write(
+                f'+ pedido #{row["order"]} <- oferta #{row["offer"]}: {row["quantity"]}'
+            )
+        for row in data['changed']:
+            self.stdout.write(
+                f'~ pedido #{row["order"]} <- oferta #{row["offer"]}: '
+                f'{row["quantity_before"]} -> {row["quantity_after"]}'
+            )
+        for row in data['removed']:
+            self.stdout.write(
+                f'- pedido #{row["order"]} <- oferta #{row["offer"]}: {row["quantity"]}'
+            )
+        for label, rows in (('Pedido', data['orders']), ('Oferta', data['offers'])):
+            for row in rows:
+                if row['fill_before'] != row['fill_after']:
+                    self.stdout.write(
+                        f'{label} #{row["id"]}: {row["fill_before"]}% -> '
+                        f'{row["fill_after"]}%'
+                    )
@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+
+from operations.models import Offer, Order
+from operations.models.distribution import rebuild_allocated_quantities
+
+
+def _mismatches(model):
+    """IDs cujo allocated_quantity difere da soma real das distribuições."""
+    return list(
+        model.objects.annotate(
+            actual=Coalesce(
+                models.Sum('distributions__quantity'),
+                models.Value(Decimal(0)),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            )
+        )
+        .exclude(allocated_quantity=models.F('actual'))
+        .values_list('pk', flat=True)
+    )
+
+
+class Command(BaseCommand):
+    """
+    Verifica e reconstrói Order/Offer.allocated_quantity a partir das distribuições
+    """
+
+    help = 'Verifica e reconstrói as quantidades distribuídas de pedidos e ofertas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Apenas verifica; falha se houver divergências',
+        )
+
+    def handle(self, *args, **options):
+        orders = _mismatches(Order)
+        offers = _mismatches(Offer)
+        self.stdout.write(
+            f'{len(orders)} pedidos e {len(offers)} ofertas com quantidade divergente.'
+        )
+
+        if options.get('check'):
+            if orders or offers:
+                raise CommandError('Quantidades distribuídas inconsistentes.')
+            return
+
+        with transaction.atomic():
+            order_count, offer_count = rebuild_allocated_quantities()
+        self.stdout.write(
+            f'{order_count} pedidos e {offer_count} ofertas recalculados com sucesso.'
+        )
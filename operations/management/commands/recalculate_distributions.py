@@ -0,0 +1,47 @@
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+
+from operations.services import ALLOCATORS, recalculate
+
+
+class Command(BaseCommand):
+    """
+    Recalcula as distribuições automáticas afetadas por pedidos ou ofertas
+    """
+
+    help = (
+        'Recalcula as distribuições AUTO/SEMI_AUTO ligadas aos pedidos, ofertas ou '
+        'produtos informados, mantendo as distribuições manuais.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--order', type=int, action='append', dest='orders', default=[])
+        parser.add_argument('--offer', type=int, action='append', dest='offers', default=[])
+        parser.add_argument(
+            '--product', type=int, action='append', dest='products', default=[]
+        )
+        parser.add_argument(
+            '--method',
+            choices=sorted(ALLOCATORS),
+            default='greedy',
+            help='greedy (primeiras ofertas primeiro) ou optimal (custo mínimo)',
+        )
+
+    def handle(self, *args, **options):
+        orders = options['orders']
+        offers = options['offers']
+        products = options['products']
+        if not (orders or offers or products):
+            raise CommandError('Informe ao menos um --order, --offer ou --product.')
+
+        diff = recalculate(
+            orders=orders,
+            offers=offers,
+            products=products,
+            allocator=ALLOCATORS[options['method']],
+        )
+        self.stdout.write(
+            f'{len(diff.orders)} pedidos e {len(diff.offers)} ofertas recalculados: '
+            f'{len(diff.created)} distribuições criadas, {len(diff.updated)} alteradas, '
+            f'{len(diff.deleted)} removidas.'
+        )
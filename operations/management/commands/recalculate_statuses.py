@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from operations.models.distribution import recalculate_statuses
+
+
+class Command(BaseCommand):
+    """
+    Recalcula o status de distribuição de pedidos e ofertas
+    """
+
+    help = 'Recalcula os status de pedidos e ofertas a partir das quantidades distribuídas.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            orders, offers = recalculate_statuses()
+        self.stdout.write(f'{orders} pedidos e {offers} ofertas tiveram o status alterado.')
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:37
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def populate_allocated_quantity(apps, schema_editor):
+    Distribution = apps.get_model("operations", "Distribution")
+    for model_name, field in (("Order", "order"), ("Offer", "offer")):
+        model = apps.get_model("operations", model_name)
+        model.objects.update(
+            allocated_quantity=Coalesce(
+                models.Subquery(
+                    Distribution.objects.filter(**{field: models.OuterRef("pk")})
+                    .order_by()
+                    .values(field)
+                    .annotate(total=models.Sum("quantity"))
+                    .values("total")
+                ),
+                models.Value(Decimal(0)),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("operations", "0002_distribution_notes_alter_distribution_created_by_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="offer",
+            name="allocated_quantity",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=10
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="allocated_quantity",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=10
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="total_value",
+            field=models.DecimalField(
+                blank=True, decimal_places=2, default=0, editable=False, max_digits=10
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="unit_price",
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_allocated_quantity, migrations.RunPython.noop),
+    ]
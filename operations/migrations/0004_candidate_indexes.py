@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("operations", "0003_allocated_quantity"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="offer",
+            index=models.Index(
+                fields=["product", "status", "start_date", "end_date"],
+                name="offer_product_window_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["product", "status", "delivery_date"],
+                name="order_product_delivery_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("operations", "0004_candidate_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="distribution",
+            index=models.Index(
+                fields=["created_at", "id"], name="distribution_created_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="offer",
+            index=models.Index(fields=["created_at", "id"], name="offer_created_at_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["delivery_date", "id"], name="order_delivery_date_id_idx"
+            ),
+        ),
+    ]
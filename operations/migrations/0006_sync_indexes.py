@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("operations", "0005_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="distribution",
+            index=models.Index(
+                fields=["updated_at", "id"], name="distribution_updated_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="offer",
+            index=models.Index(fields=["updated_at", "id"], name="offer_updated_at_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["updated_at", "id"], name="order_updated_at_id_idx"),
+        ),
+    ]
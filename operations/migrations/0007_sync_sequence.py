@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("catalog", "0004_sync_sequence"),
+        ("operations", "0006_sync_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="distribution",
+            options={
+                "base_manager_name": "objects",
+                "verbose_name": "Distribuição",
+                "verbose_name_plural": "Distribuições",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="offer",
+            options={
+                "base_manager_name": "objects",
+                "verbose_name": "Oferta",
+                "verbose_name_plural": "Ofertas",
+            },
+        ),
+        migrations.AlterModelOptions(
+            name="order",
+            options={
+                "base_manager_name": "objects",
+                "ordering": ["delivery_date"],
+                "verbose_name": "Pedido",
+                "verbose_name_plural": "Pedidos",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="distribution",
+            name="distribution_updated_at_id_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="offer",
+            name="offer_updated_at_id_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="order",
+            name="order_updated_at_id_idx",
+        ),
+        migrations.AddField(
+            model_name="distribution",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="offer",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="sync_sequence",
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="distribution",
+            index=models.Index(
+                fields=["sync_sequence", "id"], name="distribution_sync_seq_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="offer",
+            index=models.Index(
+                fields=["sync_sequence", "id"], name="offer_sync_seq_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["sync_sequence", "id"], name="order_sync_seq_id_idx"
+            ),
+        ),
+    ]
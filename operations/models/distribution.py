@@ -1,13 +1,154 @@
+from collections import defaultdict
+from decimal import Decimal
+
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
+from common.generations import bump
+from common.models import SyncedModel, SyncedQuerySet
+from operations.signals import distributions_changed, send_on_commit
 from users.models import User
 
 from .offer import Offer
 from .order import Order
 
+ALLOCATION_FIELDS = {'quantity', 'order', 'order_id', 'offer', 'offer_id'}
+
+
+def _apply_deltas(model, deltas):
+    deltas = {pk: delta for pk, delta in deltas.items() if pk is not None and delta}
+    if not deltas:
+        return
+    output_field = model._meta.get_field('allocated_quantity')
+    items = list(deltas.items())
+    # update() não aciona auto_now; updated_at é gravado junto para os validadores
+    # de cache (ETag/Last-Modified) da API perceberem a mudança
+    now = timezone.now()
+    for start in range(0, len(items), 500):
+        chunk = items[start : start + 500]
+        model.objects.filter(pk__in=[pk for pk, _ in chunk]).update(
+            allocated_quantity=models.F('allocated_quantity')
+            + models.Case(
+                *[models.When(pk=pk, then=models.Value(delta)) for pk, delta in chunk],
+                default=models.Value(Decimal(0)),
+                output_field=output_field,
+            ),
+            updated_at=now,
+        )
+
+
+def recalculate_statuses(order_ids=None, offer_ids=None):
+    """Recalcula o status de pedidos e ofertas (None = todos)."""
+    orders = Order.objects.all()
+    offers = Offer.objects.all()
+    if order_ids is not None:
+        orders = orders.filter(pk__in=order_ids)
+    if offer_ids is not None:
+        offers = offers.filter(pk__in=offer_ids)
+    # allocated_quantity e status mudam por update(), sem post_save
+    bump(Order, Offer)
+    return orders.recalculate_status(), offers.recalculate_status()
+
+
+def apply_allocation_deltas(order_deltas, offer_deltas):
+    """Soma deltas a Order/Offer.allocated_quantity com um UPDATE por modelo.
+
+    Em seguida recalcula o status dos pedidos e ofertas afetados. Todos os caminhos
+    de escrita das distribuições passam por aqui ou por rebuild_allocated_quantities,
+    que trocam as gerações do cache de respostas (common.generations).
+    """
+    order_ids = [pk for pk, delta in order_deltas.items() if pk is not None and delta]
+    offer_ids = [pk for pk, delta in offer_deltas.items() if pk is not None and delta]
+    _apply_deltas(Order, order_deltas)
+    _apply_deltas(Offer, offer_deltas)
+    bump(Distribution)
+    if order_ids or offer_ids:
+        recalculate_statuses(order_ids, offer_ids)
+        send_on_commit(distributions_changed, Distribution, offer_ids=offer_ids)
+
+
+def load_original_allocations(distributions):
+    """Carrega os valores contabilizados das distribuições lidas com only()/defer().
 
-class DistributionQuerySet(models.QuerySet):
+    Uma consulta para todas as instâncias que não trouxeram order, offer e quantity;
+    nenhuma se todas já os conhecem.
+    """
+    pending = {
+        d.pk: d for d in distributions if d.pk is not None and not d._allocation_loaded
+    }
+    if not pending:
+        return
+    rows = Distribution.objects.filter(pk__in=pending).values_list(
+        'pk', 'order_id', 'offer_id', 'quantity'
+    )
+    for pk, order_id, offer_id, quantity in rows:
+        distribution = pending[pk]
+        distribution._original_order_id = order_id
+        distribution._original_offer_id = offer_id
+        distribution._original_quantity = quantity
+        distribution._allocation_loaded = True
+
+
+def _allocation_deltas(rows, sign=1):
+    order_deltas = defaultdict(Decimal)
+    offer_deltas = defaultdict(Decimal)
+    for order_id, offer_id, quantity in rows:
+        order_deltas[order_id] += sign * quantity
+        offer_deltas[offer_id] += sign * quantity
+    return order_deltas, offer_deltas
+
+
+def _allocated_subquery(field):
+    return Coalesce(
+        models.Subquery(
+            Distribution.objects.filter(**{field: models.OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=models.Sum('quantity'))
+            .values('total')
+        ),
+        models.Value(Decimal(0)),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def _rebuild_fields(field):
+    allocated = _allocated_subquery(field)
+    return {
+        'allocated_quantity': allocated,
+        # Só linhas cujo valor muda têm updated_at alterado
+        'updated_at': models.Case(
+            models.When(allocated_quantity=allocated, then=models.F('updated_at')),
+            default=models.Value(timezone.now()),
+        ),
+    }
+
+
+def rebuild_allocated_quantities(order_ids=None, offer_ids=None):
+    """Recalcula allocated_quantity a partir das distribuições (None = todos)."""
+    orders = Order.objects.all()
+    offers = Offer.objects.all()
+    if order_ids is not None:
+        orders = orders.filter(pk__in=order_ids)
+    if offer_ids is not None:
+        offers = offers.filter(pk__in=offer_ids)
+    counts = (
+        orders.update(**_rebuild_fields('order')),
+        offers.update(**_rebuild_fields('offer')),
+    )
+    recalculate_statuses(order_ids, offer_ids)
+    bump(Distribution)
+    send_on_commit(
+        distributions_changed,
+        Distribution,
+        offer_ids=None if offer_ids is None else list(offer_ids),
+    )
+    return counts
+
+
+class DistributionQuerySet(SyncedQuerySet):
     def by_order(self, order):
         return self.filter(order=order)
 
@@ -46,8 +187,100 @@ class DistributionQuerySet(models.QuerySet):
             updated_by=user, source=Distribution.DistributionSource.SEMI_AUTO
         )
 
+    # Os caminhos em massa abaixo mantêm Order/Offer.allocated_quantity consistentes.
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            if kwargs.get('ignore_conflicts') or kwargs.get('update_conflicts'):
+                # Não há como saber quais linhas foram de fato gravadas
+                rebuild_allocated_quantities(
+                    {obj.order_id for obj in objs}, {obj.offer_id for obj in objs}
+                )
+            else:
+                apply_allocation_deltas(
+                    *_allocation_deltas(
+                        (obj.order_id, obj.offer_id, obj.quantity) for obj in objs
+                    )
+                )
+        for obj in created:
+            obj._remember_allocation()
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = set(fields)
+        with transaction.atomic(using=self.db):
+            if ALLOCATION_FIELDS.intersection(fields):
+                load_original_allocations(objs)
+            # Sem o update() sobrescrito abaixo, que recalcularia tudo de novo
+            result = SyncedQuerySet(self.model, using=self.db).bulk_update(
+                objs, fields, *args, **kwargs
+            )
+            if not ALLOCATION_FIELDS.intersection(fields):
+                bump(Distribution)
+            else:
+                order_deltas = defaultdict(Decimal)
+                offer_deltas = defaultdict(Decimal)
+                for obj in objs:
+                    if obj._original_order_id is None:
+                        continue
+                    # Campos fora de `fields` continuam com o valor do banco
+                    if not fields.isdisjoint({'order', 'order_id'}):
+                        obj._original_order_id, old_order_id = (
+                            obj.order_id,
+                            obj._original_order_id,
+                        )
+                    else:
+                        old_order_id = obj._original_order_id
+                    if not fields.isdisjoint({'offer', 'offer_id'}):
+                        obj._original_offer_id, old_offer_id = (
+                            obj.offer_id,
+                            obj._original_offer_id,
+                        )
+                    else:
+                        old_offer_id = obj._original_offer_id
+                    old_quantity = obj._original_quantity
+                    if 'quantity' in fields:
+                        obj._original_quantity = obj.quantity
+                    order_deltas[old_order_id] -= old_quantity
+                    offer_deltas[old_offer_id] -= old_quantity
+                    order_deltas[obj._original_order_id] += obj._original_quantity
+                    offer_deltas[obj._original_offer_id] += obj._original_quantity
+                apply_allocation_deltas(order_deltas, offer_deltas)
+        return result
+
+    def update(self, **kwargs):
+        # update() não aciona auto_now; a sincronização e os validadores de cache
+        # dependem de updated_at
+        kwargs.setdefault('updated_at', timezone.now())
+        if not ALLOCATION_FIELDS.intersection(kwargs):
+            bump(Distribution)
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            touched = self.model.objects.filter(pk__in=pks)
+            before = list(touched.values_list('order_id', 'offer_id'))
+            result = super().update(**kwargs)
+            after = list(touched.values_list('order_id', 'offer_id'))
+            rebuild_allocated_quantities(
+                {order_id for order_id, _ in before + after},
+                {offer_id for _, offer_id in before + after},
+            )
+        return result
+
+    def delete(self):
+        with transaction.atomic(using=self.db):
+            order_deltas, offer_deltas = _allocation_deltas(
+                self.values_list('order_id', 'offer_id', 'quantity'), sign=-1
+            )
+            result = super().delete()
+            apply_allocation_deltas(order_deltas, offer_deltas)
+        return result
+
 
-class Distribution(models.Model):
+class Distribution(SyncedModel):
     class DistributionSource(models.TextChoices):
         AUTO = 'AUTO', 'Automática'
         MANUAL = 'MANUAL', 'Manual'
@@ -83,16 +316,31 @@ class Distribution(models.Model):
 
     objects = DistributionQuerySet.as_manager()
 
-    class Meta:
+    class Meta(SyncedModel.Meta):
         verbose_name = 'Distribuição'
         verbose_name_plural = 'Distribuições'
         constraints = [
             models.UniqueConstraint(fields=['order', 'offer'], name='order_offer_unique')
         ]
+        indexes = [
+            # Paginação por cursor da API: (created_at, id)
+            models.Index(
+                fields=['created_at', 'id'], name='distribution_created_at_id_idx'
+            ),
+            # Sincronização incremental: (sync_sequence, id)
+            models.Index(
+                fields=['sync_sequence', 'id'], name='distribution_sync_seq_id_idx'
+            ),
+        ]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._original_quantity = self.quantity or 0
+        # Valores já contabilizados em allocated_quantity (nada, para novas instâncias)
+        self._original_order_id = None
+        self._original_offer_id = None
+        self._original_quantity = 0
+        # False quando lida sem order, offer ou quantity (ver load_original_allocations)
+        self._allocation_loaded = True
 
     def __str__(self):
         return (
@@ -110,13 +358,19 @@ class Distribution(models.Model):
         if self.quantity <= 0:
             raise ValidationError('A quantidade deve ser maior que zero.')
         # Verifica se excede o limite do pedido
+        order_original = (
+            self._original_quantity if self._original_order_id == self.order_id else 0
+        )
         if (
-            self.order.allocated_quantity - self._original_quantity + self.quantity
+            self.order.allocated_quantity - order_original + self.quantity
         ) > self.order.quantity:
             raise ValidationError('A soma das distribuições excede a quantidade do pedido.')
         # Verifica se excede o limite da oferta
+        offer_original = (
+            self._original_quantity if self._original_offer_id == self.offer_id else 0
+        )
         if (
-            self.offer.allocated_quantity - self._original_quantity + self.quantity
+            self.offer.allocated_quantity - offer_original + self.quantity
         ) > self.offer.quantity:
             raise ValidationError('A soma das distribuições excede a quantidade da oferta.')
         # Status inválidos para distribuir
@@ -136,6 +390,84 @@ class Distribution(models.Model):
                 'Não é possível distribuir a partir de ofertas canceladas ou entregues.'
             )
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        update_fields = None if update_fields is None else set(update_fields)
+        deferred = self.get_deferred_fields()
+        if update_fields is None and deferred and not self._state.adding:
+            # Como o próprio Model.save(): só os campos carregados são gravados
+            update_fields = {
+                field.name
+                for field in self._meta.concrete_fields
+                if field.attname not in deferred
+            }
+        with transaction.atomic():
+            load_original_allocations([self])
+            super().save(*args, **kwargs)
+            # Com update_fields, os campos não gravados continuam com o valor original
+            if self._original_order_id is not None and update_fields is not None:
+                if update_fields.isdisjoint({'order', 'order_id'}):
+                    order_id = self._original_order_id
+                else:
+                    order_id = self.order_id
+                if update_fields.isdisjoint({'offer', 'offer_id'}):
+                    offer_id = self._original_offer_id
+                else:
+                    offer_id = self.offer_id
+                if 'quantity' in update_fields:
+                    quantity = self.quantity
+                else:
+                    quantity = self._original_quantity
+            else:
+                order_id, offer_id, quantity = self.order_id, self.offer_id, self.quantity
+            order_deltas, offer_deltas = _allocation_deltas(
+                [(order_id, offer_id, quantity)]
+            )
+            if self._original_order_id is not None:
+                order_deltas[self._original_order_id] -= self._original_quantity
+                offer_deltas[self._original_offer_id] -= self._original_quantity
+            apply_allocation_deltas(order_deltas, offer_deltas)
+        self._sync_cached_allocations(order_deltas, offer_deltas)
+        self._original_order_id = order_id
+        self._original_offer_id = offer_id
+        self._original_quantity = quantity
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            load_original_allocations([self])
+            result = super().delete(*args, **kwargs)
+            order_deltas, offer_deltas = _allocation_deltas(
+                [
+                    (
+                        self._original_order_id,
+                        self._original_offer_id,
+                        self._original_quantity,
+                    )
+                ],
+                sign=-1,
+            )
+            apply_allocation_deltas(order_deltas, offer_deltas)
+        self._sync_cached_allocations(order_deltas, offer_deltas)
+        self._original_order_id = self._original_offer_id = None
+        self._original_quantity = 0
+        return result
+
+    def _remember_allocation(self):
+        self._original_order_id = self.order_id
+        self._original_offer_id = self.offer_id
+        self._original_quantity = self.quantity
+
+    def _sync_cached_allocations(self, order_deltas, offer_deltas):
+        # Mantém order/offer já carregados coerentes com os UPDATEs de
+        # allocated_quantity (via F()) e de status (recalculate_status)
+        for field_name, deltas in (('order', order_deltas), ('offer', offer_deltas)):
+            field = self._meta.get_field(field_name)
+            if field.is_cached(self):
+                related = field.get_cached_value(self)
+                if related is not None and deltas.get(related.pk):
+                    related.allocated_quantity += deltas[related.pk]
+                    related.status = related._original_status = related.allocation_status()
+
     @property
     def cooperated(self):
         return self.offer.cooperated
@@ -143,5 +475,12 @@ class Distribution(models.Model):
     @classmethod
     def from_db(cls, db, field_names, values):
         instance = super().from_db(db, field_names, values)
-        instance._original_quantity = instance.quantity
+        # Campos adiados (only/defer) não devem disparar consultas aqui; save() e
+        # delete() carregam os valores originais antes de calcular os deltas
+        instance._original_order_id = instance.__dict__.get('order_id')
+        instance._original_offer_id = instance.__dict__.get('offer_id')
+        instance._original_quantity = instance.__dict__.get('quantity') or 0
+        instance._allocation_loaded = {'order_id', 'offer_id', 'quantity'}.issubset(
+            instance.__dict__
+        )
         return instance
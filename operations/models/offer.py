@@ -1,11 +1,13 @@
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.utils import timezone
 
 from catalog.models import Product
+from common.models import SyncedModel, SyncedQuerySet
 from users.models import User
 
 
-class OfferQuerySet(models.QuerySet):
+class OfferQuerySet(SyncedQuerySet):
     def distribution_priority(self):
         """Ofertas prioritárias para distribuição."""
         return self.filter(
@@ -29,14 +31,49 @@ class OfferQuerySet(models.QuerySet):
             ]
         )
 
+    def with_remaining(self):
+        """Anota `remaining` (quantity - allocated_quantity) calculado no banco."""
+        return self.annotate(
+            remaining=models.ExpressionWrapper(
+                models.F('quantity') - models.F('allocated_quantity'),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            )
+        )
+
     def by_cooperated(self, cooperated):
         return self.filter(cooperated=cooperated)
 
     def by_product(self, product):
         return self.filter(product=product)
 
+    def recalculate_status(self):
+        """Ajusta o status de distribuição conforme allocated_quantity em um único UPDATE.
+
+        Ofertas entregues ou canceladas não são alteradas, e linhas que já estão no
+        status correto não são reescritas.
+        """
+        empty = models.Q(allocated_quantity__lte=0)
+        full = models.Q(allocated_quantity__gte=models.F('quantity'))
+        partial = ~empty & ~full
+        return (
+            self.filter(
+                (empty & ~models.Q(status=Offer.OfferStatus.NOT_ALLOCATED))
+                | (full & ~models.Q(status=Offer.OfferStatus.ALLOCATED))
+                | (partial & ~models.Q(status=Offer.OfferStatus.PARTIALLY_ALLOCATED))
+            )
+            .active()
+            .update(
+                status=models.Case(
+                    models.When(empty, then=models.Value(Offer.OfferStatus.NOT_ALLOCATED)),
+                    models.When(full, then=models.Value(Offer.OfferStatus.ALLOCATED)),
+                    default=models.Value(Offer.OfferStatus.PARTIALLY_ALLOCATED),
+                ),
+                updated_at=timezone.now(),
+            )
+        )
 
-class Offer(models.Model):
+
+class Offer(SyncedModel):
     """Modelo de ofertas cadastradas por Admins para os cooperados."""
 
     class OfferStatus(models.TextChoices):
@@ -55,6 +92,10 @@ class Offer(models.Model):
     quantity = models.DecimalField(max_digits=10, decimal_places=2, null=False)
     start_date = models.DateField(null=False)
     end_date = models.DateField(null=False)
+    # Mantido pelas escritas de Distribution (ver distribution.apply_allocation_deltas)
+    allocated_quantity = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False
+    )
     status = models.CharField(
         max_length=20, choices=OfferStatus.choices, default=OfferStatus.NOT_ALLOCATED
     )
@@ -71,13 +112,60 @@ class Offer(models.Model):
 
     objects = OfferQuerySet.as_manager()
 
-    class Meta:
+    class Meta(SyncedModel.Meta):
         verbose_name = 'Oferta'
         verbose_name_plural = 'Ofertas'
+        indexes = [
+            # Busca de ofertas candidatas: produto, status e janela de datas
+            models.Index(
+                fields=['product', 'status', 'start_date', 'end_date'],
+                name='offer_product_window_idx',
+            ),
+            # Paginação por cursor da API: (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='offer_created_at_id_idx'),
+            # Sincronização incremental: (sync_sequence, id)
+            models.Index(fields=['sync_sequence', 'id'], name='offer_sync_seq_id_idx'),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # quantity e status já gravados no banco (None para novas instâncias)
+        self._original_quantity = None
+        self._original_status = None
 
     def __str__(self):
         return f'Oferta #{self.pk}:{self.product}-{self.cooperated}-{self.quantity}'
 
+    def save(self, *args, **kwargs):
+        # allocated_quantity e o status são atualizados via SQL pelas distribuições;
+        # uma instância carregada antes dessas atualizações não deve sobrescrever os
+        # valores do banco. O status só é gravado quando foi alterado na instância.
+        status_changed = self.status != self._original_status
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != 'allocated_quantity'
+                and (field.name != 'status' or status_changed)
+            ]
+        update_fields = kwargs.get('update_fields')
+        quantity_changed = self._state.adding or (
+            (update_fields is None or 'quantity' in update_fields)
+            and self.quantity != self._original_quantity
+        )
+        status_changed = status_changed and (
+            update_fields is None or 'status' in update_fields
+        )
+        super().save(*args, **kwargs)
+        self._original_quantity = self.quantity
+        self._original_status = self.status
+        # O status depende de quantity e allocated_quantity: mesmo UPDATE das distribuições
+        if (quantity_changed or status_changed) and Offer.objects.filter(
+            pk=self.pk
+        ).recalculate_status():
+            self.refresh_from_db(fields=['status', 'updated_at'])
+
     def clean(self):
         super().clean()
         if self.quantity <= 0:
@@ -85,9 +173,35 @@ class Offer(models.Model):
         if self.end_date < self.start_date:
             raise ValidationError('A data final deve ser posterior à inicial')
 
-    @property
-    def allocated_quantity(self):
-        return self.distributions.aggregate(total=models.Sum('quantity'))['total'] or 0
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._original_quantity = instance.__dict__.get('quantity')
+        instance._original_status = instance.__dict__.get('status')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        # Os valores recarregados passam a ser os gravados no banco
+        loaded = self.__dict__
+        if fields is None or 'quantity' in fields:
+            self._original_quantity = loaded.get('quantity')
+        if fields is None or 'status' in fields:
+            self._original_status = loaded.get('status')
+
+    def allocation_status(self):
+        """Status que recalculate_status() gravaria para o allocated_quantity atual."""
+        if self.status not in (
+            Offer.OfferStatus.NOT_ALLOCATED,
+            Offer.OfferStatus.PARTIALLY_ALLOCATED,
+            Offer.OfferStatus.ALLOCATED,
+        ):
+            return self.status
+        if self.allocated_quantity <= 0:
+            return Offer.OfferStatus.NOT_ALLOCATED
+        if self.allocated_quantity >= self.quantity:
+            return Offer.OfferStatus.ALLOCATED
+        return Offer.OfferStatus.PARTIALLY_ALLOCATED
 
     @property
     def remaining_quantity(self):
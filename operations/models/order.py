@@ -3,10 +3,11 @@ from django.db import models
 from django.utils import timezone
 
 from catalog.models import Client, Product
+from common.models import SyncedModel, SyncedQuerySet
 from users.models import User
 
 
-class OrderQuerySet(models.QuerySet):
+class OrderQuerySet(SyncedQuerySet):
     def open(self):
         return self.filter(status=Order.OrderStatus.OPEN)
 
@@ -36,8 +37,43 @@ class OrderQuerySet(models.QuerySet):
             ]
         )
 
+    def with_remaining(self):
+        """Anota `remaining` (quantity - allocated_quantity) calculado no banco."""
+        return self.annotate(
+            remaining=models.ExpressionWrapper(
+                models.F('quantity') - models.F('allocated_quantity'),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            )
+        )
+
+    def recalculate_status(self):
+        """Ajusta OPEN/PARTIAL/FILLED conforme allocated_quantity em um único UPDATE.
+
+        Pedidos encerrados ou cancelados não são alterados, e linhas que já estão no
+        status correto não são reescritas.
+        """
+        empty = models.Q(allocated_quantity__lte=0)
+        full = models.Q(allocated_quantity__gte=models.F('quantity'))
+        partial = ~empty & ~full
+        return (
+            self.filter(
+                (empty & ~models.Q(status=Order.OrderStatus.OPEN))
+                | (full & ~models.Q(status=Order.OrderStatus.FILLED))
+                | (partial & ~models.Q(status=Order.OrderStatus.PARTIAL))
+            )
+            .pending()
+            .update(
+                status=models.Case(
+                    models.When(empty, then=models.Value(Order.OrderStatus.OPEN)),
+                    models.When(full, then=models.Value(Order.OrderStatus.FILLED)),
+                    default=models.Value(Order.OrderStatus.PARTIAL),
+                ),
+                updated_at=timezone.now(),
+            )
+        )
+
 
-class Order(models.Model):
+class Order(SyncedModel):
     """Modelo de Pedidos cadastrados pelos Admin de acordo com pedido de Clientes."""
 
     class OrderStatus(models.TextChoices):
@@ -66,6 +102,11 @@ class Order(models.Model):
 
     delivery_date = models.DateField(null=False)
 
+    # Mantido pelas escritas de Distribution (ver distribution.apply_allocation_deltas)
+    allocated_quantity = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, editable=False
+    )
+
     status = models.CharField(
         max_length=20, choices=OrderStatus.choices, default=OrderStatus.OPEN
     )
@@ -86,14 +127,61 @@ class Order(models.Model):
 
     objects = OrderQuerySet.as_manager()
 
-    class Meta:
+    class Meta(SyncedModel.Meta):
         verbose_name = 'Pedido'
         verbose_name_plural = 'Pedidos'
         ordering = ['delivery_date']
+        indexes = [
+            # Busca de pedidos candidatos: produto, status e data de entrega
+            models.Index(
+                fields=['product', 'status', 'delivery_date'],
+                name='order_product_delivery_idx',
+            ),
+            # Paginação por cursor da API: (delivery_date, id)
+            models.Index(fields=['delivery_date', 'id'], name='order_delivery_date_id_idx'),
+            # Sincronização incremental: (sync_sequence, id)
+            models.Index(fields=['sync_sequence', 'id'], name='order_sync_seq_id_idx'),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # quantity e status já gravados no banco (None para novas instâncias)
+        self._original_quantity = None
+        self._original_status = None
 
     def __str__(self):
         return f'Pedido #{self.pk}:{self.client}-{self.product}:{self.delivery_date}'
 
+    def save(self, *args, **kwargs):
+        # allocated_quantity e o status são atualizados via SQL pelas distribuições;
+        # uma instância carregada antes dessas atualizações não deve sobrescrever os
+        # valores do banco. O status só é gravado quando foi alterado na instância.
+        status_changed = self.status != self._original_status
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != 'allocated_quantity'
+                and (field.name != 'status' or status_changed)
+            ]
+        update_fields = kwargs.get('update_fields')
+        quantity_changed = self._state.adding or (
+            (update_fields is None or 'quantity' in update_fields)
+            and self.quantity != self._original_quantity
+        )
+        status_changed = status_changed and (
+            update_fields is None or 'status' in update_fields
+        )
+        super().save(*args, **kwargs)
+        self._original_quantity = self.quantity
+        self._original_status = self.status
+        # O status depende de quantity e allocated_quantity: mesmo UPDATE das distribuições
+        if (quantity_changed or status_changed) and Order.objects.filter(
+            pk=self.pk
+        ).recalculate_status():
+            self.refresh_from_db(fields=['status', 'updated_at'])
+
     def clean(self):
         super().clean()
         if self.quantity <= 0:
@@ -118,9 +206,35 @@ class Order(models.Model):
     def days_to_delivery(self):
         return (self.delivery_date - timezone.now().date()).days
 
-    @property
-    def allocated_quantity(self):
-        return self.distributions.aggregate(total=models.Sum('quantity'))['total'] or 0
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._original_quantity = instance.__dict__.get('quantity')
+        instance._original_status = instance.__dict__.get('status')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        # Os valores recarregados passam a ser os gravados no banco
+        loaded = self.__dict__
+        if fields is None or 'quantity' in fields:
+            self._original_quantity = loaded.get('quantity')
+        if fields is None or 'status' in fields:
+            self._original_status = loaded.get('status')
+
+    def allocation_status(self):
+        """Status que recalculate_status() gravaria para o allocated_quantity atual."""
+        if self.status not in (
+            Order.OrderStatus.OPEN,
+            Order.OrderStatus.PARTIAL,
+            Order.OrderStatus.FILLED,
+        ):
+            return self.status
+        if self.allocated_quantity <= 0:
+            return Order.OrderStatus.OPEN
+        if self.allocated_quantity >= self.quantity:
+            return Order.OrderStatus.FILLED
+        return Order.OrderStatus.PARTIAL
 
     @property
     def remaining_quantity(self):
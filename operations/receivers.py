@@ -0,0 +1,12 @@
+"""Gerações dos modelos das operações para o cache de respostas (common.generations).
+
+Os caminhos em lote trocam as gerações diretamente: apply_allocation_deltas,
+rebuild_allocated_quantities e recalculate_statuses (distribuições, pedidos e
+ofertas) e create_offers.
+"""
+
+from common.generations import track_generations
+
+from .models import Distribution, Offer, Order
+
+track_generations(Order, Offer, Distribution)
@@ -0,0 +1,147 @@
+from rest_framework import serializers
+
+from catalog.serializers import ClientSummarySerializer, ProductSummarySerializer
+from common.serializers import SparseFieldsSerializerMixin
+from users.serializers import CooperatedSummarySerializer
+
+from .models import Distribution, Offer, Order
+from .services import ALLOCATORS
+
+
+class DistributionSeedSerializer(serializers.Serializer):
+    """Sementes do plano/recálculo: pedidos, ofertas e/ou produtos (ids repetíveis)."""
+
+    order = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False
+    )
+    offer = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False
+    )
+    product = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False
+    )
+    method = serializers.ChoiceField(choices=sorted(ALLOCATORS), default='greedy')
+
+    def validate(self, attrs):
+        if not (attrs.get('order') or attrs.get('offer') or attrs.get('product')):
+            raise serializers.ValidationError(
+                'Informe ao menos um pedido, oferta ou produto.'
+            )
+        return attrs
+
+
+class OfferRowSerializer(serializers.Serializer):
+    """Uma linha do cadastro em lote; as regras de Offer.clean() ficam no serviço."""
+
+    product = serializers.IntegerField(min_value=1)
+    cooperated = serializers.IntegerField(min_value=1)
+    quantity = serializers.DecimalField(max_digits=10, decimal_places=2)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class OfferBulkCreateSerializer(serializers.Serializer):
+    offers = serializers.ListField(
+        child=OfferRowSerializer(), allow_empty=False, max_length=1000
+    )
+
+
+class OrderSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'client': ClientSummarySerializer,
+        'product': ProductSummarySerializer,
+    }
+    field_dependencies = {'status_display': ['status']}
+
+    client_name = serializers.CharField(source='client.name', read_only=True)
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    remaining = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            'id',
+            'client',
+            'client_name',
+            'product',
+            'product_name',
+            'quantity',
+            'unit_price',
+            'total_value',
+            'delivery_date',
+            'allocated_quantity',
+            'remaining',
+            'status',
+            'status_display',
+            'notes',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class OfferSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    expandable_fields = {
+        'product': ProductSummarySerializer,
+        'cooperated': CooperatedSummarySerializer,
+    }
+    field_dependencies = {'status_display': ['status']}
+
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    cooperated_name = serializers.CharField(source='cooperated.full_name', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    remaining = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Offer
+        fields = [
+            'id',
+            'product',
+            'product_name',
+            'cooperated',
+            'cooperated_name',
+            'quantity',
+            'start_date',
+            'end_date',
+            'allocated_quantity',
+            'remaining',
+            'status',
+            'status_display',
+            'notes',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+
+class DistributionSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    client_name = serializers.CharField(source='order.client.name', read_only=True)
+    delivery_date = serializers.DateField(source='order.delivery_date', read_only=True)
+    product = serializers.IntegerField(source='offer.product_id', read_only=True)
+    product_name = serializers.CharField(source='offer.product.name', read_only=True)
+    cooperated = serializers.IntegerField(source='offer.cooperated_id', read_only=True)
+    cooperated_name = serializers.CharField(
+        source='offer.cooperated.full_name', read_only=True
+    )
+
+    class Meta:
+        model = Distribution
+        fields = [
+            'id',
+            'order',
+            'offer',
+            'quantity',
+            'source',
+            'client_name',
+            'delivery_date',
+            'product',
+            'product_name',
+            'cooperated',
+            'cooperated_name',
+            'notes',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
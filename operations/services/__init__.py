@@ -0,0 +1,31 @@
+from .allocation import Allocation, allocate, compute_allocation
+from .matching import CandidateIndex, offer_candidates, order_candidates
+from .offers import create_offers, shifted_offers, validate_offers
+from .optimization import ALLOCATORS, MinCostFlow, compute_optimal_allocation
+from .planning import DistributionPlan, FillChange, plan_distributions
+from .recalculation import DistributionDiff, apply_diff, build_diff, recalculate
+from .validation import create_distributions, validate_distributions
+
+__all__ = [
+    'ALLOCATORS',
+    'Allocation',
+    'CandidateIndex',
+    'DistributionDiff',
+    'DistributionPlan',
+    'FillChange',
+    'MinCostFlow',
+    'allocate',
+    'apply_diff',
+    'build_diff',
+    'compute_allocation',
+    'compute_optimal_allocation',
+    'create_distributions',
+    'create_offers',
+    'offer_candidates',
+    'order_candidates',
+    'plan_distributions',
+    'recalculate',
+    'shifted_offers',
+    'validate_distributions',
+    'validate_offers',
+]
@@ -0,0 +1,142 @@
+"""Motor de distribuição automática: preenche pedidos a partir das ofertas."""
+
+from bisect import bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db import models, transaction
+
+from common.models import SyncSequence
+from operations.models import Distribution, Offer, Order
+
+
+@dataclass(frozen=True)
+class Allocation:
+    order_id: int
+    offer_id: int
+    quantity: Decimal
+
+
+def compute_allocation(orders, offers, order_remaining, offer_remaining, existing_pairs=()):
+    """Calcula a distribuição gulosa em memória, sem tocar no banco.
+
+    Os pedidos são atendidos na ordem recebida (prioridade de entrega) e cada pedido
+    consome as ofertas do mesmo produto cuja janela cobre a data de entrega, na ordem
+    recebida (ofertas mais antigas primeiro). Pares já existentes são ignorados por
+    causa da restrição order_offer_unique.
+    """
+    existing_pairs = set(existing_pairs)
+    offer_remaining = dict(offer_remaining)
+
+    offers_by_product = defaultdict(list)
+    for offer in sorted(offers, key=lambda o: o.start_date):
+        offers_by_product[offer.product_id].append(offer)
+    starts_by_product = {
+        product_id: [offer.start_date for offer in product_offers]
+        for product_id, product_offers in offers_by_product.items()
+    }
+
+    allocations = []
+    for order in orders:
+        needed = order_remaining.get(order.pk, Decimal(0))
+        if needed <= 0:
+            continue
+        product_offers = offers_by_product.get(order.product_id, [])
+        starts = starts_by_product.get(order.product_id, [])
+        limit = bisect_right(starts, order.delivery_date)
+        for offer in product_offers[:limit]:
+            if offer.end_date < order.delivery_date:
+                continue
+            if (order.pk, offer.pk) in existing_pairs:
+                continue
+            available = offer_remaining.get(offer.pk, Decimal(0))
+            if available <= 0:
+                continue
+            quantity = min(needed, available)
+            allocations.append(Allocation(order.pk, offer.pk, quantity))
+            offer_remaining[offer.pk] = available - quantity
+            needed -= quantity
+            if needed <= 0:
+                break
+    return allocations
+
+
+def allocation_orders():
+    """Pedidos pendentes com a região do cliente anotada (usada no custo)."""
+    return Order.objects.pending().annotate(client_region_id=models.F('client__region'))
+
+
+def allocation_offers(queryset=None):
+    """Ofertas com região do cooperado e prazos do produto anotados."""
+    queryset = Offer.objects.distribution_priority() if queryset is None else queryset
+    return queryset.annotate(
+        cooperated_region_id=models.F('cooperated__region'),
+        shelf_life=models.F('product__shelf_life'),
+        production_time=models.F('product__production_time'),
+    )
+
+
+def load_allocation_state(product):
+    """Carrega pedidos pendentes, ofertas elegíveis e distribuições de um produto.
+
+    Retorna (orders, offers, order_remaining, offer_remaining, existing_pairs) usando
+    três consultas, independente do número de linhas. O saldo vem das colunas
+    allocated_quantity, mantidas pelas escritas de Distribution.
+    """
+    orders = list(
+        allocation_orders()
+        .filter(product=product)
+        .select_for_update(of=('self',))
+        .order_by('delivery_date', 'pk')
+    )
+    offers = list(
+        allocation_offers()
+        .filter(product=product)
+        .select_for_update(of=('self',))
+        .order_by('start_date', 'pk')
+    )
+
+    existing_pairs = set(
+        Distribution.objects.filter(order__product=product).values_list(
+            'order_id', 'offer_id'
+        )
+    )
+
+    order_remaining = {o.pk: o.remaining_quantity for o in orders}
+    offer_remaining = {o.pk: o.remaining_quantity for o in offers}
+    return orders, offers, order_remaining, offer_remaining, existing_pairs
+
+
+def allocate(product, user=None, allocator=compute_allocation):
+    """Gera distribuições AUTO para um produto em uma única transação.
+
+    `allocator` calcula a distribuição em memória: compute_allocation (gulosa) ou
+    compute_optimal_allocation (custo mínimo), ver optimization.ALLOCATORS.
+
+    As regras de Distribution.clean() são garantidas pelo próprio cálculo, então as
+    linhas são gravadas com bulk_create, sem validação individual; o bulk_create de
+    DistributionQuerySet atualiza allocated_quantity de pedidos e ofertas.
+    """
+    with transaction.atomic():
+        # O contador da sincronização antes dos bloqueios de linha, na mesma ordem de
+        # qualquer outra escrita: a transação grava distribuições de todo modo
+        SyncSequence.current()
+        orders, offers, order_remaining, offer_remaining, existing_pairs = (
+            load_allocation_state(product)
+        )
+        allocations = allocator(
+            orders, offers, order_remaining, offer_remaining, existing_pairs
+        )
+        distributions = [
+            Distribution(
+                order_id=allocation.order_id,
+                offer_id=allocation.offer_id,
+                quantity=allocation.quantity,
+                source=Distribution.DistributionSource.AUTO,
+                created_by=user,
+                updated_by=user,
+            )
+            for allocation in allocations
+        ]
+        return Distribution.objects.bulk_create(distributions, batch_size=500)
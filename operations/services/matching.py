@@ -0,0 +1,153 @@
+"""Busca de candidatos: quais ofertas podem atender um pedido, e o inverso.
+
+Uma oferta atende um pedido do mesmo produto quando start_date <= delivery_date <=
+end_date. Em lote, cada lado é carregado com uma única consulta (apoiada nos índices
+offer_product_window_idx e order_product_delivery_idx) e o casamento é feito em
+memória, sem consulta por pedido ou oferta.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from decimal import Decimal
+from heapq import heappop, heappush
+
+from common.affinity import get_affinity_matrix
+
+from .allocation import allocation_offers, allocation_orders
+
+
+@dataclass(frozen=True)
+class Candidate:
+    order_id: int
+    offer_id: int
+    # Saldo do candidato: da oferta em offers_for_orders, do pedido em orders_for_offers
+    remaining: Decimal
+    # Custo de afinidade entre as regiões (menor = mais próximo, ver common.affinity)
+    affinity: int
+
+
+def _rank(candidates, limit):
+    candidates.sort(key=lambda c: (c.affinity, -c.remaining, c.order_id, c.offer_id))
+    return candidates[:limit] if limit else candidates
+
+
+class CandidateIndex:
+    """Índice em memória das janelas das ofertas e das datas dos pedidos, por produto.
+
+    offers_for_orders() varre os pedidos em ordem de entrega mantendo as ofertas
+    abertas num heap por end_date; orders_for_offers() localiza o intervalo de datas
+    de cada oferta por busca binária nos pedidos ordenados.
+    """
+
+    def __init__(self, orders, offers, matrix):
+        self.matrix = matrix
+        self.orders = defaultdict(list)
+        for order in sorted(orders, key=lambda o: (o.delivery_date, o.pk)):
+            if order.remaining_quantity > 0:
+                self.orders[order.product_id].append(order)
+        self.order_dates = {
+            product_id: [order.delivery_date for order in items]
+            for product_id, items in self.orders.items()
+        }
+        self.offers = defaultdict(list)
+        for offer in sorted(offers, key=lambda o: (o.start_date, o.pk)):
+            if offer.remaining_quantity > 0:
+                self.offers[offer.product_id].append(offer)
+
+    def _affinity(self, order, offer):
+        return self.matrix.region_cost(
+            getattr(order, 'client_region_id', None),
+            getattr(offer, 'cooperated_region_id', None),
+        )
+
+    def offers_for_orders(self, limit=None):
+        """{order_id: [Candidate]} com as ofertas ranqueadas de cada pedido."""
+        result = {}
+        for product_id, orders in self.orders.items():
+            offers = self.offers.get(product_id, [])
+            position = 0
+            open_offers = {}
+            closing = []
+            for order in orders:
+                date = order.delivery_date
+                while position < len(offers) and offers[position].start_date <= date:
+                    offer = offers[position]
+                    open_offers[offer.pk] = offer
+                    heappush(closing, (offer.end_date, offer.pk))
+                    position += 1
+                while closing and closing[0][0] < date:
+                    open_offers.pop(heappop(closing)[1], None)
+                result[order.pk] = _rank(
+                    [
+                        Candidate(
+                            order.pk,
+                            offer.pk,
+                            offer.remaining_quantity,
+                            self._affinity(order, offer),
+                        )
+                        for offer in open_offers.values()
+                    ],
+                    limit,
+                )
+        return result
+
+    def orders_for_offers(self, limit=None):
+        """{offer_id: [Candidate]} com os pedidos ranqueados de cada oferta."""
+        result = {}
+        for product_id, offers in self.offers.items():
+            orders = self.orders.get(product_id, [])
+            dates = self.order_dates.get(product_id, [])
+            for offer in offers:
+                start = bisect_left(dates, offer.start_date)
+                end = bisect_right(dates, offer.end_date)
+                result[offer.pk] = _rank(
+                    [
+                        Candidate(
+                            order.pk,
+                            offer.pk,
+                            order.remaining_quantity,
+                            self._affinity(order, offer),
+                        )
+                        for order in orders[start:end]
+                    ],
+                    limit,
+                )
+        return result
+
+
+def _pks(items):
+    return {getattr(item, 'pk', item) for item in items}
+
+
+def offer_candidates(orders, limit=None, matrix=None):
+    """Ofertas com saldo que podem atender cada pedido (instâncias ou ids).
+
+    Duas consultas no total: os pedidos e as ofertas dos mesmos produtos cuja janela
+    cruza o intervalo de datas de entrega do lote.
+    """
+    orders = list(allocation_orders().filter(pk__in=_pks(orders)))
+    if not orders:
+        return {}
+    dates = [order.delivery_date for order in orders]
+    offers = allocation_offers().filter(
+        product_id__in={order.product_id for order in orders},
+        start_date__lte=max(dates),
+        end_date__gte=min(dates),
+    )
+    index = CandidateIndex(orders, offers, matrix or get_affinity_matrix())
+    return index.offers_for_orders(limit)
+
+
+def order_candidates(offers, limit=None, matrix=None):
+    """Pedidos pendentes que cada oferta (instâncias ou ids) pode atender."""
+    offers = list(allocation_offers().filter(pk__in=_pks(offers)))
+    if not offers:
+        return {}
+    orders = allocation_orders().filter(
+        product_id__in={offer.product_id for offer in offers},
+        delivery_date__gte=min(offer.start_date for offer in offers),
+        delivery_date__lte=max(offer.end_date for offer in offers),
+    )
+    index = CandidateIndex(orders, offers, matrix or get_affinity_matrix())
+    return index.orders_for_offers(limit)
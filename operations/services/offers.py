@@ -0,0 +1,91 @@
+"""Cadastro em lote de ofertas, equivalente a Offer.clean() por linha."""
+
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from catalog.reference import active_products
+from common.generations import bump
+from common.request_cache import cached_in_bulk
+from operations.models import Offer
+from operations.signals import offers_changed, send_on_commit
+from users.models import User
+
+
+def validate_offers(offers):
+    """Valida uma lista de ofertas novas de uma só vez.
+
+    Produtos ativos vêm da tabela de referência em memória e cooperados ativos de uma
+    consulta (reaproveitando o cache da requisição); ambos são atribuídos às
+    instâncias e as regras de Offer.clean() são verificadas em memória.
+
+    Retorna {índice: [mensagens]} apenas para as linhas inválidas.
+    """
+    offers = list(offers)
+    products = active_products.in_bulk(
+        {offer.product_id for offer in offers if offer.product_id}
+    )
+    cooperated = cached_in_bulk(
+        User.cooperated, {offer.cooperated_id for offer in offers if offer.cooperated_id}
+    )
+
+    errors = {}
+    for index, offer in enumerate(offers):
+        row_errors = []
+        product = products.get(offer.product_id)
+        user = cooperated.get(offer.cooperated_id)
+        if product is None:
+            row_errors.append('Produto inexistente ou inativo.')
+        else:
+            offer.product = product
+        if user is None:
+            row_errors.append('Cooperado inexistente ou inativo.')
+        else:
+            offer.cooperated = user
+        if offer.quantity is None or offer.quantity <= 0:
+            row_errors.append('A quantidade deve ser maior que zero.')
+        if offer.start_date is None or offer.end_date is None:
+            row_errors.append('Informe as datas inicial e final.')
+        elif offer.end_date < offer.start_date:
+            row_errors.append('A data final deve ser posterior à inicial')
+        if row_errors:
+            errors[index] = row_errors
+    return errors
+
+
+def create_offers(offers, user=None):
+    """Valida e grava um lote de ofertas novas em uma única transação.
+
+    Nada é gravado se alguma linha for inválida; o ValidationError traz as mensagens
+    indexadas pela posição da linha no lote.
+    """
+    offers = list(offers)
+    errors = validate_offers(offers)
+    if errors:
+        raise ValidationError({str(index): messages for index, messages in errors.items()})
+    for offer in offers:
+        if user is not None:
+            offer.created_by = offer.created_by or user
+            offer.updated_by = user
+    with transaction.atomic():
+        created = Offer.objects.bulk_create(offers, batch_size=500)
+        bump(Offer)
+        send_on_commit(offers_changed, Offer, offer_ids=[offer.pk for offer in created])
+    return created
+
+
+def shifted_offers(offers, days=7):
+    """Cópias não gravadas das ofertas com as datas deslocadas em `days` dias."""
+    delta = timedelta(days=days)
+    return [
+        Offer(
+            product_id=offer.product_id,
+            cooperated_id=offer.cooperated_id,
+            quantity=offer.quantity,
+            start_date=offer.start_date + delta,
+            end_date=offer.end_date + delta,
+            notes=offer.notes,
+        )
+        for offer in offers
+    ]
@@ -0,0 +1,259 @@
+"""Distribuição ótima via fluxo de custo mínimo (problema de transporte).
+
+Cada produto vira uma rede origem -> ofertas -> pedidos -> destino. As capacidades são
+os saldos em centavos da unidade e os arcos oferta -> pedido existem apenas quando a
+janela da oferta cobre a data de entrega. O solver primal-dual encontra o fluxo
+máximo (o máximo possível é distribuído) de menor custo total, em Python puro.
+"""
+
+from bisect import bisect_right
+from collections import defaultdict, deque
+from decimal import Decimal
+from heapq import heappop, heappush
+
+from common.affinity import get_affinity_matrix
+
+from .allocation import Allocation, compute_allocation
+
+# Pesos do custo de um arco oferta -> pedido (inteiros, quanto menor melhor)
+AFFINITY_WEIGHT = 100
+EXPIRY_WEIGHT = 10
+PRODUCTION_WEIGHT = 20
+
+CENTS = Decimal('0.01')
+
+
+class MinCostFlow:
+    """Fluxo de custo mínimo com potenciais (Dijkstra) e fluxo bloqueante por fase.
+
+    Cada fase calcula os menores custos reduzidos e satura todos os caminhos de custo
+    reduzido zero de uma vez, como no Dinic. O número de fases é limitado pela
+    quantidade de custos de caminho distintos, não pelo número de aumentos.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.graph = [[] for _ in range(size)]
+        self.to = []
+        self.capacity = []
+        self.cost = []
+
+    def add_edge(self, source, target, capacity, cost):
+        """Adiciona um arco e retorna seu índice (para consultar o fluxo depois)."""
+        edge = len(self.to)
+        self.to += [target, source]
+        self.capacity += [capacity, 0]
+        self.cost += [cost, -cost]
+        self.graph[source].append(edge)
+        self.graph[target].append(edge + 1)
+        return edge
+
+    def flow(self, edge):
+        return self.capacity[edge ^ 1]
+
+    def solve(self, source, sink):
+        """Envia o fluxo máximo de menor custo; retorna (fluxo, custo)."""
+        size, graph, to, capacity, cost = (
+            self.size,
+            self.graph,
+            self.to,
+            self.capacity,
+            self.cost,
+        )
+        potential = [0] * size
+        total_flow = 0
+        infinity = float('inf')
+
+        while True:
+            dist = [infinity] * size
+            dist[source] = 0
+            heap = [(0, source)]
+            while heap:
+                distance, node = heappop(heap)
+                if node == sink:
+                    # Os demais nós ficam com distância >= à do destino
+                    break
+                if distance > dist[node]:
+                    continue
+                node_potential = potential[node]
+                for edge in graph[node]:
+                    if capacity[edge]:
+                        target = to[edge]
+                        candidate = (
+                            distance + cost[edge] + node_potential - potential[target]
+                        )
+                        if candidate < dist[target]:
+                            dist[target] = candidate
+                            heappush(heap, (candidate, target))
+            if dist[sink] == infinity:
+                break
+            limit = dist[sink]
+            for node in range(size):
+                potential[node] += dist[node] if dist[node] < limit else limit
+
+            while True:
+                level, admissible = self._admissible_graph(source, potential)
+                if level[sink] < 0:
+                    break
+                pointer = [0] * size
+                while True:
+                    pushed = self._augment(source, sink, level, admissible, pointer)
+                    if not pushed:
+                        break
+                    total_flow += pushed
+
+        total_cost = sum(self.flow(edge) * cost[edge] for edge in range(0, len(to), 2))
+        return total_flow, total_cost
+
+    def _admissible_graph(self, source, potential):
+        """Níveis BFS e, por nó, os arcos de custo reduzido zero para o nível seguinte."""
+        graph, to, capacity, cost = self.graph, self.to, self.capacity, self.cost
+        level = [-1] * self.size
+        level[source] = 0
+        admissible = [None] * self.size
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            next_level = level[node] + 1
+            node_potential = potential[node]
+            edges = []
+            for edge in graph[node]:
+                if not capacity[edge]:
+                    continue
+                target = to[edge]
+                if cost[edge] + node_potential != potential[target]:
+                    continue
+                if level[target] < 0:
+                    level[target] = next_level
+                    queue.append(target)
+                if level[target] == next_level:
+                    edges.append(edge)
+            admissible[node] = edges
+        return level, admissible
+
+    def _augment(self, source, sink, level, admissible, pointer):
+        to, capacity = self.to, self.capacity
+        path = []
+        node = source
+        while True:
+            if node == sink:
+                pushed = min(capacity[edge] for edge in path)
+                for edge in path:
+                    capacity[edge] -= pushed
+                    capacity[edge ^ 1] += pushed
+                return pushed
+            edges = admissible[node] or ()
+            position = pointer[node]
+            while position < len(edges):
+                edge = edges[position]
+                if capacity[edge] and level[to[edge]] > 0:
+                    break
+                position += 1
+            pointer[node] = position
+            if position == len(edges):
+                if not path:
+                    return 0
+                level[node] = -1
+                edge = path.pop()
+                node = to[edge ^ 1]
+                pointer[node] += 1
+                continue
+            path.append(edge)
+            node = to[edge]
+
+
+def _product_attr(offer, name):
+    # Os carregadores anotam esses campos; sem anotação, recorre ao produto
+    value = getattr(offer, name, None)
+    return getattr(offer.product, name) if value is None else value
+
+
+def allocation_cost(order, offer, matrix):
+    """Custo inteiro de atender o pedido com a oferta.
+
+    - afinidade entre a macroregião do cliente e a do cooperado;
+    - prazo de validade: ofertas cuja janela termina logo após a entrega são usadas
+      antes (a folga é limitada pela shelf_life do produto);
+    - tempo de produção: entregas antes de start_date + production_time são
+      penalizadas, pois o produto pode ainda não estar pronto.
+    """
+    affinity = matrix.region_cost(
+        getattr(order, 'client_region_id', None),
+        getattr(offer, 'cooperated_region_id', None),
+    )
+    shelf_life = max(_product_attr(offer, 'shelf_life') or 0, 0)
+    production_time = max(_product_attr(offer, 'production_time') or 0, 0)
+    slack = (offer.end_date - order.delivery_date).days
+    lead = (order.delivery_date - offer.start_date).days
+    return (
+        AFFINITY_WEIGHT * affinity
+        + EXPIRY_WEIGHT * min(slack, shelf_life)
+        + PRODUCTION_WEIGHT * max(production_time - lead, 0)
+    )
+
+
+def _to_cents(quantity):
+    return int((quantity / CENTS).to_integral_value())
+
+
+def compute_optimal_allocation(
+    orders, offers, order_remaining, offer_remaining, existing_pairs=(), matrix=None
+):
+    """Mesmo contrato de compute_allocation, mas com alocação de custo mínimo."""
+    matrix = matrix or get_affinity_matrix()
+    existing_pairs = set(existing_pairs)
+
+    offers_by_product = defaultdict(list)
+    for offer in sorted(offers, key=lambda o: o.start_date):
+        if offer_remaining.get(offer.pk, 0) > 0:
+            offers_by_product[offer.product_id].append(offer)
+    orders_by_product = defaultdict(list)
+    for order in orders:
+        if order_remaining.get(order.pk, 0) > 0:
+            orders_by_product[order.product_id].append(order)
+
+    allocations = []
+    for product_id, product_orders in orders_by_product.items():
+        product_offers = offers_by_product.get(product_id)
+        if not product_offers:
+            continue
+        starts = [offer.start_date for offer in product_offers]
+        source, sink = 0, 1
+        offer_node = {offer.pk: 2 + i for i, offer in enumerate(product_offers)}
+        order_node = {
+            order.pk: 2 + len(product_offers) + i for i, order in enumerate(product_orders)
+        }
+        network = MinCostFlow(2 + len(product_offers) + len(product_orders))
+        for offer in product_offers:
+            network.add_edge(
+                source, offer_node[offer.pk], _to_cents(offer_remaining[offer.pk]), 0
+            )
+        arcs = []
+        for order in product_orders:
+            demand = _to_cents(order_remaining[order.pk])
+            network.add_edge(order_node[order.pk], sink, demand, 0)
+            limit = bisect_right(starts, order.delivery_date)
+            for offer in product_offers[:limit]:
+                if offer.end_date < order.delivery_date:
+                    continue
+                if (order.pk, offer.pk) in existing_pairs:
+                    continue
+                edge = network.add_edge(
+                    offer_node[offer.pk],
+                    order_node[order.pk],
+                    demand,
+                    allocation_cost(order, offer, matrix),
+                )
+                arcs.append((edge, order.pk, offer.pk))
+        network.solve(source, sink)
+        for edge, order_pk, offer_pk in arcs:
+            flow = network.flow(edge)
+            if flow:
+                allocations.append(Allocation(order_pk, offer_pk, Decimal(flow) * CENTS))
+    return allocations
+
+
+ALLOCATORS = {
+    'greedy': compute_allocation,
+    'optimal': compute_optimal_allocation,
+}
@@ -0,0 +1,143 @@
+"""Modo de planejamento: calcula a distribuição proposta sem gravar nada.
+
+Usa o mesmo build_diff do recálculo (leituras em lote, sem consultas por linha) e
+acrescenta o preenchimento de cada pedido e oferta antes e depois da mudança.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from .allocation import compute_allocation
+from .recalculation import DistributionDiff, build_diff
+
+PERCENT = Decimal('0.01')
+
+
+def _fill(allocated, quantity):
+    if not quantity:
+        return None
+    return (allocated * 100 / quantity).quantize(PERCENT)
+
+
+@dataclass
+class FillChange:
+    """Quantidade distribuída de um pedido ou oferta antes e depois do plano."""
+
+    id: int
+    quantity: Decimal
+    allocated_before: Decimal
+    allocated_after: Decimal
+
+    @property
+    def fill_before(self):
+        return _fill(self.allocated_before, self.quantity)
+
+    @property
+    def fill_after(self):
+        return _fill(self.allocated_after, self.quantity)
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'quantity': str(self.quantity),
+            'allocated_before': str(self.allocated_before),
+            'allocated_after': str(self.allocated_after),
+            'fill_before': None if self.fill_before is None else str(self.fill_before),
+            'fill_after': None if self.fill_after is None else str(self.fill_after),
+        }
+
+
+@dataclass
+class DistributionPlan:
+    diff: DistributionDiff = field(default_factory=DistributionDiff)
+    orders: list = field(default_factory=list)
+    offers: list = field(default_factory=list)
+
+    @property
+    def has_changes(self):
+        return self.diff.has_changes
+
+    def summary(self):
+        return {
+            'orders': len(self.orders),
+            'offers': len(self.offers),
+            'created': len(self.diff.created),
+            'changed': len(self.diff.updated),
+            'removed': len(self.diff.deleted),
+            'unchanged': len(self.diff.unchanged),
+        }
+
+    def as_dict(self):
+        """Representação serializável (JSON) do plano."""
+        return {
+            'summary': self.summary(),
+            'created': [
+                {
+                    'order': d.order_id,
+                    'offer': d.offer_id,
+                    'quantity': str(d.quantity),
+                }
+                for d in self.diff.created
+            ],
+            'changed': [
+                {
+                    'id': d.pk,
+                    'order': d.order_id,
+                    'offer': d.offer_id,
+                    'quantity_before': str(d._original_quantity),
+                    'quantity_after': str(d.quantity),
+                }
+                for d in self.diff.updated
+            ],
+            'removed': [
+                {
+                    'id': d.pk,
+                    'order': d.order_id,
+                    'offer': d.offer_id,
+                    'quantity': str(d.quantity),
+                }
+                for d in self.diff.deleted
+            ],
+            'orders': [change.as_dict() for change in self.orders],
+            'offers': [change.as_dict() for change in self.offers],
+        }
+
+
+def _fill_changes(diff):
+    order_delta = defaultdict(Decimal)
+    offer_delta = defaultdict(Decimal)
+    for distribution in diff.created:
+        order_delta[distribution.order_id] += distribution.quantity
+        offer_delta[distribution.offer_id] += distribution.quantity
+    for distribution in diff.updated:
+        delta = distribution.quantity - distribution._original_quantity
+        order_delta[distribution.order_id] += delta
+        offer_delta[distribution.offer_id] += delta
+    for distribution in diff.deleted:
+        order_delta[distribution.order_id] -= distribution.quantity
+        offer_delta[distribution.offer_id] -= distribution.quantity
+
+    def changes(items, deltas):
+        return [
+            FillChange(
+                id=item.pk,
+                quantity=item.quantity,
+                allocated_before=item.allocated_quantity,
+                allocated_after=item.allocated_quantity + deltas.get(item.pk, 0),
+            )
+            for item in items
+        ]
+
+    return changes(diff.orders, order_delta), changes(diff.offers, offer_delta)
+
+
+def plan_distributions(orders=(), offers=(), products=(), allocator=compute_allocation):
+    """Calcula o que recalculate() faria para as sementes informadas, sem gravar.
+
+    O resultado pode ser aplicado depois com apply_diff(plan.diff), desde que nada
+    tenha mudado no intervalo; para garantir isso, use recalculate().
+    """
+    diff = build_diff(orders=orders, offers=offers, products=products, allocator=allocator)
+    order_changes, offer_changes = _fill_changes(diff)
+    return DistributionPlan(diff=diff, orders=order_changes, offers=offer_changes)
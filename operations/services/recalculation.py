@@ -0,0 +1,267 @@
+"""Recalculo incremental das distribuições AUTO/SEMI_AUTO.
+
+Quando uma oferta ou pedido muda, apenas o conjunto conexo de pedidos e ofertas que
+podem trocar quantidade com ele (mesmo produto, janela de datas compatível ou
+distribuição existente entre eles) é resolvido de novo. Distribuições MANUAL, e as
+que já têm pesagem (Buy.distribution é PROTECT, e as sobras/faltas da compra
+dependem da quantidade), ficam fixas e o resultado é gravado como diferença: só as
+linhas que mudam são escritas.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from common.models import SyncSequence
+from operations.models import Distribution, Offer, Order
+from transactions.models import Buy
+
+from .allocation import allocation_offers, allocation_orders, compute_allocation
+
+RECALCULABLE_SOURCES = (
+    Distribution.DistributionSource.AUTO,
+    Distribution.DistributionSource.SEMI_AUTO,
+)
+
+
+@dataclass
+class DistributionDiff:
+    """Diferença entre as distribuições atuais e as propostas para um conjunto."""
+
+    orders: list = field(default_factory=list)
+    offers: list = field(default_factory=list)
+    created: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+    deleted: list = field(default_factory=list)
+    unchanged: list = field(default_factory=list)
+
+    @property
+    def has_changes(self):
+        return bool(self.created or self.updated or self.deleted)
+
+
+def _pks(items):
+    return {getattr(item, 'pk', item) for item in items}
+
+
+def _connected_component(orders, offers, links, order_seeds, offer_seeds):
+    """Busca em largura sobre pedidos e ofertas ligados por data ou distribuição.
+
+    `links` traz todas as distribuições do produto; as que apontam para pedidos ou
+    ofertas fora de `orders`/`offers` (encerrados, entregues ou cancelados) não
+    ampliam o conjunto, e build_diff as conta como fixas.
+    """
+    offers_by_product = defaultdict(list)
+    for offer in sorted(offers.values(), key=lambda o: o.start_date):
+        offers_by_product[offer.product_id].append(offer)
+    offer_starts = {
+        product_id: [offer.start_date for offer in items]
+        for product_id, items in offers_by_product.items()
+    }
+    orders_by_product = defaultdict(list)
+    for order in sorted(orders.values(), key=lambda o: o.delivery_date):
+        orders_by_product[order.product_id].append(order)
+    order_dates = {
+        product_id: [order.delivery_date for order in items]
+        for product_id, items in orders_by_product.items()
+    }
+
+    seen_orders = set()
+    seen_offers = set()
+    queue = deque(
+        [('order', pk) for pk in order_seeds if pk in orders]
+        + [('offer', pk) for pk in offer_seeds if pk in offers]
+    )
+    while queue:
+        kind, pk = queue.popleft()
+        if kind == 'order':
+            if pk in seen_orders:
+                continue
+            seen_orders.add(pk)
+            order = orders[pk]
+            product_offers = offers_by_product.get(order.product_id, [])
+            limit = bisect_right(
+                offer_starts.get(order.product_id, []), order.delivery_date
+            )
+            neighbours = {
+                offer.pk
+                for offer in product_offers[:limit]
+                if offer.end_date >= order.delivery_date
+            }
+            # Ofertas entregues/canceladas ficam fora: suas distribuições são fixas
+            neighbours.update(
+                offer_pk for offer_pk in links['order'].get(pk, ()) if offer_pk in offers
+            )
+            queue.extend(('offer', offer_pk) for offer_pk in neighbours - seen_offers)
+        else:
+            if pk in seen_offers:
+                continue
+            seen_offers.add(pk)
+            offer = offers[pk]
+            dates = order_dates.get(offer.product_id, [])
+            product_orders = orders_by_product.get(offer.product_id, [])
+            start = bisect_left(dates, offer.start_date)
+            end = bisect_right(dates, offer.end_date)
+            neighbours = {order.pk for order in product_orders[start:end]}
+            # Pedidos encerrados/cancelados ficam fora: suas distribuições são fixas
+            neighbours.update(
+                order_pk for order_pk in links['offer'].get(pk, ()) if order_pk in orders
+            )
+            queue.extend(('order', order_pk) for order_pk in neighbours - seen_orders)
+    return seen_orders, seen_offers
+
+
+def build_diff(orders=(), offers=(), products=(), allocator=compute_allocation, lock=False):
+    """Calcula, sem gravar, o novo conjunto de distribuições automáticas.
+
+    `orders`, `offers` e `products` (instâncias ou ids) são as sementes: o conjunto
+    conexo a partir delas é recalculado. Passar um produto recalcula todas as
+    distribuições automáticas dele. `allocator` é um de optimization.ALLOCATORS.
+    Com `lock` (dentro de uma transação), pedidos, ofertas e distribuições lidos
+    ficam bloqueados (select_for_update) até o commit, como em allocate().
+    """
+    order_seeds = _pks(orders)
+    offer_seeds = _pks(offers)
+    seed_products = _pks(products)
+    product_ids = set(seed_products)
+    product_ids.update(
+        Order.objects.filter(pk__in=order_seeds).values_list('product_id', flat=True)
+    )
+    product_ids.update(
+        Offer.objects.filter(pk__in=offer_seeds).values_list('product_id', flat=True)
+    )
+    if not product_ids:
+        return DistributionDiff()
+
+    order_rows = allocation_orders().filter(product_id__in=product_ids)
+    offer_rows = allocation_offers(Offer.objects.active()).filter(
+        product_id__in=product_ids
+    )
+    distribution_rows = (
+        Distribution.objects.filter(offer__product_id__in=product_ids)
+        .annotate(weighed=Exists(Buy.objects.filter(distribution=OuterRef('pk'))))
+        .order_by('pk')
+    )
+    if lock:
+        # Também impede que uma pesagem passe a apontar para uma linha removida aqui
+        order_rows = order_rows.select_for_update(of=('self',))
+        offer_rows = offer_rows.select_for_update(of=('self',))
+        distribution_rows = distribution_rows.select_for_update(of=('self',))
+    all_orders = {order.pk: order for order in order_rows}
+    all_offers = {offer.pk: offer for offer in offer_rows}
+    distributions = list(distribution_rows)
+    links = {'order': defaultdict(set), 'offer': defaultdict(set)}
+    for distribution in distributions:
+        links['order'][distribution.order_id].add(distribution.offer_id)
+        links['offer'][distribution.offer_id].add(distribution.order_id)
+
+    order_seeds |= {pk for pk, o in all_orders.items() if o.product_id in seed_products}
+    offer_seeds |= {pk for pk, o in all_offers.items() if o.product_id in seed_products}
+    order_ids, offer_ids = _connected_component(
+        all_orders, all_offers, links, order_seeds, offer_seeds
+    )
+
+    # Linhas MANUAL, já pesadas, ou ligadas a pedidos/ofertas fora do conjunto ficam
+    # fixas
+    movable = {}
+    order_remaining = {pk: all_orders[pk].quantity for pk in order_ids}
+    offer_remaining = {pk: all_offers[pk].quantity for pk in offer_ids}
+    fixed_pairs = set()
+    for distribution in distributions:
+        order_inside = distribution.order_id in order_ids
+        offer_inside = distribution.offer_id in offer_ids
+        if not order_inside and not offer_inside:
+            continue
+        in_component = order_inside and offer_inside
+        pair = (distribution.order_id, distribution.offer_id)
+        if (
+            in_component
+            and distribution.source in RECALCULABLE_SOURCES
+            and not distribution.weighed
+        ):
+            movable[pair] = distribution
+            continue
+        fixed_pairs.add(pair)
+        if order_inside:
+            order_remaining[distribution.order_id] -= distribution.quantity
+        if offer_inside:
+            offer_remaining[distribution.offer_id] -= distribution.quantity
+
+    component_orders = sorted(
+        (all_orders[pk] for pk in order_ids), key=lambda o: (o.delivery_date, o.pk)
+    )
+    component_offers = sorted(
+        (all_offers[pk] for pk in offer_ids), key=lambda o: (o.start_date, o.pk)
+    )
+    allocations = allocator(
+        component_orders,
+        component_offers,
+        {pk: max(value, Decimal(0)) for pk, value in order_remaining.items()},
+        {pk: max(value, Decimal(0)) for pk, value in offer_remaining.items()},
+        fixed_pairs,
+    )
+
+    diff = DistributionDiff(orders=component_orders, offers=component_offers)
+    for allocation in allocations:
+        pair = (allocation.order_id, allocation.offer_id)
+        current = movable.pop(pair, None)
+        if current is None:
+            diff.created.append(
+                Distribution(
+                    order_id=allocation.order_id,
+                    offer_id=allocation.offer_id,
+                    quantity=allocation.quantity,
+                    source=Distribution.DistributionSource.AUTO,
+                )
+            )
+        elif current.quantity != allocation.quantity:
+            current.quantity = allocation.quantity
+            diff.updated.append(current)
+        else:
+            diff.unchanged.append(current)
+    diff.deleted = list(movable.values())
+    return diff
+
+
+def apply_diff(diff, user=None):
+    """Grava a diferença: remove, altera e cria apenas as linhas necessárias."""
+    now = timezone.now()
+    with transaction.atomic():
+        if diff.deleted:
+            Distribution.objects.filter(pk__in=[d.pk for d in diff.deleted]).delete()
+        if diff.updated:
+            for distribution in diff.updated:
+                distribution.updated_by = user
+                distribution.updated_at = now
+            Distribution.objects.bulk_update(
+                diff.updated, ['quantity', 'updated_by', 'updated_at'], batch_size=500
+            )
+        if diff.created:
+            for distribution in diff.created:
+                distribution.created_by = user
+                distribution.updated_by = user
+            Distribution.objects.bulk_create(diff.created, batch_size=500)
+    return diff
+
+
+def recalculate(orders=(), offers=(), products=(), user=None, allocator=compute_allocation):
+    """Recalcula e grava as distribuições automáticas afetadas pelas sementes."""
+    with transaction.atomic():
+        # O contador da sincronização antes dos bloqueios de linha, na mesma ordem de
+        # qualquer outra escrita: a transação grava distribuições de todo modo
+        SyncSequence.current()
+        diff = build_diff(
+            orders=orders,
+            offers=offers,
+            products=products,
+            allocator=allocator,
+            lock=True,
+        )
+        if diff.has_changes:
+            apply_diff(diff, user=user)
+    return diff
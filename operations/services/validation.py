@@ -0,0 +1,145 @@
+"""Validação em lote de distribuições, equivalente a Distribution.clean() por linha."""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from operations.models import Distribution, Offer, Order
+
+CLOSED_ORDER_STATUSES = (
+    Order.OrderStatus.CANCELLED,
+    Order.OrderStatus.CLOSED_PARTIAL,
+    Order.OrderStatus.CLOSED_FILLED,
+)
+CLOSED_OFFER_STATUSES = (
+    Offer.OfferStatus.CANCELLED,
+    Offer.OfferStatus.DELIVERED,
+)
+
+
+def validate_distributions(distributions, deleted=()):
+    """Valida uma lista de distribuições (novas ou alteradas) de uma só vez.
+
+    Pedidos, ofertas e distribuições gravadas (pares existentes e valores originais
+    das linhas alteradas ou removidas) são carregados em três consultas. As regras
+    de Distribution.clean() são verificadas em memória, considerando o efeito
+    acumulado das linhas anteriores do lote e das distribuições em `deleted`, que
+    serão removidas junto. Pedidos e ofertas carregados são atribuídos às instâncias.
+
+    Retorna {índice: [mensagens]} apenas para as linhas inválidas.
+    """
+    distributions = list(distributions)
+    deleted = [d for d in deleted if d.pk]
+
+    order_ids = {d.order_id for d in distributions if d.order_id}
+    offer_ids = {d.offer_id for d in distributions if d.offer_id}
+    orders = Order.objects.in_bulk(order_ids)
+    offers = Offer.objects.in_bulk(offer_ids)
+
+    # Valores gravados das linhas já existentes, lidos do banco pelo pk: instâncias
+    # carregadas com only()/defer() não conhecem a quantidade original. A mesma
+    # consulta traz os pares já existentes entre os pedidos e ofertas do lote.
+    saved_pks = {d.pk for d in [*deleted, *distributions] if d.pk}
+    rows = Distribution.objects.none()
+    if order_ids and offer_ids:
+        rows = Distribution.objects.filter(order_id__in=order_ids, offer_id__in=offer_ids)
+    if saved_pks:
+        rows = rows | Distribution.objects.filter(pk__in=saved_pks)
+    saved = {}
+    existing_pairs = {}
+    if (order_ids and offer_ids) or saved_pks:
+        for pk, order_id, offer_id, quantity in rows.values_list(
+            'pk', 'order_id', 'offer_id', 'quantity'
+        ):
+            existing_pairs[(order_id, offer_id)] = pk
+            if pk in saved_pks:
+                saved[pk] = (order_id, offer_id, quantity)
+
+    order_allocated = defaultdict(Decimal)
+    offer_allocated = defaultdict(Decimal)
+    for order in orders.values():
+        order_allocated[order.pk] = order.allocated_quantity
+    for offer in offers.values():
+        offer_allocated[offer.pk] = offer.allocated_quantity
+    # Linhas já gravadas deixam de contar pelo valor original
+    for order_id, offer_id, quantity in saved.values():
+        order_allocated[order_id] -= quantity
+        offer_allocated[offer_id] -= quantity
+    for distribution in deleted:
+        if distribution.pk in saved:
+            existing_pairs.pop(saved[distribution.pk][:2], None)
+
+    errors = {}
+    seen_pairs = set()
+    for index, distribution in enumerate(distributions):
+        row_errors = []
+        order = orders.get(distribution.order_id)
+        offer = offers.get(distribution.offer_id)
+        if order is None:
+            row_errors.append('Pedido inexistente.')
+        else:
+            distribution.order = order
+        if offer is None:
+            row_errors.append('Oferta inexistente.')
+        else:
+            distribution.offer = offer
+
+        quantity = distribution.quantity
+        if quantity is None or quantity <= 0:
+            row_errors.append('A quantidade deve ser maior que zero.')
+
+        if order is not None and offer is not None:
+            pair = (order.pk, offer.pk)
+            if order.product_id != offer.product_id:
+                row_errors.append('O pedido e a oferta devem ser do mesmo produto.')
+            if pair in seen_pairs or existing_pairs.get(pair, distribution.pk) != (
+                distribution.pk
+            ):
+                row_errors.append('Já existe uma distribuição para este pedido e oferta.')
+            seen_pairs.add(pair)
+
+        if order is not None and order.status in CLOSED_ORDER_STATUSES:
+            row_errors.append(
+                'Não é possível distribuir em pedidos cancelados ou encerrados.'
+            )
+        if offer is not None and offer.status in CLOSED_OFFER_STATUSES:
+            row_errors.append(
+                'Não é possível distribuir a partir de ofertas canceladas ou entregues.'
+            )
+
+        if not row_errors:
+            if order_allocated[order.pk] + quantity > order.quantity:
+                row_errors.append('A soma das distribuições excede a quantidade do pedido.')
+            if offer_allocated[offer.pk] + quantity > offer.quantity:
+                row_errors.append('A soma das distribuições excede a quantidade da oferta.')
+
+        if row_errors:
+            errors[index] = row_errors
+        else:
+            # Apenas linhas válidas consomem saldo para as seguintes
+            order_allocated[order.pk] += quantity
+            offer_allocated[offer.pk] += quantity
+
+    return errors
+
+
+def create_distributions(distributions, user=None):
+    """Valida e grava um lote de distribuições novas (por exemplo, uma importação).
+
+    Nada é gravado se alguma linha for inválida; o ValidationError traz as mensagens
+    indexadas pela posição da linha no lote.
+    """
+    distributions = list(distributions)
+    with transaction.atomic():
+        errors = validate_distributions(distributions)
+        if errors:
+            raise ValidationError(
+                {str(index): messages for index, messages in errors.items()}
+            )
+        for distribution in distributions:
+            if user is not None:
+                distribution.created_by = distribution.created_by or user
+                distribution.updated_by = user
+        return Distribution.objects.bulk_create(distributions, batch_size=500)
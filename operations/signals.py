@@ -0,0 +1,20 @@
+"""Sinais das operações, enviados após o commit da transação que fez a mudança.
+
+distributions_changed: distribuições foram criadas, alteradas ou removidas, por
+    qualquer caminho (save, delete, bulk_create, update, recálculo). Argumento
+    `offer_ids`: ofertas cuja quantidade distribuída mudou, ou None para todas.
+offers_changed: ofertas gravadas em lote, sem post_save. Argumento `offer_ids`.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.dispatch import Signal
+
+distributions_changed = Signal()
+offers_changed = Signal()
+
+
+def send_on_commit(signal, sender, **kwargs):
+    """Envia o sinal quando a transação atual for confirmada (ou já, fora dela)."""
+    transaction.on_commit(partial(signal.send, sender=sender, **kwargs))
@@ -0,0 +1,59 @@
+"""Fontes da sincronização incremental (ver common.sync) e o registro das remoções."""
+
+from catalog.models import Client, Product
+from catalog.serializers import ClientSerializer, ProductSerializer
+from common.models import Region
+from common.serializers import RegionSerializer
+from common.sync import SyncSource, track_deletions
+
+from .models import Distribution, Offer, Order
+from .serializers import DistributionSerializer, OfferSerializer, OrderSerializer
+
+SYNC_SOURCES = [
+    SyncSource(
+        'regions',
+        Region,
+        RegionSerializer,
+    ),
+    SyncSource(
+        'products',
+        Product,
+        ProductSerializer,
+        active_field='is_active',
+    ),
+    SyncSource(
+        'clients',
+        Client,
+        ClientSerializer,
+        active_field='is_active',
+    ),
+    SyncSource(
+        'orders',
+        Order,
+        OrderSerializer,
+        get_queryset=lambda: Order.objects.select_related(
+            'client', 'product'
+        ).with_remaining(),
+        admin_only=True,
+    ),
+    SyncSource(
+        'offers',
+        Offer,
+        OfferSerializer,
+        get_queryset=lambda: Offer.objects.select_related(
+            'product', 'cooperated'
+        ).with_remaining(),
+        scope=lambda queryset, user: queryset.filter(cooperated=user),
+    ),
+    SyncSource(
+        'distributions',
+        Distribution,
+        DistributionSerializer,
+        get_queryset=lambda: Distribution.objects.select_related(
+            'order__client', 'offer__product', 'offer__cooperated'
+        ),
+        scope=lambda queryset, user: queryset.filter(offer__cooperated=user),
+    ),
+]
+
+track_deletions(*(source.model for source in SYNC_SOURCES))
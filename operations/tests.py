@@ -1,3 +1,1131 @@
-from django.test import TestCase
+import itertools
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+)
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from catalog.models import Client, Product
+from catalog.reference import active_products
+from common.affinity import AffinityMatrix
+from common.models import Macroregion, Region, Tombstone
+from transactions.models import Buy
+from users.models import User
+
+from .admin import DistributionInline
+from .models import Distribution, Offer, Order
+from .services import (
+    MinCostFlow,
+    allocate,
+    apply_diff,
+    compute_allocation,
+    compute_optimal_allocation,
+    offer_candidates,
+    order_candidates,
+    plan_distributions,
+    recalculate,
+    validate_distributions,
+)
+
+START = date(2030, 1, 1)
+
+
+def day(offset):
+    return START + timedelta(days=offset)
+
+
+class DistributionTestCase(TestCase):
+    """Um produto, um cliente e um cooperado; pedidos e ofertas criados por teste."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(
+            name='Alface', production_time=1, default_purchase_value=2, shelf_life=5
+        )
+        cls.client_record = Client.objects.create(name='Escola')
+        cls.cooperated = User.objects.create_user('produtor', full_name='Produtor')
+
+    def order(self, quantity, delivery=5, **kwargs):
+        kwargs.setdefault('client', self.client_record)
+        kwargs.setdefault('product', self.product)
+        return Order.objects.create(
+            quantity=quantity,
+            unit_price=3,
+            total_value=quantity * 3,
+            delivery_date=day(delivery),
+            **kwargs,
+        )
+
+    def offer(self, quantity, start=0, end=10, **kwargs):
+        kwargs.setdefault('product', self.product)
+        kwargs.setdefault('cooperated', self.cooperated)
+        return Offer.objects.create(
+            quantity=quantity, start_date=day(start), end_date=day(end), **kwargs
+        )
+
+    def allocated(self, instance):
+        instance.refresh_from_db()
+        return instance.allocated_quantity
+
+
+class AllocationTests(DistributionTestCase):
+    def test_fills_orders_by_delivery_from_oldest_offers(self):
+        late = self.order(10, delivery=8)
+        early = self.order(10, delivery=3)
+        older = self.offer(6, start=0)
+        newer = self.offer(20, start=2)
+
+        created = allocate(self.product)
+
+        pairs = {(d.order_id, d.offer_id): d.quantity for d in created}
+        self.assertEqual(
+            pairs,
+            {
+                (early.pk, older.pk): Decimal(6),
+                (early.pk, newer.pk): Decimal(4),
+                (late.pk, newer.pk): Decimal(10),
+            },
+        )
+        self.assertEqual(
+            {d.source for d in created}, {Distribution.DistributionSource.AUTO}
+        )
+        self.assertEqual(self.allocated(early), 10)
+        self.assertEqual(self.allocated(newer), 14)
+
+    def test_respects_windows_and_existing_pairs(self):
+        order = self.order(10, delivery=5)
+        outside = self.offer(10, start=6, end=9)
+        expired = self.offer(10, start=0, end=4)
+        manual = self.offer(10)
+        Distribution.objects.create(
+            order=order,
+            offer=manual,
+            quantity=3,
+            source=Distribution.DistributionSource.MANUAL,
+        )
+
+        self.assertEqual(allocate(self.product), [])
+        self.assertEqual(self.allocated(outside), 0)
+        self.assertEqual(self.allocated(expired), 0)
+        # A segunda oferta válida completa o pedido; o par MANUAL não é repetido
+        other = self.offer(10)
+        created = allocate(self.product)
+        self.assertEqual(
+            [(d.order_id, d.offer_id, d.quantity) for d in created],
+            [(order.pk, other.pk, Decimal(7))],
+        )
+
+    def test_queries_do_not_grow_with_rows(self):
+        for i in range(3):
+            self.order(5, delivery=i + 1)
+            self.offer(5)
+        # três leituras, um INSERT e os UPDATEs de saldo e status, entre SAVEPOINTs
+        with self.assertNumQueries(12):
+            allocate(self.product)
+        for i in range(30):
+            self.order(5, delivery=i % 9 + 1)
+            self.offer(5)
+        with self.assertNumQueries(12):
+            self.assertEqual(len(allocate(self.product)), 30)
+
+
+class AllocatedQuantityTests(DistributionTestCase):
+    def setUp(self):
+        self.first = self.order(10)
+        self.second = self.order(10)
+        self.source = self.offer(20)
+
+    def assert_allocated(self, first, second, offer):
+        self.assertEqual(
+            [self.allocated(self.first), self.allocated(self.second)], [first, second]
+        )
+        self.assertEqual(self.allocated(self.source), offer)
+
+    def test_create_update_move_and_delete(self):
+        distribution = Distribution.objects.create(
+            order=self.first, offer=self.source, quantity=4
+        )
+        self.assert_allocated(4, 0, 4)
+        distribution.quantity = 6
+        distribution.save()
+        self.assert_allocated(6, 0, 6)
+        distribution.order = self.second
+        distribution.quantity = 3
+        distribution.save()
+        self.assert_allocated(0, 3, 3)
+        distribution.delete()
+        self.assert_allocated(0, 0, 0)
+
+    def test_deferred_instances(self):
+        pk = Distribution.objects.create(order=self.first, offer=self.source, quantity=4).pk
+
+        distribution = Distribution.objects.only('id', 'notes').get(pk=pk)
+        distribution.notes = 'conferido'
+        distribution.save()
+        self.assert_allocated(4, 0, 4)
+
+        distribution = Distribution.objects.only('id', 'order').get(pk=pk)
+        distribution.order = self.second
+        distribution.save()
+        self.assert_allocated(0, 4, 4)
+
+        Distribution.objects.only('id').get(pk=pk).delete()
+        self.assert_allocated(0, 0, 0)
+
+    def test_update_fields_only_applies_saved_fields(self):
+        distribution = Distribution.objects.create(
+            order=self.first, offer=self.source, quantity=4
+        )
+        distribution.quantity = 9
+        distribution.notes = 'só a nota'
+        distribution.save(update_fields=['notes'])
+        self.assert_allocated(4, 0, 4)
+        # O valor em memória ainda não foi gravado e conta quando for
+        distribution.save(update_fields=['quantity'])
+        self.assert_allocated(9, 0, 9)
+
+    def test_queryset_bulk_paths(self):
+        created = Distribution.objects.bulk_create(
+            [
+                Distribution(order=self.first, offer=self.source, quantity=2),
+                Distribution(order=self.second, offer=self.source, quantity=5),
+            ]
+        )
+        self.assert_allocated(2, 5, 7)
+
+        created[0].quantity = 7
+        Distribution.objects.bulk_update(created, ['quantity'])
+        self.assert_allocated(7, 5, 12)
+
+        deferred = list(Distribution.objects.only('id').order_by('pk'))
+        deferred[1].quantity = 1
+        Distribution.objects.bulk_update(deferred[1:], ['quantity'])
+        self.assert_allocated(7, 1, 8)
+
+        Distribution.objects.filter(order=self.first).update(quantity=3)
+        self.assert_allocated(3, 1, 4)
+
+        Distribution.objects.filter(order=self.second).delete()
+        self.assert_allocated(3, 0, 3)
+
+
+class StatusTransitionTests(DistributionTestCase):
+    def status(self, instance):
+        instance.refresh_from_db()
+        return instance.status
+
+    def test_order_follows_allocation_and_quantity(self):
+        order = self.order(10)
+        offer = self.offer(30)
+        self.assertEqual(self.status(order), Order.OrderStatus.OPEN)
+        distribution = Distribution.objects.create(order=order, offer=offer, quantity=4)
+        self.assertEqual(self.status(order), Order.OrderStatus.PARTIAL)
+        distribution.quantity = 10
+        distribution.save()
+        self.assertEqual(self.status(order), Order.OrderStatus.FILLED)
+
+        order.quantity = 20
+        order.save()
+        self.assertEqual(order.status, Order.OrderStatus.PARTIAL)
+        self.assertEqual(self.status(order), Order.OrderStatus.PARTIAL)
+        order.quantity = 10
+        order.save(update_fields=['quantity'])
+        self.assertEqual(self.status(order), Order.OrderStatus.FILLED)
+
+        distribution.delete()
+        self.assertEqual(self.status(order), Order.OrderStatus.OPEN)
+
+    def test_offer_follows_allocation_and_quantity(self):
+        offer = self.offer(10)
+        distribution = Distribution.objects.create(
+            order=self.order(30), offer=offer, quantity=10
+        )
+        self.assertEqual(self.status(offer), Offer.OfferStatus.ALLOCATED)
+        offer.quantity = 25
+        offer.save()
+        self.assertEqual(offer.status, Offer.OfferStatus.PARTIALLY_ALLOCATED)
+        offer.quantity = 10
+        offer.save()
+        self.assertEqual(self.status(offer), Offer.OfferStatus.ALLOCATED)
+        distribution.delete()
+        self.assertEqual(self.status(offer), Offer.OfferStatus.NOT_ALLOCATED)
+
+    def test_closed_rows_keep_their_status(self):
+        order = self.order(10, status=Order.OrderStatus.CLOSED_PARTIAL)
+        offer = self.offer(10, status=Offer.OfferStatus.DELIVERED)
+        order.quantity = 5
+        order.save()
+        offer.quantity = 5
+        offer.save()
+        self.assertEqual(self.status(order), Order.OrderStatus.CLOSED_PARTIAL)
+        self.assertEqual(self.status(offer), Offer.OfferStatus.DELIVERED)
+
+    def test_stale_instance_keeps_the_status_from_the_database(self):
+        order = self.order(10)
+        offer = self.offer(10)
+        stale_order = Order.objects.get(pk=order.pk)
+        stale_offer = Offer.objects.get(pk=offer.pk)
+        Distribution.objects.create(order=order, offer=offer, quantity=5)
+
+        stale_order.notes = 'carregado antes da distribuição'
+        stale_order.save()
+        stale_offer.save()
+        self.assertEqual(self.status(order), Order.OrderStatus.PARTIAL)
+        self.assertEqual(order.allocated_quantity, Decimal(5))
+        self.assertEqual(self.status(offer), Offer.OfferStatus.PARTIALLY_ALLOCATED)
+
+        # Status alterado na instância ainda é gravado
+        stale_order.status = Order.OrderStatus.CANCELLED
+        stale_order.save()
+        self.assertEqual(self.status(order), Order.OrderStatus.CANCELLED)
+
+    def test_cached_related_instances_follow_the_status(self):
+        order = self.order(10)
+        offer = self.offer(10)
+        distribution = Distribution.objects.create(order=order, offer=offer, quantity=10)
+        self.assertEqual(order.status, Order.OrderStatus.FILLED)
+        self.assertEqual(offer.status, Offer.OfferStatus.ALLOCATED)
+        distribution.quantity = 4
+        distribution.save()
+        self.assertEqual(order.status, Order.OrderStatus.PARTIAL)
+        # A instância em memória grava o mesmo que o banco já tem
+        order.save()
+        self.assertEqual(self.status(order), Order.OrderStatus.PARTIAL)
+
+    def test_unchanged_quantity_skips_recalculation(self):
+        order = Order.objects.get(pk=self.order(10).pk)
+        order.notes = 'sem mudança de quantidade'
+        # UPDATE e a consulta do sinal do painel, sem o UPDATE de status
+        with self.assertNumQueries(2):
+            order.save()
+
+
+class BatchValidationTests(DistributionTestCase):
+    def test_rules_and_cumulative_effect(self):
+        order = self.order(10)
+        offer = self.offer(8)
+        other_product = Product.objects.create(
+            name='Couve', production_time=1, default_purchase_value=2, shelf_life=5
+        )
+        closed = self.order(10, status=Order.OrderStatus.CLOSED_FILLED)
+        rows = [
+            Distribution(order=order, offer=offer, quantity=6),
+            Distribution(order=order, offer=self.offer(8), quantity=4),
+            # A oferta só tem 2 de saldo depois da primeira linha
+            Distribution(order=self.order(5), offer=offer, quantity=3),
+            Distribution(order=order, offer=offer, quantity=1),
+            Distribution(
+                order=order, offer=self.offer(5, product=other_product), quantity=1
+            ),
+            Distribution(order=closed, offer=offer, quantity=0),
+            Distribution(order_id=9999, offer=offer, quantity=1),
+        ]
+        errors = validate_distributions(rows)
+        self.assertEqual(sorted(errors), [2, 3, 4, 5, 6])
+        self.assertEqual(
+            errors[2], ['A soma das distribuições excede a quantidade da oferta.']
+        )
+        self.assertEqual(
+            errors[3], ['Já existe uma distribuição para este pedido e oferta.']
+        )
+        self.assertEqual(len(errors[5]), 2)
+        self.assertEqual(errors[6], ['Pedido inexistente.'])
+
+    def test_changes_and_deletions_free_their_quantity(self):
+        order = self.order(10)
+        offer = self.offer(10)
+        current = Distribution.objects.create(order=order, offer=offer, quantity=10)
+        removed = Distribution.objects.create(
+            order=self.order(10), offer=self.offer(10), quantity=10
+        )
+        current.quantity = 4
+        rows = [current, Distribution(order=order, offer=removed.offer, quantity=6)]
+        self.assertEqual(validate_distributions(rows, deleted=[removed]), {})
+        self.assertEqual(
+            validate_distributions(rows)[1],
+            ['A soma das distribuições excede a quantidade da oferta.'],
+        )
+
+    def test_deferred_rows_use_the_saved_quantity(self):
+        order = self.order(10)
+        offer = self.offer(10)
+        saved = Distribution.objects.create(order=order, offer=offer, quantity=8)
+        removed = Distribution.objects.create(
+            order=self.order(10), offer=self.offer(10), quantity=10
+        )
+        current = Distribution.objects.only('pk', 'order_id', 'offer_id').get(pk=saved.pk)
+        current.quantity = 10
+        gone = Distribution.objects.only('pk').get(pk=removed.pk)
+        rows = [current, Distribution(order=self.order(5), offer=removed.offer, quantity=5)]
+        with self.assertNumQueries(3):
+            self.assertEqual(validate_distributions(rows, deleted=[gone]), {})
+
+    def test_three_queries_for_any_batch(self):
+        orders = [self.order(10) for _ in range(20)]
+        offers = [self.offer(10) for _ in range(20)]
+        rows = [
+            Distribution(order_id=order.pk, offer_id=offer.pk, quantity=1)
+            for order, offer in zip(orders, offers, strict=True)
+        ]
+        with self.assertNumQueries(3):
+            self.assertEqual(validate_distributions(rows), {})
+
+    def test_admin_inline_validates_rows_together(self):
+        order = self.order(10)
+        offers = [self.offer(10) for _ in range(12)]
+        superuser = User.objects.create_superuser('root', 'root@example.com')
+        request = RequestFactory().post('/')
+        request.user = superuser
+        inline = DistributionInline(Order, admin.site)
+
+        def formset(count, quantity):
+            data = {
+                'distributions-TOTAL_FORMS': str(count),
+                'distributions-INITIAL_FORMS': '0',
+            }
+            for i, offer in enumerate(offers[:count]):
+                data[f'distributions-{i}-offer'] = str(offer.pk)
+                data[f'distributions-{i}-quantity'] = str(quantity)
+                data[f'distributions-{i}-source'] = 'MANUAL'
+            return inline.get_formset(request, order)(
+                data, instance=order, prefix='distributions'
+            )
+
+        # Uma consulta por linha do campo de oferta e as três do validador em lote
+        small = formset(2, 1)
+        with self.assertNumQueries(2 + 3):
+            self.assertTrue(small.is_valid())
+        large = formset(12, 1)
+        with self.assertNumQueries(12 + 3):
+            self.assertFalse(large.is_valid())
+        # As dez primeiras cabem no pedido; as duas seguintes excedem
+        errors = [bool(form.errors) for form in large.forms]
+        self.assertEqual(errors[9:], [False, True, True])
+
+
+class RecalculationTests(DistributionTestCase):
+    def quantities(self):
+        return {
+            (d.order_id, d.offer_id): d.quantity
+            for d in Distribution.objects.order_by('pk')
+        }
+
+    def test_resolves_the_component_and_keeps_manual_rows(self):
+        order = self.order(10)
+        small = self.offer(4)
+        large = self.offer(20)
+        manual = Distribution.objects.create(
+            order=order,
+            offer=small,
+            quantity=4,
+            source=Distribution.DistributionSource.MANUAL,
+        )
+        allocate(self.product)
+        self.assertEqual(self.quantities()[(order.pk, large.pk)], 6)
+
+        order.quantity = 15
+        order.save()
+        diff = recalculate(orders=[order])
+        self.assertEqual(len(diff.updated), 1)
+        self.assertEqual(
+            self.quantities(),
+            {
+                (order.pk, small.pk): 4,
+                (order.pk, large.pk): 11,
+            },
+        )
+        manual.refresh_from_db()
+        self.assertEqual(manual.source, Distribution.DistributionSource.MANUAL)
+        # Sem mudança, nada é gravado
+        self.assertFalse(recalculate(products=[self.product]).has_changes)
+
+    def test_closed_orders_and_delivered_offers_stay_fixed(self):
+        closed = self.order(11)
+        delivered = self.offer(10)
+        pending = self.order(10)
+        shared = self.offer(10)
+        Distribution.objects.create(order=closed, offer=delivered, quantity=10)
+        Distribution.objects.create(order=closed, offer=shared, quantity=1)
+        Distribution.objects.create(order=pending, offer=delivered, quantity=2)
+        Order.objects.filter(pk=closed.pk).update(status=Order.OrderStatus.CLOSED_FILLED)
+        Offer.objects.filter(pk=delivered.pk).update(status=Offer.OfferStatus.DELIVERED)
+
+        for seeds in (
+            {'products': [self.product]},
+            {'orders': [pending]},
+            {'offers': [shared]},
+        ):
+            diff = recalculate(**seeds)
+            self.assertEqual([o.pk for o in diff.orders], [pending.pk])
+            self.assertEqual([o.pk for o in diff.offers], [shared.pk])
+        # As linhas ligadas ao pedido encerrado e à oferta entregue contam como fixas
+        self.assertEqual(
+            self.quantities(),
+            {
+                (closed.pk, delivered.pk): 10,
+                (closed.pk, shared.pk): 1,
+                (pending.pk, delivered.pk): 2,
+                (pending.pk, shared.pk): 8,
+            },
+        )
+
+    def test_weighed_rows_stay_fixed(self):
+        order = self.order(10)
+        late = self.offer(10, start=3)
+        allocate(self.product)
+        weighed = Distribution.objects.get()
+        Buy.objects.create(
+            distribution=weighed,
+            quantity_received=10,
+            unity_price=2,
+            total_value=20,
+            delivery_date=day(5),
+        )
+        # Uma oferta mais antiga tomaria o lugar da linha já pesada (PROTECT)
+        early = self.offer(10)
+        self.assertFalse(recalculate(offers=[early]).has_changes)
+
+        order.quantity = 15
+        order.save()
+        diff = recalculate(products=[self.product])
+        self.assertEqual((diff.updated, diff.deleted), ([], []))
+        self.assertEqual(
+            self.quantities(), {(order.pk, late.pk): 10, (order.pk, early.pk): 5}
+        )
+
+
+class MinCostFlowTests(SimpleTestCase):
+    def solve_transport(self, supplies, demands, costs):
+        network = MinCostFlow(2 + len(supplies) + len(demands))
+        first_demand = 2 + len(supplies)
+        for i, supply in enumerate(supplies):
+            network.add_edge(0, 2 + i, supply, 0)
+        for j, demand in enumerate(demands):
+            network.add_edge(first_demand + j, 1, demand, 0)
+        for i, row in enumerate(costs):
+            for j, cost in enumerate(row):
+                network.add_edge(2 + i, first_demand + j, demands[j], cost)
+        return network.solve(0, 1)
+
+    def brute_force(self, supplies, demands, costs):
+        best = (0, 0)
+        cells = [(i, j) for i in range(len(supplies)) for j in range(len(demands))]
+        ranges = [range(min(supplies[i], demands[j]) + 1) for i, j in cells]
+        for flows in itertools.product(*ranges):
+            sent = [0] * len(supplies)
+            received = [0] * len(demands)
+            for (i, j), flow in zip(cells, flows, strict=True):
+                sent[i] += flow
+                received[j] += flow
+            if any(a > b for a, b in zip(sent, supplies, strict=True)):
+                continue
+            if any(a > b for a, b in zip(received, demands, strict=True)):
+                continue
+            total = sum(flows)
+            cost = sum(f * costs[i][j] for (i, j), f in zip(cells, flows, strict=True))
+            if total > best[0] or (total == best[0] and cost < best[1]):
+                best = (total, cost)
+        return best
+
+    def test_matches_exhaustive_search(self):
+        rng = random.Random(7)
+        for _ in range(40):
+            supplies = [rng.randint(0, 3) for _ in range(2)]
+            demands = [rng.randint(0, 3) for _ in range(3)]
+            costs = [[rng.randint(1, 9) for _ in demands] for _ in supplies]
+            self.assertEqual(
+                self.solve_transport(supplies, demands, costs),
+                self.brute_force(supplies, demands, costs),
+            )
+
+    def test_optimal_allocation_prefers_close_regions(self):
+        # Duas macroregiões distantes (custo 9); cada cliente tem um cooperado local
+        matrix = AffinityMatrix([1, 2], [(1, 2, 9)], [(10, 1), (20, 2)])
+        orders = [
+            SimpleNamespace(pk=1, product_id=1, delivery_date=day(3), client_region_id=20),
+            SimpleNamespace(pk=2, product_id=1, delivery_date=day(4), client_region_id=10),
+        ]
+        offers = [
+            SimpleNamespace(
+                pk=pk,
+                product_id=1,
+                start_date=day(0),
+                end_date=day(10),
+                cooperated_region_id=region,
+                shelf_life=5,
+                production_time=0,
+            )
+            for pk, region in ((1, 10), (2, 20))
+        ]
+        remaining = {1: Decimal('2.5'), 2: Decimal('2.5')}
+
+        greedy = compute_allocation(orders, offers, remaining, remaining)
+        optimal = compute_optimal_allocation(
+            orders, offers, remaining, remaining, matrix=matrix
+        )
+        self.assertEqual({(a.order_id, a.offer_id) for a in greedy}, {(1, 1), (2, 2)})
+        self.assertEqual(
+            {(a.order_id, a.offer_id, a.quantity) for a in optimal},
+            {(1, 2, Decimal('2.5')), (2, 1, Decimal('2.5'))},
+        )
+        # Pares já existentes continuam proibidos
+        optimal = compute_optimal_allocation(
+            orders, offers, remaining, remaining, existing_pairs={(1, 2)}, matrix=matrix
+        )
+        self.assertNotIn((1, 2), {(a.order_id, a.offer_id) for a in optimal})
+        self.assertEqual(sum(a.quantity for a in optimal), 5)
+
+
+class PlanTests(DistributionTestCase):
+    def setUp(self):
+        self.order_record = self.order(10)
+        self.kept = self.offer(6)
+        self.dropped = self.offer(10, start=1)
+        Distribution.objects.create(order=self.order_record, offer=self.kept, quantity=2)
+        Distribution.objects.create(order=self.order_record, offer=self.dropped, quantity=3)
+
+    def test_plan_reports_diff_and_fill_without_writing(self):
+        before = list(Distribution.objects.values_list('order_id', 'offer_id', 'quantity'))
+        # Pedidos, ofertas e distribuições do produto
+        with self.assertNumQueries(3):
+            plan = plan_distributions(products=[self.product])
+        self.assertEqual(
+            list(Distribution.objects.values_list('order_id', 'offer_id', 'quantity')),
+            before,
+        )
+        data = plan.as_dict()
+        self.assertEqual(
+            data['summary'],
+            {
+                'orders': 1,
+                'offers': 2,
+                'created': 0,
+                'changed': 2,
+                'removed': 0,
+                'unchanged': 0,
+            },
+        )
+        self.assertEqual(
+            [(row['quantity_before'], row['quantity_after']) for row in data['changed']],
+            [('2.00', '6.00'), ('3.00', '4.00')],
+        )
+        self.assertEqual(
+            [(row['fill_before'], row['fill_after']) for row in data['orders']],
+            [('50.00', '100.00')],
+        )
+
+        apply_diff(plan.diff)
+        self.assertEqual(self.allocated(self.order_record), 10)
+        self.assertFalse(plan_distributions(orders=[self.order_record]).has_changes)
+
+    def test_weighed_rows_are_not_planned(self):
+        weighed = Distribution.objects.get(offer=self.dropped)
+        Buy.objects.create(
+            distribution=weighed,
+            quantity_received=3,
+            unity_price=2,
+            total_value=6,
+            delivery_date=day(5),
+        )
+        plan = plan_distributions(products=[self.product])
+        data = plan.as_dict()
+        self.assertEqual((data['summary']['changed'], data['summary']['removed']), (1, 0))
+        self.assertEqual(
+            [(row['offer'], row['quantity_after']) for row in data['changed']],
+            [(self.kept.pk, '6.00')],
+        )
+        self.assertEqual(data['orders'][0]['fill_after'], '90.00')
+        apply_diff(plan.diff)
+        weighed.refresh_from_db()
+        self.assertEqual(weighed.quantity, 3)
+
+    def test_api_and_command(self):
+        api = APIClient()
+        api.force_authenticate(self.cooperated)
+        url = f'/api/distributions/plan/?product={self.product.pk}&method=optimal'
+        self.assertEqual(api.get(url).status_code, 403)
+        api.force_authenticate(
+            User.objects.create_admin_user('admin', 'admin@example.com', 'Admin')
+        )
+        response = api.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary']['changed'], 2)
+        self.assertEqual(api.get('/api/distributions/plan/?method=x').status_code, 400)
+
+        out = StringIO()
+        call_command('plan_distribution', order=[self.order_record.pk], stdout=out)
+        self.assertIn('2 alteradas', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('plan_distribution')
+
+
+class CandidateMatchingTests(DistributionTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        north = Macroregion.objects.create(name='Norte')
+        south = Macroregion.objects.create(name='Sul')
+        cls.near = Region.objects.create(name='Norte 1', macroregion=north)
+        cls.far = Region.objects.create(name='Sul 1', macroregion=south)
+        cls.matrix = AffinityMatrix(
+            [north.pk, south.pk],
+            [(north.pk, south.pk, 5)],
+            [(cls.near.pk, north.pk), (cls.far.pk, south.pk)],
+        )
+        cls.client_record.region = cls.near
+        cls.client_record.save()
+
+    def cooperated_in(self, region):
+        return User.objects.create_user(
+            f'coop{User.objects.count()}', full_name='Cooperado', region=region
+        )
+
+    def test_offers_for_orders_by_window_and_affinity(self):
+        order = self.order(10, delivery=5)
+        early = self.order(10, delivery=1)
+        far = self.offer(10, start=0, end=9, cooperated=self.cooperated_in(self.far))
+        near = self.offer(3, start=4, end=5, cooperated=self.cooperated_in(self.near))
+        self.offer(10, start=6, end=9)
+        full = self.offer(4, start=0, end=9)
+        Distribution.objects.create(order=early, offer=full, quantity=4)
+
+        with self.assertNumQueries(2):
+            candidates = offer_candidates([order, early], matrix=self.matrix)
+        self.assertEqual(
+            [(c.offer_id, c.affinity, c.remaining) for c in candidates[order.pk]],
+            [(near.pk, 1, 3), (far.pk, 5, 10)],
+        )
+        self.assertEqual([c.offer_id for c in candidates[early.pk]], [far.pk])
+        limited = offer_candidates([order], limit=1, matrix=self.matrix)
+        self.assertEqual([c.offer_id for c in limited[order.pk]], [near.pk])
+
+    def test_orders_for_offers(self):
+        inside = [self.order(10, delivery=d) for d in (2, 4)]
+        self.order(10, delivery=9)
+        self.order(10, delivery=3, status=Order.OrderStatus.CANCELLED)
+        offer = self.offer(10, start=2, end=5, cooperated=self.cooperated_in(self.near))
+
+        with self.assertNumQueries(2):
+            candidates = order_candidates([offer.pk], matrix=self.matrix)
+        self.assertEqual(
+            sorted(c.order_id for c in candidates[offer.pk]), [o.pk for o in inside]
+        )
+        self.assertEqual(order_candidates([], matrix=self.matrix), {})
+
+
+class ApiTestCase(TestCase):
+    # MAX(updated_at)/COUNT do validador de cache + SELECT da página com select_related
+    # e anotações (paginação por cursor, sem COUNT da paginação)
+    LIST_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_admin_user('admin', 'admin@example.com', 'Admin')
+        cls.product = Product.objects.create(
+            name='Alface', production_time=1, default_purchase_value=2, shelf_life=5
+        )
+        cls.client_record = Client.objects.create(name='Escola')
+
+    def setUp(self):
+        # O rollback de cada teste desfaz as linhas, mas não as gerações
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def create_rows(self, count):
+        start = date(2030, 1, 1)
+        for i in range(count):
+            cooperated = User.objects.create_user(
+                f'coop{Offer.objects.count()}', full_name=f'Cooperado {i}'
+            )
+            order = Order.objects.create(
+                client=self.client_record,
+                product=self.product,
+                quantity=10,
+                unit_price=3,
+                total_value=30,
+                delivery_date=start + timedelta(days=i % 5),
+            )
+            offer = Offer.objects.create(
+                product=self.product,
+                cooperated=cooperated,
+                quantity=20,
+                start_date=start,
+                end_date=start + timedelta(days=10),
+            )
+            Distribution.objects.create(order=order, offer=offer, quantity=4)
+
+
+class ApiQueryBudgetTests(ApiTestCase):
+    """As listagens da API custam uma consulta por página, sem N+1."""
+
+    def assert_constant_queries(self, url):
+        self.create_rows(2)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+
+        self.create_rows(20)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.api.get(url)
+        self.assertEqual(len(response.data['results']), 22)
+        return response
+
+    def test_order_list(self):
+        response = self.assert_constant_queries('/api/orders/')
+        row = response.data['results'][0]
+        self.assertEqual(row['client_name'], 'Escola')
+        self.assertEqual(Decimal(row['remaining']), Decimal(6))
+
+    def test_offer_list(self):
+        response = self.assert_constant_queries('/api/offers/')
+        row = response.data['results'][0]
+        self.assertEqual(Decimal(row['allocated_quantity']), Decimal(4))
+        self.assertEqual(Decimal(row['remaining']), Decimal(16))
+
+    def test_distribution_list(self):
+        response = self.assert_constant_queries('/api/distributions/')
+        self.assertEqual(response.data['results'][0]['product_name'], 'Alface')
+
+    def test_cooperated_sees_only_own_offers(self):
+        self.create_rows(3)
+        cooperated = Offer.objects.first().cooperated
+        self.api.force_authenticate(cooperated)
+        response = self.api.get('/api/offers/')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(self.api.get('/api/orders/').status_code, 403)
+
+
+class QueryParamFilterTests(ApiTestCase):
+    def test_filters_convert_values(self):
+        self.create_rows(3)
+        order = Order.objects.order_by('pk').first()
+        response = self.api.get(f'/api/distributions/?order={order.pk}&source=AUTO')
+        self.assertEqual([row['order'] for row in response.data['results']], [order.pk])
+        response = self.api.get('/api/orders/?status=PARTIAL')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_invalid_values_return_400(self):
+        for url, param in (
+            ('/api/orders/?product=abc', 'product'),
+            ('/api/orders/?status=XYZ', 'status'),
+            ('/api/distributions/?product=1.5', 'product'),
+            ('/api/buys/?delivery_date=ontem', 'delivery_date'),
+        ):
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn(param, response.data)
+
+
+class KeysetPaginationTests(ApiTestCase):
+    """Páginas profundas custam o mesmo que a primeira e não repetem linhas."""
+
+    def walk(self, url):
+        ids = []
+        pages = 0
+        while url:
+            with self.assertNumQueries(self.LIST_QUERIES):
+                response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+            pages += 1
+        return ids, pages
+
+    def test_orders_with_tied_delivery_dates(self):
+        # Cinco datas para 23 pedidos: o desempate por id precisa funcionar
+        self.create_rows(23)
+        ids, pages = self.walk('/api/orders/?page_size=4')
+        self.assertEqual(pages, 6)
+        expected = list(
+            Order.objects.order_by('delivery_date', 'pk').values_list('pk', flat=True)
+        )
+        self.assertEqual(ids, expected)
+
+    def test_offers_newest_first_and_previous_link(self):
+        self.create_rows(7)
+        ids, _ = self.walk('/api/offers/?page_size=3')
+        expected = Offer.objects.order_by('-created_at', '-pk').values_list('pk', flat=True)
+        self.assertEqual(ids, list(expected))
+        first = self.api.get('/api/offers/?page_size=3')
+        self.assertIsNone(first.data['previous'])
+        second = self.api.get(first.data['next'])
+        back = self.api.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.api.get('/api/offers/?cursor=abc').status_code, 404)
+
+
+class ConditionalGetTests(ApiTestCase):
+    def test_unchanged_list_returns_304_without_queries(self):
+        self.create_rows(5)
+        response = self.api.get('/api/offers/')
+        self.assertIn('Last-Modified', response)
+        # Os validadores vêm do cache de respostas, sem o MAX(updated_at)/COUNT
+        with self.assertNumQueries(0):
+            cached = self.api.get('/api/offers/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_allocation_change_invalidates_list_and_detail(self):
+        self.create_rows(2)
+        offer = Offer.objects.order_by('pk').first()
+        url = f'/api/offers/{offer.pk}/'
+        detail = self.api.get(url)
+        listing = self.api.get('/api/offers/')
+        self.assertEqual(
+            self.api.get(url, HTTP_IF_NONE_MATCH=detail['ETag']).status_code, 304
+        )
+
+        # Nova distribuição altera allocated_quantity via UPDATE com F()
+        Distribution.objects.create(
+            order=Order.objects.order_by('pk').last(), offer=offer, quantity=1
+        )
+        self.assertEqual(
+            self.api.get(url, HTTP_IF_NONE_MATCH=detail['ETag']).status_code, 200
+        )
+        response = self.api.get('/api/offers/', HTTP_IF_NONE_MATCH=listing['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    def test_renaming_an_embedded_model_changes_the_etag(self):
+        self.create_rows(2)
+        order = Order.objects.order_by('pk').first()
+        urls = ['/api/orders/', f'/api/orders/{order.pk}/']
+        before = {url: self.api.get(url) for url in urls}
+        self.product.name = 'Alface crespa'
+        self.product.save()
+        for url in urls:
+            response = self.api.get(url, HTTP_IF_NONE_MATCH=before[url]['ETag'])
+            self.assertEqual(response.status_code, 200, url)
+            # If-Modified-Since não vê a mudança do produto e não gera 304, nem com a
+            # resposta já no cache
+            response = self.api.get(
+                url, HTTP_IF_MODIFIED_SINCE=before[url]['Last-Modified']
+            )
+            self.assertEqual(response.status_code, 200, url)
+
+    def test_etag_depends_on_query_params(self):
+        self.create_rows(2)
+        response = self.api.get('/api/orders/')
+        other = self.api.get(
+            '/api/orders/?status=OPEN', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(other.status_code, 200)
+
+
+class OfferBulkCreateTests(ApiTestCase):
+    def rows(self, count, **overrides):
+        cooperated = User.objects.create_user('produtor', full_name='Produtor')
+        row = {
+            'product': self.product.pk,
+            'cooperated': cooperated.pk,
+            'quantity': '12.5',
+            'start_date': '2030-01-06',
+            'end_date': '2030-01-12',
+        }
+        return [{**row, **overrides} for _ in range(count)]
+
+    def test_creates_batch_with_constant_queries(self):
+        # Poucas linhas para caber em um INSERT no limite de parâmetros do SQLite
+        rows = self.rows(60)
+        active_products.all()
+        # cooperados e um INSERT entre SAVEPOINT/RELEASE; produtos vêm da memória
+        with self.assertNumQueries(4):
+            response = self.api.post('/api/offers/bulk/', {'offers': rows}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 60)
+        self.assertEqual(Offer.objects.filter(created_by=self.admin).count(), 60)
+
+    def test_reports_row_errors_and_creates_nothing(self):
+        rows = self.rows(3)
+        rows[1]['quantity'] = '0'
+        rows[2]['end_date'] = '2030-01-01'
+        rows[2]['product'] = 9999
+        response = self.api.post('/api/offers/bulk/', {'offers': rows}, format='json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.data['offers']
+        self.assertEqual(sorted(errors), ['1', '2'])
+        self.assertEqual(len(errors['2']), 2)
+        self.assertFalse(Offer.objects.exists())
+
+
+class SparseFieldsTests(ApiTestCase):
+    def test_fields_trim_payload_and_select(self):
+        self.create_rows(3)
+        with self.assertNumQueries(self.LIST_QUERIES) as queries:
+            response = self.api.get('/api/orders/?fields=id,quantity,status_display')
+        row = response.data['results'][0]
+        self.assertEqual(set(row), {'id', 'quantity', 'status_display'})
+        sql = queries.captured_queries[-1]['sql']
+        self.assertNotIn('catalog_client', sql)
+        self.assertNotIn('"notes"', sql)
+
+    def test_expand_nests_only_requested_relations(self):
+        self.create_rows(3)
+        with self.assertNumQueries(self.LIST_QUERIES) as queries:
+            response = self.api.get('/api/offers/?fields=id,cooperated&expand=cooperated')
+        row = response.data['results'][0]
+        self.assertEqual(set(row['cooperated']), {'id', 'full_name'})
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('users_user', sql)
+        self.assertNotIn('catalog_product', sql)
+        self.assertNotIn('"password"', sql)
+
+
+class SyncTests(TransactionTestCase):
+    """Sem a transação de TestCase: cada escrita recebe o próprio número no commit."""
+
+    create_rows = ApiTestCase.create_rows
+
+    def setUp(self):
+        self.admin = User.objects.create_admin_user('admin', 'admin@example.com', 'Admin')
+        self.product = Product.objects.create(
+            name='Alface', production_time=1, default_purchase_value=2, shelf_life=5
+        )
+        self.client_record = Client.objects.create(name='Escola')
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def sync(self, watermark=''):
+        response = self.api.get(f'/api/sync/?limit=5&watermark={watermark}')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def sync_all(self, watermark=''):
+        data = self.sync(watermark)
+        while data['has_more']:
+            data = self.sync(data['watermark'])
+        return data['watermark']
+
+    def test_no_change_sync_is_one_query_per_source(self):
+        self.create_rows(7)
+        watermark = self.sync_all()
+        # Retenção dos Tombstones, 6 fontes e remoções
+        with self.assertNumQueries(8):
+            data = self.sync(watermark)
+        self.assertFalse(data['has_more'])
+        self.assertFalse(data['reset'])
+        self.assertFalse(any(data['changes'].values()))
+        self.assertEqual(data['deleted'], [])
+
+    def test_changes_deletions_and_deactivations(self):
+        self.create_rows(2)
+        watermark = self.sync_all()
+        distribution = Distribution.objects.order_by('pk').first()
+        distribution_id = distribution.pk
+        distribution.delete()
+        self.product.is_active = False
+        self.product.save()
+
+        data = self.sync(watermark)
+        # A remoção muda allocated_quantity do pedido e da oferta
+        self.assertEqual(
+            [row['id'] for row in data['changes']['offers']], [distribution.offer_id]
+        )
+        self.assertEqual(len(data['changes']['orders']), 1)
+        self.assertEqual(
+            data['deleted'],
+            [
+                {'model': 'products', 'id': self.product.pk, 'reason': 'inactive'},
+                {'model': 'distributions', 'id': distribution_id, 'reason': 'deleted'},
+            ],
+        )
+
+    def test_transaction_stamped_before_the_watermark_is_delivered(self):
+        self.create_rows(2)
+        order = Order.objects.order_by('pk').first()
+        # updated_at lido do relógio muito antes do commit, como em apply_diff
+        stamped_at = timezone.now() - timedelta(minutes=10)
+        watermark = self.sync_all()
+        Order.objects.filter(pk=order.pk).update(notes='Atrasado', updated_at=stamped_at)
+
+        data = self.sync(watermark)
+        self.assertEqual([row['id'] for row in data['changes']['orders']], [order.pk])
+        self.assertEqual(data['changes']['orders'][0]['notes'], 'Atrasado')
+
+    def test_watermark_older_than_pruned_tombstones_resets(self):
+        self.create_rows(2)
+        stale = self.sync_all()
+        Distribution.objects.order_by('pk').first().delete()
+        current = self.sync_all(stale)
+        Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=31))
+        out = StringIO()
+        call_command('prune_tombstones', stdout=out)
+        self.assertIn('1 remoções apagadas', out.getvalue())
+        self.assertFalse(Tombstone.objects.exists())
+
+        # Quem já recebeu a remoção apagada continua de onde parou
+        data = self.sync(current)
+        self.assertFalse(data['reset'])
+        self.assertFalse(any(data['changes'].values()))
+        # Quem não recebeu recomeça do início
+        data = self.sync(stale)
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['changes']['orders']), 2)
+        self.assertEqual(len(data['changes']['distributions']), 1)
+        self.assertFalse(self.sync(data['watermark'])['reset'])
+
+
+class BatchTests(ApiTestCase):
+    def batch(self, requests, atomic=False):
+        response = self.api.post(
+            '/api/batch/', {'requests': requests, 'atomic': atomic}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data['responses']
+
+    def offer_row(self, cooperated, quantity='5'):
+        return {
+            'product': self.product.pk,
+            'cooperated': cooperated.pk,
+            'quantity': quantity,
+            'start_date': '2030-01-06',
+            'end_date': '2030-01-12',
+        }
+
+    def test_reads_several_endpoints(self):
+        self.create_rows(2)
+        responses = self.batch(
+            [
+                {'id': 'offers', 'method': 'GET', 'path': '/api/offers/?fields=id'},
+                {'id': 'orders', 'method': 'GET', 'path': '/api/orders/'},
+                {'method': 'GET', 'path': '/api/batch/'},
+                {'method': 'GET', 'path': '/admin/'},
+            ]
+        )
+        self.assertEqual([r['status'] for r in responses], [200, 200, 400, 400])
+        self.assertEqual(responses[0]['id'], 'offers')
+        self.assertEqual(len(responses[0]['body']['results']), 2)
+        self.assertIn('ETag', responses[1]['headers'])
+
+    def test_atomic_batch_rolls_back_and_reuses_lookups(self):
+        cooperated = User.objects.create_user('produtor', full_name='Produtor')
+        create = {'method': 'POST', 'path': '/api/offers/bulk/'}
+        requests = [
+            {**create, 'body': {'offers': [self.offer_row(cooperated)]}},
+            {**create, 'body': {'offers': [self.offer_row(cooperated)]}},
+            {**create, 'body': {'offers': [self.offer_row(cooperated, '0')]}},
+            {'method': 'GET', 'path': '/api/offers/'},
+        ]
+        active_products.all()
+        # Cooperados consultados uma vez para o lote inteiro; dois INSERTs entre
+        # SAVEPOINT/RELEASE e a transação do lote, desfeita na terceira
+        with self.assertNumQueries(10):
+            responses = self.batch(requests, atomic=True)
+        self.assertEqual([r['status'] for r in responses], [201, 201, 400, 424])
+        self.assertFalse(Offer.objects.exists())
@@ -0,0 +1,26 @@
+from django.urls import path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+app_name = 'operations'
+
+router = DefaultRouter()
+router.register('orders', views.OrderViewSet, basename='order')
+router.register('offers', views.OfferViewSet, basename='offer')
+router.register('distributions', views.DistributionViewSet, basename='distribution')
+
+urlpatterns = [
+    path('sync/', views.SyncView.as_view(), name='sync'),
+    path('offers/bulk/', views.OfferBulkCreateView.as_view(), name='offer-bulk-create'),
+    path(
+        'distributions/plan/',
+        views.DistributionPlanView.as_view(),
+        name='distribution-plan',
+    ),
+    path(
+        'distributions/recalculate/',
+        views.DistributionRecalculateView.as_view(),
+        name='distribution-recalculate',
+    ),
+] + router.urls
@@ -1,3 +1,221 @@
-from django.shortcuts import render
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.urls import reverse
+from rest_framework import serializers, status, viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from catalog.models import Client, Product, Unit
+from common.mixins import (
+    ConditionalGetMixin,
+    CooperatedScopeMixin,
+    QueryParamFilterMixin,
+    ResponseCacheMixin,
+    SparseFieldsMixin,
+)
+from common.pagination import DeliveryDateKeysetPagination
+from common.sync import DEFAULT_LIMIT, MAX_LIMIT, InvalidWatermarkError, collect_changes
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from users.models import User
+from users.permissions import IsCoopAdmin
+
+from .models import Distribution, Offer, Order
+from .serializers import (
+    DistributionSeedSerializer,
+    DistributionSerializer,
+    OfferBulkCreateSerializer,
+    OfferSerializer,
+    OrderSerializer,
+)
+from .services import ALLOCATORS, create_offers, plan_distributions
+from .sync import SYNC_SOURCES
+
+
+class DistributionPlanView(APIView):
+    """
+    Plano de distribuição (somente leitura): o que o recálculo mudaria.
+
+    GET /api/distributions/plan/?product=1&order=2&order=3&method=optimal
+    """
+
+    permission_classes = [IsCoopAdmin]
+
+    def get(self, request):
+        serializer = DistributionSeedSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        plan = plan_distributions(
+            orders=data.get('order', ()),
+            offers=data.get('offer', ()),
+            products=data.get('product', ()),
+            allocator=ALLOCATORS[data['method']],
+        )
+        return Response(plan.as_dict())
+
+
+class DistributionRecalculateView(APIView):
+    """
+    Agenda o recálculo das distribuições no worker e retorna o job criado.
+
+    POST /api/distributions/recalculate/ {"product": [1], "method": "greedy"}
+    O andamento fica em /api/jobs/<id>/.
+    """
+
+    permission_classes = [IsCoopAdmin]
+
+    def post(self, request):
+        serializer = DistributionSeedSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        job = enqueue(
+            'operations.recalculate',
+            {
+                'orders': data.get('order', []),
+                'offers': data.get('offer', []),
+                'products': data.get('product', []),
+                'method': data['method'],
+            },
+            user=request.user,
+        )
+        return Response(
+            JobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': reverse('jobs:job-status', args=[job.pk])},
+        )
+
+
+class OfferBulkCreateView(APIView):
+    """
+    Cadastra as ofertas da semana de vários cooperados em uma única transação.
+
+    POST /api/offers/bulk/ {"offers": [{"product": 1, "cooperated": 2, ...}, ...]}
+    Se alguma linha for inválida nada é gravado, e os erros vêm indexados pela posição
+    da linha: {"offers": {"3": ["..."]}}.
+    """
+
+    permission_classes = [IsCoopAdmin]
+
+    def post(self, request):
+        serializer = OfferBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        offers = [
+            Offer(
+                product_id=row['product'],
+                cooperated_id=row['cooperated'],
+                quantity=row['quantity'],
+                start_date=row['start_date'],
+                end_date=row['end_date'],
+                notes=row.get('notes'),
+            )
+            for row in serializer.validated_data['offers']
+        ]
+        try:
+            created = create_offers(offers, user=request.user)
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError({'offers': exc.message_dict}) from None
+        return Response(
+            {'created': len(created), 'ids': [offer.pk for offer in created]},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+# As listagens usam select_related, anotações e paginação por cursor (keyset): cada
+# página custa o validador de cache (ConditionalGetMixin) e uma consulta, independente
+# da quantidade de linhas e da profundidade. Enquanto os modelos em cache_models não
+# mudam, a página sai do cache de respostas (ResponseCacheMixin) sem consultas.
+
+
+class OrderViewSet(
+    ResponseCacheMixin,
+    ConditionalGetMixin,
+    QueryParamFilterMixin,
+    SparseFieldsMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    permission_classes = [IsCoopAdmin]
+    pagination_class = DeliveryDateKeysetPagination
+    serializer_class = OrderSerializer
+    queryset = (
+        Order.objects.select_related('client', 'product')
+        .with_remaining()
+        .order_by('delivery_date', 'pk')
+    )
+    filter_params = {
+        'status': 'status',
+        'product': 'product_id',
+        'client': 'client_id',
+    }
+    cache_models = (Order, Client, Product, Unit)
+
+
+class OfferViewSet(
+    ResponseCacheMixin,
+    ConditionalGetMixin,
+    CooperatedScopeMixin,
+    QueryParamFilterMixin,
+    SparseFieldsMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    serializer_class = OfferSerializer
+    queryset = (
+        Offer.objects.select_related('product', 'cooperated')
+        .with_remaining()
+        .order_by('-created_at', '-pk')
+    )
+    cooperated_lookup = 'cooperated'
+    filter_params = {
+        'status': 'status',
+        'product': 'product_id',
+        'cooperated': 'cooperated_id',
+    }
+    cache_models = (Offer, Product, Unit, User)
+
+
+class DistributionViewSet(
+    ResponseCacheMixin,
+    ConditionalGetMixin,
+    CooperatedScopeMixin,
+    QueryParamFilterMixin,
+    SparseFieldsMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    serializer_class = DistributionSerializer
+    queryset = Distribution.objects.select_related(
+        'order__client', 'offer__product', 'offer__cooperated'
+    ).order_by('-created_at', '-pk')
+    cooperated_lookup = 'offer__cooperated'
+    filter_params = {
+        'order': 'order_id',
+        'offer': 'offer_id',
+        'source': 'source',
+        'product': 'offer__product_id',
+    }
+    cache_models = (Distribution, Order, Offer, Client, Product, Unit, User)
+
+
+class SyncView(APIView):
+    """
+    Sincronização incremental para o aplicativo offline.
+
+    GET /api/sync/?watermark=<marca d'água anterior>&limit=200
+    Sem watermark, entrega tudo (paginado). Repetir com o watermark retornado
+    enquanto has_more for verdadeiro; remoções e desativações vêm em "deleted".
+    Com "reset", o watermark é anterior às remoções já apagadas: a resposta recomeça
+    do início e o cliente descarta os dados locais.
+    """
+
+    def get(self, request):
+        limit = request.query_params.get('limit', '')
+        limit = int(limit) if limit.isdigit() else DEFAULT_LIMIT
+        try:
+            data = collect_changes(
+                SYNC_SOURCES,
+                request.user,
+                watermark=request.query_params.get('watermark'),
+                limit=max(1, min(limit, MAX_LIMIT)),
+            )
+        except InvalidWatermarkError:
+            raise serializers.ValidationError(
+                {'watermark': "Marca d'água inválida; sincronize do início."}
+            ) from None
+        return Response(data)
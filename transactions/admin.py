@@ -39,7 +39,7 @@ class BuyAdmin(admin.ModelAdmin):
         'delivery_date',
         'created_at',
     ]
-    list_filter = ['delivery_date', 'created_at']
+    list_filter = ['delivery_date', 'station', 'created_at']
     search_fields = [
         'distribution__offer__product__name',
         'distribution__offer__cooperated__full_name',
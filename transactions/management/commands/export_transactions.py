@@ -0,0 +1,68 @@
+import argparse
+
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from transactions.services import EXPORT_FORMATS, EXPORTS, export
+from transactions.services.export import CHUNK_SIZE
+
+
+def _date(value):
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise argparse.ArgumentTypeError(f'data inválida: {value} (use AAAA-MM-DD)')
+    return parsed
+
+
+class Command(BaseCommand):
+    """
+    Exporta compras ou vendas de um período em CSV ou NDJSON
+    """
+
+    help = (
+        'Grava as compras (buys) ou vendas (sells) do período em CSV ou NDJSON, lendo '
+        'o banco em blocos para manter a memória constante.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORTS))
+        parser.add_argument('--start', type=_date, help='Data inicial (AAAA-MM-DD)')
+        parser.add_argument('--end', type=_date, help='Data final (AAAA-MM-DD)')
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument(
+            '--output', '-o', default='-', help='Arquivo de saída ("-" para stdout)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options['start'] and options['end'] and options['end'] < options['start']:
+            raise CommandError('A data final deve ser posterior à inicial')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size deve ser maior que zero.')
+
+        lines = export(
+            options['kind'],
+            options['format'],
+            options['start'],
+            options['end'],
+            chunk_size=options['chunk_size'],
+        )
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        count = 0
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            for line in lines:
+                output.write(line)
+                count += 1
+        if options['format'] == 'csv':
+            count -= 1
+        self.stderr.write(
+            self.style.SUCCESS(f'{count} linhas gravadas em {options["output"]}.')
+        )
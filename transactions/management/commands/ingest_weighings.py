@@ -0,0 +1,53 @@
+import sys
+
+from django.core.management import CommandError
+from django.core.management.base import BaseCommand
+
+from transactions.models import Buy
+from transactions.services import BATCH_SIZE, ingest_weighings
+
+
+class Command(BaseCommand):
+    """
+    Importa pesagens (NDJSON) de uma balança como compras
+    """
+
+    help = (
+        'Lê um arquivo NDJSON de pesagens (ou a entrada padrão com "-") e grava as '
+        'compras em lotes. Chaves já importadas para a mesma balança são ignoradas.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Arquivo NDJSON ou "-" para a entrada padrão')
+        parser.add_argument('--station', required=True, help='Identificador da balança')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        station = options['station'].strip()
+        max_length = Buy._meta.get_field('station').max_length
+        if not station or len(station) > max_length:
+            raise CommandError(f'--station deve ter entre 1 e {max_length} caracteres.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser maior que zero.')
+
+        if options['path'] == '-':
+            result = ingest_weighings(sys.stdin, station, batch_size=options['batch_size'])
+        else:
+            try:
+                with open(options['path'], encoding='utf-8') as lines:
+                    result = ingest_weighings(
+                        lines, station, batch_size=options['batch_size']
+                    )
+            except OSError as exc:
+                raise CommandError(
+                    f'Não foi possível ler {options["path"]}: {exc}'
+                ) from exc
+
+        for line, messages in sorted(result.errors.items()):
+            self.stderr.write(f'Linha {line}: {" ".join(messages)}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{result.created} compras criadas, {result.duplicates} duplicadas, '
+                f'{len(result.errors)} linhas com erro.'
+            )
+        )
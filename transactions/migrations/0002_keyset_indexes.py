@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="buy",
+            name="total_value",
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10),
+        ),
+        migrations.AddIndex(
+            model_name="buy",
+            index=models.Index(fields=["created_at", "id"], name="buy_created_at_id_idx"),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0002_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="buy",
+            name="ingest_key",
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name="buy",
+            name="station",
+            field=models.CharField(blank=True, default="", max_length=50),
+        ),
+        migrations.AddConstraint(
+            model_name="buy",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("ingest_key__isnull", False)),
+                fields=("station", "ingest_key"),
+                name="buy_station_ingest_key_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("transactions", "0003_buy_ingest_key"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="buy",
+            index=models.Index(
+                fields=["delivery_date", "id"], name="buy_delivery_date_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sell",
+            index=models.Index(
+                fields=["delivery_date", "id"], name="sell_delivery_date_id_idx"
+            ),
+        ),
+    ]
@@ -37,6 +37,10 @@ class Buy(models.Model):
         max_digits=10, decimal_places=2, null=False, blank=True
     )
     delivery_date = models.DateField(null=False)
+    # Origem da pesagem: a balança informa uma chave própria, e reenvios da mesma
+    # chave são ignorados (ver transactions.services.ingest)
+    station = models.CharField(max_length=50, blank=True, default='')
+    ingest_key = models.CharField(max_length=100, null=True, blank=True)
     created_by = models.ForeignKey(
         User, on_delete=models.PROTECT, null=True, blank=True, related_name='created_buys'
     )
@@ -50,6 +54,19 @@ class Buy(models.Model):
     class Meta:
         verbose_name = 'Compra'
         verbose_name_plural = 'Compras'
+        indexes = [
+            # Paginação por cursor da API: (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='buy_created_at_id_idx'),
+            # Exportação por período, já na ordem de leitura
+            models.Index(fields=['delivery_date', 'id'], name='buy_delivery_date_id_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['station', 'ingest_key'],
+                condition=models.Q(ingest_key__isnull=False),
+                name='buy_station_ingest_key_unique',
+            ),
+        ]
 
     def __str__(self):
         if self.distribution:
@@ -63,36 +80,32 @@ class Buy(models.Model):
                 f'recebido de {self.cooperated.full_name}'
             )
 
-    def clean(self):
-        super().clean()
-
-        # Validar quantidade
-        if self.quantity_received <= 0:
-            raise ValidationError('A quantidade deve ser maior que zero.')
+    def calculate_totals(self):
+        """Preenche total_value e as sobras/faltas em relação à distribuição.
 
-        # Lógica do Buy Distribuido
+        Usa apenas self.distribution, sem outras consultas; a importação em lote chama
+        este método com as distribuições já carregadas.
+        """
+        self.total_value = self.quantity_received * self.unity_price
+        self.excess_quantity = Decimal(0)
+        self.missing_quantity = Decimal(0)
         if self.distribution:
-            self.total_value = self.quantity_received * self.unity_price
-
             distribution_quantity = self.distribution.quantity
             if self.quantity_received > distribution_quantity:
                 self.excess_quantity = self.quantity_received - distribution_quantity
-                self.missing_quantity = Decimal(0)
             elif self.quantity_received < distribution_quantity:
                 self.missing_quantity = distribution_quantity - self.quantity_received
-                self.excess_quantity = Decimal(0)
-            else:
-                self.missing_quantity = Decimal(0)
-                self.excess_quantity = Decimal(0)
 
-        # Lógica do Buy Avulso
-        elif not self.distribution:
-            # Validar que Product e Cooperated foram preenchidos
-            if not self.product or not self.cooperated:
-                raise ValidationError(
-                    'Para compra avulsa,Product e Cooperated devem ser preenchidos.'
-                )
-            # Calcula e atribui valores para Buy Avulso
-            self.total_value = self.quantity_received * self.unity_price
-            self.excess_quantity = Decimal(0)
-            self.missing_quantity = Decimal(0)
+    def clean(self):
+        super().clean()
+
+        # Validar quantidade
+        if self.quantity_received <= 0:
+            raise ValidationError('A quantidade deve ser maior que zero.')
+
+        # Compra avulsa: Product e Cooperated devem ser preenchidos
+        if not self.distribution and (not self.product or not self.cooperated):
+            raise ValidationError(
+                'Para compra avulsa,Product e Cooperated devem ser preenchidos.'
+            )
+        self.calculate_totals()
@@ -35,6 +35,10 @@ class Sell(models.Model):
         verbose_name = 'Venda'
         verbose_name_plural = 'Vendas'
         constraints = [models.UniqueConstraint(fields=['order'], name='order_unique')]
+        indexes = [
+            # Exportação por período, já na ordem de leitura
+            models.Index(fields=['delivery_date', 'id'], name='sell_delivery_date_id_idx'),
+        ]
 
     def __str__(self):
         return (
@@ -0,0 +1,120 @@
+from rest_framework import serializers
+
+from common.serializers import SparseFieldsSerializerMixin
+
+from .models import Buy
+from .services import EXPORT_FORMATS
+from .services.delivery_calendar import MAX_DAYS
+
+
+class BuySerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    field_dependencies = {
+        'product_name': [
+            'distribution__offer__product__name',
+            'product__name',
+        ],
+        'cooperated_name': [
+            'distribution__offer__cooperated__full_name',
+            'cooperated__full_name',
+        ],
+    }
+
+    product_name = serializers.SerializerMethodField()
+    cooperated_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Buy
+        fields = [
+            'id',
+            'distribution',
+            'product',
+            'product_name',
+            'cooperated',
+            'cooperated_name',
+            'quantity_received',
+            'excess_quantity',
+            'missing_quantity',
+            'unity_price',
+            'total_value',
+            'delivery_date',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+    def get_product_name(self, obj):
+        # Compra distribuída usa o produto da oferta; avulsa, o próprio campo
+        if obj.distribution_id:
+            return obj.distribution.offer.product.name
+        return obj.product.name if obj.product_id else None
+
+    def get_cooperated_name(self, obj):
+        if obj.distribution_id:
+            return obj.distribution.offer.cooperated.full_name
+        return obj.cooperated.full_name if obj.cooperated_id else None
+
+
+class ExportQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    output = serializers.ChoiceField(choices=EXPORT_FORMATS, default='csv')
+
+    def validate(self, attrs):
+        if attrs.get('start') and attrs.get('end') and attrs['end'] < attrs['start']:
+            raise serializers.ValidationError('A data final deve ser posterior à inicial')
+        return attrs
+
+
+class UpcomingDeliverySerializer(serializers.Serializer):
+    delivery_date = serializers.DateField()
+    product = serializers.IntegerField()
+    product_name = serializers.CharField()
+    quantity = serializers.DecimalField(max_digits=12, decimal_places=2)
+    orders = serializers.IntegerField()
+
+
+class DashboardSerializer(serializers.Serializer):
+    date = serializers.DateField()
+    open_offers = serializers.IntegerField()
+    offered_quantity = serializers.DecimalField(max_digits=12, decimal_places=2)
+    allocated_quantity = serializers.DecimalField(max_digits=12, decimal_places=2)
+    remaining_quantity = serializers.DecimalField(max_digits=12, decimal_places=2)
+    buys = serializers.IntegerField()
+    received_quantity = serializers.DecimalField(max_digits=12, decimal_places=2)
+    received_value = serializers.DecimalField(max_digits=12, decimal_places=2)
+    upcoming = UpcomingDeliverySerializer(many=True)
+
+
+class DeliveryCalendarQuerySerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, attrs):
+        days = (attrs['end'] - attrs['start']).days
+        if days < 0:
+            raise serializers.ValidationError('A data final deve ser posterior à inicial')
+        if days >= MAX_DAYS:
+            raise serializers.ValidationError(f'O período deve ter até {MAX_DAYS} dias')
+        return attrs
+
+
+class DeliveryDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    ordered = serializers.DecimalField(max_digits=14, decimal_places=2)
+    distributed = serializers.DecimalField(max_digits=14, decimal_places=2)
+    received = serializers.DecimalField(max_digits=14, decimal_places=2)
+    delivered = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class DeliveryTotalsSerializer(serializers.Serializer):
+    ordered = serializers.DecimalField(max_digits=14, decimal_places=2)
+    distributed = serializers.DecimalField(max_digits=14, decimal_places=2)
+    received = serializers.DecimalField(max_digits=14, decimal_places=2)
+    delivered = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class DeliveryCalendarSerializer(serializers.Serializer):
+    start = serializers.DateField()
+    end = serializers.DateField()
+    days = DeliveryDaySerializer(many=True)
+    totals = DeliveryTotalsSerializer()
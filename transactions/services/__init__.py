@@ -0,0 +1,13 @@
+from .export import EXPORT_FORMATS, EXPORTS, export
+from .ingest import BATCH_SIZE, IngestResult, ingest_batch, ingest_weighings, parse_lines
+
+__all__ = [
+    'BATCH_SIZE',
+    'EXPORTS',
+    'EXPORT_FORMATS',
+    'IngestResult',
+    'export',
+    'ingest_batch',
+    'ingest_weighings',
+    'parse_lines',
+]
@@ -0,0 +1,167 @@
+"""Painel do cooperado: ofertas, entregas previstas e compras recebidas.
+
+Servido pela view assíncrona (ver transactions.views.CooperatedDashboardView) com
+duas consultas: a linha do cooperado com os agregados de ofertas e de compras como
+subconsultas, e a lista de entregas previstas. As consultas assíncronas do ORM rodam
+uma a uma na mesma thread (sync_to_async), então não há ganho em dispará-las juntas;
+o que conta é o número de idas ao banco. O resultado já serializado
+fica no cache de respostas (settings.RESPONSE_CACHE_ALIAS), com a data e duas
+gerações na chave: a de cada cooperado e a de todos os painéis, guardadas no cache
+compartilhado entre os processos (settings.GENERATION_CACHE_ALIAS), como as gerações
+dos modelos em common.generations. Os sinais em transactions/signals.py trocam a
+geração quando ofertas, distribuições ou compras do cooperado mudam, e a data na
+chave cobre a virada do dia.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from common.generations import CACHE_ALIAS as GENERATION_CACHE_ALIAS
+from operations.models import Distribution, Offer, Order
+from transactions.models import Buy
+from users.models import User
+
+CACHE_TIMEOUT = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+UPCOMING_LIMIT = 20
+RESPONSE_CACHE_ALIAS = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+_GENERATION_KEY = 'generation:dashboard'
+
+OPEN_OFFER_STATUSES = (
+    Offer.OfferStatus.NOT_ALLOCATED,
+    Offer.OfferStatus.PARTIALLY_ALLOCATED,
+    Offer.OfferStatus.ALLOCATED,
+)
+
+
+def _total(queryset, aggregate):
+    """Subconsulta com um agregado sobre todo o queryset (sem GROUP BY)."""
+    output_field = DecimalField(max_digits=12, decimal_places=2)
+    value = Subquery(
+        queryset.order_by()
+        .annotate(_all=Value(1))
+        .values('_all')
+        .annotate(value=aggregate)
+        .values('value')
+    )
+    if isinstance(aggregate, Count):
+        return value
+    return Coalesce(value, 0, output_field=output_field)
+
+
+def _totals(user_id):
+    """O cooperado com os agregados de ofertas abertas e de compras, numa consulta."""
+    offers = Offer.objects.filter(
+        cooperated_id=OuterRef('pk'), status__in=OPEN_OFFER_STATUSES
+    )
+    buys = Buy.objects.filter(
+        Q(distribution__offer__cooperated_id=OuterRef('pk'))
+        | Q(cooperated_id=OuterRef('pk'))
+    )
+    return (
+        User.objects.filter(pk=user_id)
+        .order_by()
+        .values(
+            open_offers=_total(offers, Count('pk')),
+            offered_quantity=_total(offers, Sum('quantity')),
+            allocated_quantity=_total(offers, Sum('allocated_quantity')),
+            buys=_total(buys, Count('pk')),
+            received_quantity=_total(buys, Sum('quantity_received')),
+            received_value=_total(buys, Sum('total_value')),
+        )
+    )
+
+
+def _upcoming(user_id, today):
+    return (
+        Distribution.objects.filter(
+            offer__cooperated_id=user_id,
+            order__delivery_date__gte=today,
+            order__status__in=[
+                Order.OrderStatus.OPEN,
+                Order.OrderStatus.PARTIAL,
+                Order.OrderStatus.FILLED,
+            ],
+        )
+        .values(
+            delivery_date=F('order__delivery_date'),
+            product=F('offer__product_id'),
+            product_name=F('offer__product__name'),
+        )
+        .annotate(quantity=Sum('quantity'), orders=Count('order_id'))
+        .order_by('delivery_date', 'product_name')[:UPCOMING_LIMIT]
+    )
+
+
+async def _alist(queryset):
+    return [row async for row in queryset]
+
+
+async def abuild_dashboard(user_id, today=None):
+    """Calcula o painel sem cache; None se o usuário não existe."""
+    today = today or timezone.localdate()
+    totals = await _totals(user_id).afirst()
+    if totals is None:
+        return None
+    upcoming = await _alist(_upcoming(user_id, today))
+    totals['remaining_quantity'] = totals['offered_quantity'] - totals['allocated_quantity']
+    return {**totals, 'date': today, 'upcoming': upcoming}
+
+
+def _user_generation_key(user_id):
+    return f'{_GENERATION_KEY}:{user_id}'
+
+
+def _new_generation():
+    return uuid.uuid4().hex
+
+
+async def _agenerations(user_id):
+    """Gerações (de todos os painéis, do cooperado), iniciando as que faltam."""
+    cache = caches[GENERATION_CACHE_ALIAS]
+    keys = [_GENERATION_KEY, _user_generation_key(user_id)]
+    current = await cache.aget_many(keys)
+    missing = {key: _new_generation() for key in keys if key not in current}
+    if missing:
+        await cache.aset_many(missing, None)
+        current.update(missing)
+    return [current[key] for key in keys]
+
+
+def _cache_key(generations, user_id, today):
+    return f'dashboard:{":".join(generations)}:{user_id}:{today.isoformat()}'
+
+
+async def aget_dashboard(user_id, serialize=lambda data: data):
+    """Painel do cache, ou calculado e guardado já serializado por `serialize`."""
+    cache = caches[RESPONSE_CACHE_ALIAS]
+    today = timezone.localdate()
+    key = _cache_key(await _agenerations(user_id), user_id, today)
+    data = await cache.aget(key)
+    if data is None:
+        data = await abuild_dashboard(user_id, today)
+        if data is None:
+            return None
+        data = serialize(data)
+        await cache.aset(key, data, CACHE_TIMEOUT)
+    return data
+
+
+def invalidate_dashboards(user_ids=None):
+    """Descarta o painel dos cooperados informados (None = de todos).
+
+    Troca as gerações no cache compartilhado, então vale para todos os processos; as
+    entradas antigas deixam de ser lidas e expiram pelo timeout.
+    """
+    if user_ids is None:
+        keys = [_GENERATION_KEY]
+    else:
+        keys = [_user_generation_key(user_id) for user_id in set(user_ids) if user_id]
+    if keys:
+        caches[GENERATION_CACHE_ALIAS].set_many(
+            {key: _new_generation() for key in keys}, None
+        )
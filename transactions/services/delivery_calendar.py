@@ -0,0 +1,58 @@
+"""Calendário de entregas: por dia, o pedido, o distribuído, o recebido e o entregue.
+
+Cada coluna vem de uma consulta agrupada por data sobre uma tabela diferente
+(pedidos, distribuições, compras e vendas), usando os índices por data de entrega;
+as quatro são independentes e a view assíncrona as aguarda juntas.
+"""
+
+import asyncio
+from decimal import Decimal
+
+from django.db.models import F, Sum
+
+from operations.models import Distribution, Order
+from transactions.models import Buy, Sell
+
+MAX_DAYS = 366
+ZERO = Decimal(0)
+
+
+def _sources():
+    # (coluna, queryset, campo de data, campo de quantidade)
+    cancelled = Order.OrderStatus.CANCELLED
+    return [
+        ('ordered', Order.objects.exclude(status=cancelled), 'delivery_date', 'quantity'),
+        (
+            'distributed',
+            Distribution.objects.exclude(order__status=cancelled),
+            'order__delivery_date',
+            'quantity',
+        ),
+        ('received', Buy.objects.all(), 'delivery_date', 'quantity_received'),
+        ('delivered', Sell.objects.all(), 'delivery_date', 'quantity_delivered'),
+    ]
+
+
+async def _per_day(queryset, date_field, quantity_field, start, end):
+    rows = (
+        queryset.filter(**{f'{date_field}__range': (start, end)})
+        .values(day=F(date_field))
+        .annotate(total=Sum(quantity_field))
+        .order_by()
+    )
+    return {row['day']: row['total'] async for row in rows}
+
+
+async def adelivery_calendar(start, end):
+    """Totais diários entre `start` e `end` (inclusive), só nos dias com movimento."""
+    sources = _sources()
+    results = await asyncio.gather(
+        *(_per_day(queryset, *fields, start, end) for _, queryset, *fields in sources)
+    )
+    columns = {name: result for (name, *_), result in zip(sources, results, strict=True)}
+    days = [
+        {'date': day, **{name: column.get(day, ZERO) for name, column in columns.items()}}
+        for day in sorted(set().union(*results))
+    ]
+    totals = {name: sum(column.values(), ZERO) for name, column in columns.items()}
+    return {'start': start, 'end': end, 'days': days, 'totals': totals}
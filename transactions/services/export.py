@@ -0,0 +1,124 @@
+"""Exportação de compras e vendas por período, em CSV ou NDJSON, sem carregar tudo.
+
+As linhas vêm de values() com os nomes das relações resolvidos no próprio SELECT e
+são lidas com iterator(chunk_size=...): a memória usada é a de um bloco, seja a
+exportação de um mês ou de vários anos. Os geradores daqui alimentam tanto o
+StreamingHttpResponse da API quanto o comando export_transactions.
+"""
+
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+from transactions.models import Buy, Sell
+
+CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# (cabeçalho, chave em values())
+BUY_COLUMNS = [
+    ('id', 'id'),
+    ('data_entrega', 'delivery_date'),
+    ('distribuicao', 'distribution_id'),
+    ('produto', 'product_name'),
+    ('cooperado', 'cooperated_name'),
+    ('quantidade_recebida', 'quantity_received'),
+    ('quantidade_excedente', 'excess_quantity'),
+    ('quantidade_faltante', 'missing_quantity'),
+    ('preco_unitario', 'unity_price'),
+    ('valor_total', 'total_value'),
+    ('balanca', 'station'),
+    ('criado_em', 'created_at'),
+]
+SELL_COLUMNS = [
+    ('id', 'id'),
+    ('data_entrega', 'delivery_date'),
+    ('pedido', 'order_id'),
+    ('cliente', 'client_name'),
+    ('produto', 'product_name'),
+    ('quantidade_pedida', 'ordered_quantity'),
+    ('quantidade_entregue', 'quantity_delivered'),
+    ('quantidade_faltante', 'missing_quantity'),
+    ('preco_unitario', 'unit_price'),
+    ('criado_em', 'created_at'),
+]
+
+
+def _period(queryset, start=None, end=None):
+    if start:
+        queryset = queryset.filter(delivery_date__gte=start)
+    if end:
+        queryset = queryset.filter(delivery_date__lte=end)
+    return queryset.order_by('delivery_date', 'pk')
+
+
+def buy_rows(start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Compras do período como dicionários; compra distribuída usa produto e
+    cooperado da oferta, avulsa os próprios campos."""
+    queryset = _period(Buy.objects.all(), start, end).annotate(
+        product_name=Coalesce(F('distribution__offer__product__name'), F('product__name')),
+        cooperated_name=Coalesce(
+            F('distribution__offer__cooperated__full_name'), F('cooperated__full_name')
+        ),
+    )
+    return queryset.values(*(key for _, key in BUY_COLUMNS)).iterator(chunk_size=chunk_size)
+
+
+def sell_rows(start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Vendas do período como dicionários, com cliente e produto do pedido."""
+    queryset = _period(Sell.objects.all(), start, end).annotate(
+        client_name=F('order__client__name'),
+        product_name=F('order__product__name'),
+        ordered_quantity=F('order__quantity'),
+        unit_price=F('order__unit_price'),
+    )
+    return queryset.values(*(key for _, key in SELL_COLUMNS)).iterator(
+        chunk_size=chunk_size
+    )
+
+
+EXPORTS = {
+    'buys': (BUY_COLUMNS, buy_rows),
+    'sells': (SELL_COLUMNS, sell_rows),
+}
+
+
+class Echo:
+    """Arquivo de mentira para o csv.writer: write() devolve a linha formatada."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(columns, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([header for header, _ in columns])
+    for row in rows:
+        yield writer.writerow([row[key] for _, key in columns])
+
+
+def render_ndjson(columns, rows):
+    for row in rows:
+        yield (
+            json.dumps(
+                {header: row[key] for header, key in columns},
+                cls=DjangoJSONEncoder,
+                ensure_ascii=False,
+            )
+            + '\n'
+        )
+
+
+RENDERERS = {
+    'csv': render_csv,
+    'ndjson': render_ndjson,
+}
+
+
+def export(kind, output='csv', start=None, end=None, chunk_size=CHUNK_SIZE):
+    """Gerador das linhas formatadas de `kind` ('buys' ou 'sells') no período."""
+    columns, rows = EXPORTS[kind]
+    return RENDERERS[output](columns, rows(start, end, chunk_size=chunk_size))
@@ -0,0 +1,297 @@
+"""Importação das pesagens das balanças como compras (Buy), em lotes.
+
+A entrada é NDJSON: um objeto por linha, por exemplo
+
+    {"key": "b1-000123", "distribution": 42, "quantity_received": "12.5"}
+    {"key": "b1-000124", "product": 3, "cooperated": 7, "quantity_received": "4",
+     "unity_price": "2.10", "delivery_date": "2030-01-08"}
+
+Cada lote resolve distribuições e cooperados em uma consulta cada (produtos ativos
+vêm da tabela de referência em memória, ver catalog.reference), calcula os totais
+em memória (Buy.calculate_totals) e grava tudo com um bulk_create. A chave
+`key` é única por balança: linhas com chave já gravada contam como duplicadas e não
+são gravadas de novo, então a balança pode reenviar um lote inteiro após uma falha.
+"""
+
+import json
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from functools import partial
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from catalog.reference import active_products
+from common.generations import bump
+from common.request_cache import cached_in_bulk
+from operations.models import Distribution
+from transactions.models import Buy
+from users.models import User
+
+from .dashboard import invalidate_dashboards
+
+BATCH_SIZE = 500
+KEY_MAX_LENGTH = Buy._meta.get_field('ingest_key').max_length
+# Campos calculados em Buy.calculate_totals, conferidos antes do bulk_create
+TOTAL_FIELDS = ('total_value', 'excess_quantity', 'missing_quantity')
+DECIMAL_LABELS = {
+    'quantity_received': 'A quantidade',
+    'unity_price': 'O preço unitário',
+    'total_value': 'O valor total',
+    'excess_quantity': 'A sobra',
+    'missing_quantity': 'A falta',
+}
+
+
+@dataclass
+class IngestResult:
+    created: int = 0
+    duplicates: int = 0
+    # {número da linha: [mensagens]}
+    errors: dict = field(default_factory=dict)
+
+    def merge(self, other):
+        self.created += other.created
+        self.duplicates += other.duplicates
+        self.errors.update(other.errors)
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'duplicates': self.duplicates,
+            'errors': {str(line): messages for line, messages in self.errors.items()},
+        }
+
+
+def parse_lines(lines):
+    """Gera (número da linha, objeto ou None, erro) ignorando linhas em branco."""
+    for number, line in enumerate(lines, start=1):
+        try:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            line = line.strip()
+            if not line:
+                continue
+            data = json.loads(line)
+        except (UnicodeDecodeError, ValueError):
+            yield number, None, 'Linha não é um JSON válido.'
+            continue
+        if not isinstance(data, dict):
+            yield number, None, 'Cada linha deve ser um objeto JSON.'
+        else:
+            yield number, data, None
+
+
+def _decimal(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        value = Decimal(str(value))
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() else None
+
+
+def _bounds_errors(values):
+    """Mensagens para os valores {campo: valor} que não cabem nos DecimalField de Buy.
+
+    Usa os validadores do próprio campo (max_digits/decimal_places): um valor como
+    "1e30" passa pelo Decimal, mas quebraria a leitura no SQLite e o lote inteiro no
+    Postgres.
+    """
+    errors = []
+    for name, value in values.items():
+        model_field = Buy._meta.get_field(name)
+        try:
+            model_field.run_validators(value)
+        except DjangoValidationError:
+            integers = model_field.max_digits - model_field.decimal_places
+            errors.append(
+                f'{DECIMAL_LABELS[name]} deve ter no máximo {integers} dígitos inteiros '
+                f'e {model_field.decimal_places} casas decimais.'
+            )
+    return errors
+
+
+def _totals_errors(buy):
+    """Confere os totais calculados, arredondados como o banco os gravaria."""
+    for name in TOTAL_FIELDS:
+        places = Buy._meta.get_field(name).decimal_places
+        setattr(buy, name, getattr(buy, name).quantize(Decimal(1).scaleb(-places)))
+    return _bounds_errors({name: getattr(buy, name) for name in TOTAL_FIELDS})
+
+
+def _id(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def _build(data, station, today):
+    """Monta a compra da linha (sem consultas) e as mensagens de erro de formato."""
+    errors = []
+    key = data.get('key')
+    if not isinstance(key, str) or not key.strip():
+        errors.append('Informe a chave da pesagem (key).')
+    elif len(key) > KEY_MAX_LENGTH:
+        errors.append(f'A chave deve ter no máximo {KEY_MAX_LENGTH} caracteres.')
+
+    quantity = _decimal(data.get('quantity_received'))
+    if quantity is None or quantity <= 0:
+        errors.append('A quantidade deve ser maior que zero.')
+    else:
+        errors.extend(_bounds_errors({'quantity_received': quantity}))
+    price = None
+    if data.get('unity_price') is not None:
+        price = _decimal(data['unity_price'])
+        if price is None or price < 0:
+            errors.append('Preço unitário inválido.')
+        else:
+            errors.extend(_bounds_errors({'unity_price': price}))
+
+    delivery_date = today
+    if data.get('delivery_date') is not None:
+        try:
+            delivery_date = parse_date(str(data['delivery_date']))
+        except ValueError:
+            delivery_date = None
+        if delivery_date is None:
+            errors.append('Data de entrega inválida (use AAAA-MM-DD).')
+
+    distribution_id = _id(data.get('distribution'))
+    product_id = _id(data.get('product'))
+    cooperated_id = _id(data.get('cooperated'))
+    if data.get('distribution') is not None and distribution_id is None:
+        errors.append('Distribuição inválida.')
+    if distribution_id is None and (product_id is None or cooperated_id is None):
+        errors.append('Para compra avulsa,Product e Cooperated devem ser preenchidos.')
+
+    buy = Buy(
+        distribution_id=distribution_id,
+        product_id=None if distribution_id else product_id,
+        cooperated_id=None if distribution_id else cooperated_id,
+        quantity_received=quantity,
+        unity_price=price,
+        delivery_date=delivery_date,
+        station=station,
+        ingest_key=key.strip() if isinstance(key, str) else None,
+    )
+    return buy, errors
+
+
+def ingest_batch(rows, station, user=None, retry=True):
+    """Grava um lote de linhas já lidas [(número, objeto ou None, erro), ...].
+
+    Linhas válidas são gravadas mesmo que outras do lote tenham erro; as inválidas
+    voltam em IngestResult.errors pelo número da linha.
+    """
+    result = IngestResult()
+    today = timezone.localdate()
+    pending = []
+    for number, data, error in rows:
+        if error:
+            result.errors[number] = [error]
+            continue
+        buy, errors = _build(data, station, today)
+        if errors:
+            result.errors[number] = errors
+        else:
+            pending.append((number, buy))
+
+    keys = {buy.ingest_key for _, buy in pending}
+    existing = set(
+        Buy.objects.filter(station=station, ingest_key__in=keys).values_list(
+            'ingest_key', flat=True
+        )
+    )
+    distributions = Distribution.objects.select_related('offer__product').in_bulk(
+        {buy.distribution_id for _, buy in pending if buy.distribution_id}
+    )
+    products = active_products.in_bulk(
+        {buy.product_id for _, buy in pending if buy.product_id}
+    )
+    cooperated = cached_in_bulk(
+        User.cooperated, {buy.cooperated_id for _, buy in pending if buy.cooperated_id}
+    )
+
+    buys = []
+    for number, buy in pending:
+        if buy.ingest_key in existing:
+            # Reenvio (ou chave repetida no próprio lote): a primeira pesagem vale
+            result.duplicates += 1
+            continue
+        if buy.distribution_id:
+            distribution = distributions.get(buy.distribution_id)
+            if distribution is None:
+                result.errors[number] = ['Distribuição inexistente.']
+                continue
+            buy.distribution = distribution
+            product = distribution.offer.product
+        else:
+            product = products.get(buy.product_id)
+            errors = []
+            if product is None:
+                errors.append('Produto inexistente ou inativo.')
+            if buy.cooperated_id not in cooperated:
+                errors.append('Cooperado inexistente ou inativo.')
+            if errors:
+                result.errors[number] = errors
+                continue
+            buy.product = product
+            buy.cooperated = cooperated[buy.cooperated_id]
+        if buy.unity_price is None:
+            buy.unity_price = product.default_purchase_value
+        buy.calculate_totals()
+        errors = _totals_errors(buy)
+        if errors:
+            result.errors[number] = errors
+            continue
+        buy.created_by = user
+        existing.add(buy.ingest_key)
+        buys.append(buy)
+
+    try:
+        with transaction.atomic():
+            Buy.objects.bulk_create(buys, batch_size=BATCH_SIZE)
+            # bulk_create não envia post_save: o painel dos cooperados e as respostas
+            # em cache das compras são descartados aqui
+            bump(Buy)
+            owners = {
+                buy.distribution.offer.cooperated_id
+                if buy.distribution_id
+                else buy.cooperated_id
+                for buy in buys
+            }
+            transaction.on_commit(partial(invalidate_dashboards, owners))
+    except IntegrityError:
+        # Outro envio gravou alguma das chaves ao mesmo tempo: refaz o lote, que agora
+        # encontra essas chaves como duplicadas
+        if not retry:
+            raise
+        return ingest_batch(rows, station, user, retry=False)
+    result.created = len(buys)
+    return result
+
+
+def ingest_weighings(lines, station, user=None, batch_size=BATCH_SIZE):
+    """Lê as linhas NDJSON em lotes de `batch_size` e grava cada lote.
+
+    Apenas um lote fica em memória por vez; cada lote é gravado em sua própria
+    transação.
+    """
+    result = IngestResult()
+    batch = []
+    for row in parse_lines(lines):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            result.merge(ingest_batch(batch, station, user))
+            batch = []
+    if batch:
+        result.merge(ingest_batch(batch, station, user))
+    return result
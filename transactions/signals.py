@@ -0,0 +1,64 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from common.generations import track_generations
+from operations.models import Distribution, Offer, Order
+from operations.signals import distributions_changed, offers_changed
+
+from .models import Buy, Sell
+from .services.dashboard import invalidate_dashboards
+
+
+def _invalidate_on_commit(user_ids):
+    # Depois do commit: antes dele, outra requisição poderia guardar o valor antigo
+    transaction.on_commit(partial(invalidate_dashboards, user_ids))
+
+
+def invalidate_offer_dashboards(sender, offer_ids=None, **kwargs):
+    if offer_ids is None:
+        invalidate_dashboards()
+        return
+    invalidate_dashboards(
+        Offer.objects.filter(pk__in=offer_ids).values_list('cooperated_id', flat=True)
+    )
+
+
+def invalidate_offer_owner(sender, instance, **kwargs):
+    _invalidate_on_commit([instance.cooperated_id])
+
+
+def invalidate_order_dashboards(sender, instance, **kwargs):
+    # Data de entrega ou status do pedido mudam as entregas previstas dos cooperados
+    _invalidate_on_commit(
+        list(
+            Distribution.objects.filter(order_id=instance.pk).values_list(
+                'offer__cooperated_id', flat=True
+            )
+        )
+    )
+
+
+def invalidate_buy_owner(sender, instance, **kwargs):
+    if instance.distribution_id:
+        user_id = instance.distribution.offer.cooperated_id
+    else:
+        user_id = instance.cooperated_id
+    _invalidate_on_commit([user_id])
+
+
+# Os sinais das operações já são enviados após o commit
+distributions_changed.connect(
+    invalidate_offer_dashboards, dispatch_uid='dashboard_distributions_changed'
+)
+offers_changed.connect(invalidate_offer_dashboards, dispatch_uid='dashboard_offers_changed')
+post_save.connect(
+    invalidate_order_dashboards, sender=Order, dispatch_uid='dashboard_order_save'
+)
+for name, signal in (('save', post_save), ('delete', post_delete)):
+    signal.connect(
+        invalidate_offer_owner, sender=Offer, dispatch_uid=f'dashboard_offer_{name}'
+    )
+    signal.connect(invalidate_buy_owner, sender=Buy, dispatch_uid=f'dashboard_buy_{name}')
+track_generations(Buy, Sell)
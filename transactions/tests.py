@@ -1,3 +1,314 @@
-from django.test import TestCase
+import base64
+import json
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from catalog.models import Client, Product
+from coopapp.test_runner import LOCAL_CACHES
+from operations.models import Distribution, Offer, Order
+from users.models import User
+
+from .models import Buy, Sell
+from .services.dashboard import _user_generation_key
+
+
+def basic_auth(username, password):
+    credentials = base64.b64encode(f'{username}:{password}'.encode()).decode()
+    return {'Authorization': f'Basic {credentials}'}
+
+
+class BuyTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_admin_user('admin', 'admin@example.com', 'Admin')
+        cls.product = Product.objects.create(
+            name='Alface', production_time=1, default_purchase_value=2, shelf_life=5
+        )
+        cls.client_record = Client.objects.create(name='Escola')
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def create_buys(self, count):
+        for _ in range(count):
+            cooperated = User.objects.create_user(
+                f'coop{User.objects.count()}', full_name='Cooperado'
+            )
+            order = Order.objects.create(
+                client=self.client_record,
+                product=self.product,
+                quantity=10,
+                unit_price=3,
+                total_value=30,
+                delivery_date=date(2030, 1, 5),
+            )
+            offer = Offer.objects.create(
+                product=self.product,
+                cooperated=cooperated,
+                quantity=20,
+                start_date=date(2030, 1, 1),
+                end_date=date(2030, 1, 10),
+            )
+            distribution = Distribution.objects.create(order=order, offer=offer, quantity=4)
+            Buy.objects.create(
+                distribution=distribution,
+                quantity_received=4,
+                unity_price=2,
+                total_value=8,
+                delivery_date=date(2030, 1, 5),
+            )
+            Buy.objects.create(
+                product=self.product,
+                cooperated=cooperated,
+                quantity_received=1,
+                unity_price=2,
+                total_value=2,
+                delivery_date=date(2030, 1, 6),
+            )
+
+
+class BuyApiTests(BuyTestCase):
+    def test_list_costs_constant_queries_per_page(self):
+        self.create_buys(2)
+        with self.assertNumQueries(2):
+            self.api.get('/api/buys/')
+        self.create_buys(10)
+        with self.assertNumQueries(2):
+            response = self.api.get('/api/buys/?page_size=5')
+        self.assertEqual(len(response.data['results']), 5)
+        with self.assertNumQueries(2):
+            response = self.api.get(response.data['next'])
+        self.assertEqual(response.data['results'][0]['product_name'], 'Alface')
+
+    def test_cooperated_sees_distributed_and_standalone_buys(self):
+        self.create_buys(3)
+        cooperated = Buy.objects.filter(cooperated__isnull=False).first().cooperated
+        self.api.force_authenticate(cooperated)
+        response = self.api.get('/api/buys/')
+        self.assertEqual(len(response.data['results']), 2)
+
+
+class BuyIngestTests(BuyTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.cooperated = User.objects.create_user('produtor', full_name='Produtor')
+        order = Order.objects.create(
+            client=cls.client_record,
+            product=cls.product,
+            quantity=10,
+            unit_price=3,
+            total_value=30,
+            delivery_date=date(2030, 1, 5),
+        )
+        offer = Offer.objects.create(
+            product=cls.product,
+            cooperated=cls.cooperated,
+            quantity=20,
+            start_date=date(2030, 1, 1),
+            end_date=date(2030, 1, 10),
+        )
+        cls.distribution = Distribution.objects.create(order=order, offer=offer, quantity=4)
+
+    def post(self, rows, station='balanca-1'):
+        body = '\n'.join(r if isinstance(r, str) else json.dumps(r) for r in rows)
+        return self.api.post(
+            f'/api/buys/ingest/?station={station}',
+            body,
+            content_type='application/x-ndjson',
+        )
+
+    def test_ingest_computes_totals_and_is_idempotent(self):
+        rows = [
+            {'key': 'k1', 'distribution': self.distribution.pk, 'quantity_received': 5},
+            {
+                'key': 'k2',
+                'product': self.product.pk,
+                'cooperated': self.cooperated.pk,
+                'quantity_received': '1.5',
+                'unity_price': '3',
+                'delivery_date': '2030-01-06',
+            },
+            {'key': 'k3', 'distribution': 9999, 'quantity_received': 1},
+            'não é json',
+        ]
+        response = self.post(rows)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(sorted(response.data['errors']), ['3', '4'])
+
+        distributed = Buy.objects.get(ingest_key='k1')
+        self.assertEqual(distributed.excess_quantity, Decimal(1))
+        # Sem preço informado, usa o valor de compra padrão do produto
+        self.assertEqual(distributed.total_value, Decimal(10))
+        self.assertEqual(Buy.objects.get(ingest_key='k2').total_value, Decimal('4.5'))
+
+        # Reenvio do lote: nada é gravado de novo; outra balança pode repetir a chave
+        retry = self.post(rows)
+        self.assertEqual((retry.data['created'], retry.data['duplicates']), (0, 2))
+        other = self.post(rows[:1], station='balanca-2')
+        self.assertEqual(other.data['created'], 1)
+        self.assertEqual(Buy.objects.count(), 3)
+
+    def test_rejects_values_beyond_the_decimal_fields(self):
+        base = {'distribution': self.distribution.pk}
+        rows = [
+            {**base, 'key': 'k1', 'quantity_received': '1e30'},
+            {**base, 'key': 'k2', 'quantity_received': '1.234'},
+            {**base, 'key': 'k3', 'quantity_received': 1, 'unity_price': '1e9'},
+            # Cada valor cabe no campo, mas o total calculado não
+            {**base, 'key': 'k4', 'quantity_received': '99999', 'unity_price': '99999'},
+            {**base, 'key': 'k5', 'quantity_received': '12345678.99'},
+        ]
+        response = self.post(rows)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(sorted(response.data['errors']), ['1', '2', '3', '4'])
+        self.assertIn('O valor total', response.data['errors']['4'][0])
+        # As compras gravadas continuam legíveis com os valores decimais
+        self.assertEqual(
+            list(Buy.objects.values_list('quantity_received', flat=True)),
+            [Decimal('12345678.99')],
+        )
+
+    def test_batch_queries_do_not_grow_with_rows(self):
+        rows = [
+            {'key': f'k{i}', 'distribution': self.distribution.pk, 'quantity_received': 4}
+            for i in range(40)
+        ]
+        # chaves existentes, distribuições e um INSERT entre SAVEPOINT/RELEASE
+        with self.assertNumQueries(5):
+            response = self.post(rows)
+        self.assertEqual(response.data['created'], 40)
+
+
+class TransactionExportTests(BuyTestCase):
+    def test_buy_export_streams_with_single_query(self):
+        self.create_buys(3)
+        response = self.api.get('/api/buys/export/?start=2030-01-06')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        with self.assertNumQueries(1):
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertIn('Cooperado', lines[1])
+
+    def test_ndjson_export_of_sells(self):
+        self.create_buys(1)
+        Sell.objects.create(
+            order=Order.objects.get(), quantity_delivered=9, delivery_date=date(2030, 1, 5)
+        )
+        response = self.api.get('/api/sells/export/?output=ndjson')
+        rows = [json.loads(line) for line in response.streaming_content]
+        self.assertEqual(rows[0]['cliente'], 'Escola')
+        self.assertEqual(rows[0]['quantidade_entregue'], '9.00')
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class DashboardTests(BuyTestCase):
+    def setUp(self):
+        super().setUp()
+        caches[settings.RESPONSE_CACHE_ALIAS].clear()
+        self.create_buys(1)
+        self.cooperated = Offer.objects.get().cooperated
+        # Views assíncronas autenticam pela sessão
+        self.client.force_login(self.cooperated)
+
+    def test_dashboard_uses_two_queries_then_cache(self):
+        # Sessão e usuário, depois o cooperado com os agregados de ofertas e compras e
+        # as entregas previstas
+        with self.assertNumQueries(4):
+            response = self.client.get('/api/dashboard/')
+        data = response.json()
+        self.assertEqual(data['open_offers'], 1)
+        self.assertEqual(Decimal(data['remaining_quantity']), Decimal(16))
+        self.assertEqual(data['buys'], 2)
+        self.assertEqual(Decimal(data['received_value']), Decimal(10))
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get('/api/dashboard/').json(), data)
+
+    def test_distribution_change_invalidates_owner_dashboard(self):
+        self.client.get('/api/dashboard/')
+        with self.captureOnCommitCallbacks(execute=True):
+            Distribution.objects.update(quantity=6)
+        data = self.client.get('/api/dashboard/').json()
+        self.assertEqual(Decimal(data['allocated_quantity']), Decimal(6))
+        self.assertEqual(Decimal(data['upcoming'][0]['quantity']), Decimal(6))
+
+    def test_invalidation_from_another_process(self):
+        self.client.get('/api/dashboard/')
+        # Outro processo troca a geração do cooperado no cache compartilhado
+        key = _user_generation_key(self.cooperated.pk)
+        caches[settings.GENERATION_CACHE_ALIAS].set(key, 'outro-processo', None)
+        with self.assertNumQueries(4):
+            self.client.get('/api/dashboard/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/dashboard/')
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/dashboard/').status_code, 403)
+
+    def test_basic_authentication(self):
+        self.client.logout()
+        self.cooperated.set_password('segredo')
+        self.cooperated.save(update_fields=['password'])
+        response = self.client.get(
+            '/api/dashboard/', headers=basic_auth(self.cooperated.username, 'segredo')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['open_offers'], 1)
+        # Credenciais erradas falham como no resto da API
+        response = self.client.get(
+            '/api/dashboard/', headers=basic_auth(self.cooperated.username, 'errada')
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class DeliveryCalendarTests(BuyTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def test_daily_totals_from_concurrent_aggregates(self):
+        self.create_buys(2)
+        Sell.objects.create(
+            order=Order.objects.first(),
+            quantity_delivered=7,
+            delivery_date=date(2030, 1, 5),
+        )
+        # Sessão e usuário + uma consulta por coluna
+        with self.assertNumQueries(6):
+            response = self.client.get('/api/calendar/?start=2030-01-01&end=2030-01-31')
+        data = response.json()
+        self.assertEqual(
+            [day['date'] for day in data['days']], ['2030-01-05', '2030-01-06']
+        )
+        first = data['days'][0]
+        self.assertEqual(Decimal(first['ordered']), Decimal(20))
+        self.assertEqual(Decimal(first['distributed']), Decimal(8))
+        self.assertEqual(Decimal(first['received']), Decimal(8))
+        self.assertEqual(Decimal(first['delivered']), Decimal(7))
+        self.assertEqual(Decimal(data['totals']['received']), Decimal(10))
+
+    def test_validates_period_and_permission(self):
+        response = self.client.get('/api/calendar/?start=2030-01-01&end=2031-06-01')
+        self.assertEqual(response.status_code, 400)
+        self.client.force_login(User.objects.create_user('coop', full_name='Cooperado'))
+        response = self.client.get('/api/calendar/?start=2030-01-01&end=2030-01-31')
+        self.assertEqual(response.status_code, 403)
+
+    def test_basic_authentication(self):
+        self.client.logout()
+        self.admin.set_password('segredo')
+        self.admin.save(update_fields=['password'])
+        response = self.client.get(
+            '/api/calendar/?start=2030-01-01&end=2030-01-31',
+            headers=basic_auth(self.admin.username, 'segredo'),
+        )
+        self.assertEqual(response.status_code, 200)
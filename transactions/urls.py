@@ -0,0 +1,25 @@
+from django.urls import path
+from rest_framework.routers import SimpleRouter
+
+from . import views
+
+app_name = 'transactions'
+
+router = SimpleRouter()
+router.register('buys', views.BuyViewSet, basename='buy')
+
+urlpatterns = [
+    path('dashboard/', views.CooperatedDashboardView.as_view(), name='dashboard'),
+    path('calendar/', views.DeliveryCalendarView.as_view(), name='delivery-calendar'),
+    path('buys/ingest/', views.BuyIngestView.as_view(), name='buy-ingest'),
+    path(
+        'buys/export/',
+        views.TransactionExportView.as_view(kind='buys'),
+        name='buy-export',
+    ),
+    path(
+        'sells/export/',
+        views.TransactionExportView.as_view(kind='sells'),
+        name='sell-export',
+    ),
+] + router.urls
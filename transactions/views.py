@@ -1,3 +1,154 @@
-from django.shortcuts import render
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from catalog.models import Product, Unit
+from common.mixins import (
+    ConditionalGetMixin,
+    CooperatedScopeMixin,
+    QueryParamFilterMixin,
+    ResponseCacheMixin,
+    SparseFieldsMixin,
+)
+from common.views import AsyncAPIView
+from operations.models import Distribution, Offer
+from users.models import User
+from users.permissions import IsCoopAdmin
+
+from .models import Buy
+from .serializers import (
+    BuySerializer,
+    DashboardSerializer,
+    DeliveryCalendarQuerySerializer,
+    DeliveryCalendarSerializer,
+    ExportQuerySerializer,
+)
+from .services import export, ingest_weighings
+from .services.dashboard import aget_dashboard
+from .services.delivery_calendar import adelivery_calendar
+
+
+class BuyViewSet(
+    ResponseCacheMixin,
+    ConditionalGetMixin,
+    CooperatedScopeMixin,
+    QueryParamFilterMixin,
+    SparseFieldsMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    serializer_class = BuySerializer
+    queryset = Buy.objects.select_related(
+        'product',
+        'cooperated',
+        'distribution__offer__product',
+        'distribution__offer__cooperated',
+    ).order_by('-created_at', '-pk')
+    filter_params = {
+        'distribution': 'distribution_id',
+        'delivery_date': 'delivery_date',
+    }
+    cache_models = (Buy, Distribution, Offer, Product, Unit, User)
+
+    def scope_queryset(self, queryset, user):
+        # Compras distribuídas pertencem ao cooperado da oferta; avulsas, ao campo
+        return queryset.filter(Q(distribution__offer__cooperated=user) | Q(cooperated=user))
+
+
+class BuyIngestView(APIView):
+    """
+    Recebe as pesagens de uma balança em NDJSON (um objeto por linha).
+
+    POST /api/buys/ingest/?station=balanca-1  (Content-Type: application/x-ndjson)
+    O corpo é lido linha a linha e gravado em lotes; reenviar as mesmas chaves é seguro.
+    Retorna {"created": n, "duplicates": n, "errors": {"<linha>": ["..."]}}.
+    """
+
+    permission_classes = [IsCoopAdmin]
+    station_max_length = Buy._meta.get_field('station').max_length
+
+    def post(self, request):
+        station = request.query_params.get('station', '').strip()
+        if not station or len(station) > self.station_max_length:
+            raise ValidationError({'station': 'Informe a balança (station).'})
+        # request.stream não carrega o corpo inteiro na memória, ao contrário de .data
+        result = ingest_weighings(request.stream or (), station, user=request.user)
+        return Response(result.as_dict())
+
+
+class TransactionExportView(APIView):
+    """
+    Exportação de compras ou vendas por período, gerada enquanto é enviada.
+
+    GET /api/buys/export/?start=2024-01-01&end=2024-12-31&output=csv
+    GET /api/sells/export/?output=ndjson
+    """
+
+    permission_classes = [IsCoopAdmin]
+    kind = None
+    content_types = {
+        'csv': 'text/csv; charset=utf-8',
+        'ndjson': 'application/x-ndjson; charset=utf-8',
+    }
+
+    def get(self, request):
+        serializer = ExportQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        output = data['output']
+        period = (
+            '_'.join(str(data[name]) for name in ('start', 'end') if data.get(name))
+            or 'completo'
+        )
+        response = StreamingHttpResponse(
+            export(self.kind, output, data.get('start'), data.get('end')),
+            content_type=self.content_types[output],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.kind}_{period}.{output}"'
+        )
+        return response
+
+
+class CooperatedDashboardView(AsyncAPIView):
+    """
+    Painel do cooperado logado: ofertas abertas, quantidade distribuída e restante,
+    próximas entregas e totais recebidos das compras.
+
+    GET /api/dashboard/ (administradores podem informar ?cooperated=<id>)
+    """
+
+    async def get(self, request):
+        user = request.user
+        user_id = user.pk
+        cooperated = request.GET.get('cooperated')
+        if cooperated and (user.is_admin or user.is_superuser):
+            if not cooperated.isdigit():
+                return self.error(400, {'cooperated': ['Informe o id do cooperado.']})
+            user_id = int(cooperated)
+        data = await aget_dashboard(
+            user_id, serialize=lambda data: DashboardSerializer(data).data
+        )
+        if data is None:
+            return self.error(404, 'Cooperado inexistente.')
+        return self.respond(data)
+
+
+class DeliveryCalendarView(AsyncAPIView):
+    """
+    Calendário de entregas: por dia, quantidades pedidas, distribuídas, recebidas
+    dos cooperados e entregues aos clientes.
+
+    GET /api/calendar/?start=2030-01-01&end=2030-01-31 (até 366 dias)
+    """
+
+    permission_classes = [IsCoopAdmin]
+
+    async def get(self, request):
+        serializer = DeliveryCalendarQuerySerializer(data=request.GET)
+        if not serializer.is_valid():
+            return self.error(400, serializer.errors)
+        data = await adelivery_calendar(**serializer.validated_data)
+        return self.respond(DeliveryCalendarSerializer(data).data)
@@ -1,5 +1,8 @@
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
+from common.admin import reference_filter
+from common.reference import regions
+
 from .forms import CustomUserChangeForm, CustomUserCreationForm
 from .models import User
 
@@ -35,7 +38,7 @@ class UserAdmin(BaseUserAdmin):
         'is_superuser',
         'is_admin',
         'is_cooperated',
-        'region',
+        ('region', reference_filter(regions)),
         'date_joined',
     )
 
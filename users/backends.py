@@ -0,0 +1,123 @@
+"""Backend de autenticação com as permissões em cache entre requisições e processos.
+
+O ModelBackend guarda as permissões só na instância do usuário, ou seja, uma vez
+por requisição. Aqui o conjunto de permissões de cada usuário fica no cache
+compartilhado (settings.PERMISSION_CACHE_ALIAS), sob uma chave com a versão global
+das permissões: mudar as permissões de um grupo ou remover um grupo/permissão troca
+a versão; mudar os grupos, as permissões ou o cadastro de um usuário apaga só a
+chave dele (ver users/signals.py).
+
+Permissões por objeto seguem a região: um administrador regional (usuário com
+região) tem as permissões dos seus grupos apenas sobre objetos da própria região.
+Usuários sem região e superusuários valem para a cooperativa inteira. Modelos de
+toda a cooperativa (COOPERATIVE_MODELS) não são restritos por região; nos demais
+sem caminho em REGION_PATHS o administrador regional não tem permissão por objeto.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = getattr(settings, 'PERMISSION_CACHE_ALIAS', 'default')
+CACHE_TIMEOUT = getattr(settings, 'PERMISSION_CACHE_TIMEOUT', 3600)
+_VERSION_KEY = 'permissions:version'
+
+# Atributos até o id da região de cada modelo (app_label.model_name); com mais de
+# um caminho, vale o primeiro cujo primeiro atributo está preenchido (a compra avulsa
+# não tem distribuição, só o cooperado)
+REGION_PATHS = {
+    'users.user': ('region_id',),
+    'catalog.client': ('region_id',),
+    'operations.order': ('client.region_id',),
+    'operations.offer': ('cooperated.region_id',),
+    'operations.distribution': ('order.client.region_id',),
+    'transactions.sell': ('order.client.region_id',),
+    'transactions.buy': ('distribution.order.client.region_id', 'cooperated.region_id'),
+}
+# Cadastros da cooperativa inteira, sem região
+COOPERATIVE_MODELS = {
+    'catalog.product',
+    'common.macroregion',
+    'common.region',
+    'common.macroregionaffinity',
+}
+
+
+def _version():
+    return caches[CACHE_ALIAS].get_or_set(_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def _cache_key(user_id, version):
+    return f'permissions:{version}:{user_id}'
+
+
+def invalidate_user_permissions(user_ids):
+    """Descarta as permissões em cache dos usuários informados."""
+    user_ids = [pk for pk in user_ids if pk is not None]
+
+    def delete():
+        version = _version()
+        caches[CACHE_ALIAS].delete_many([_cache_key(pk, version) for pk in user_ids])
+
+    # Agora e de novo no commit: antes dele, outro processo pode ter lido o valor antigo
+    delete()
+    transaction.on_commit(delete)
+
+
+def invalidate_all_permissions():
+    """Troca a versão: as permissões em cache de todos os usuários deixam de valer."""
+
+    def bump():
+        caches[CACHE_ALIAS].set(_VERSION_KEY, uuid.uuid4().hex, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def object_region_id(obj):
+    """Id da região do objeto pelo primeiro caminho preenchido; None se não tem."""
+    for path in REGION_PATHS.get(obj._meta.label_lower, ()):
+        first, *rest = path.split('.')
+        value = getattr(obj, first, None)
+        if value is None:
+            continue
+        for attr in rest:
+            value = getattr(value, attr, None)
+            if value is None:
+                break
+        return value
+    return None
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend com permissões em cache e permissões por objeto por região."""
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if obj is not None:
+            return self.get_object_permissions(user_obj, obj)
+        if not user_obj.is_active or user_obj.is_anonymous:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            cache = caches[CACHE_ALIAS]
+            key = _cache_key(user_obj.pk, _version())
+            permissions = cache.get(key)
+            if permissions is None:
+                permissions = super().get_all_permissions(user_obj)
+                cache.set(key, permissions, CACHE_TIMEOUT)
+            user_obj._perm_cache = permissions
+        return user_obj._perm_cache
+
+    def get_object_permissions(self, user_obj, obj):
+        """As permissões globais do usuário, se `obj` está ao alcance da sua região."""
+        if user_obj.is_superuser or getattr(user_obj, 'region_id', None) is None:
+            return self.get_all_permissions(user_obj)
+        label = obj._meta.label_lower
+        if label in COOPERATIVE_MODELS:
+            return self.get_all_permissions(user_obj)
+        # Modelo sem caminho até a região: nega em vez de liberar tudo
+        if label in REGION_PATHS and object_region_id(obj) == user_obj.region_id:
+            return self.get_all_permissions(user_obj)
+        return set()
@@ -0,0 +1,11 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsCoopAdmin(BasePermission):
+    """Permite acesso apenas a administradores da cooperativa (ou superusuários)."""
+
+    message = 'Apenas administradores podem executar esta ação.'
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_admin or user.is_superuser))
@@ -0,0 +1,12 @@
+from rest_framework import serializers
+
+from .models import User
+
+
+class CooperatedSummarySerializer(serializers.ModelSerializer):
+    """Representação curta usada em ?expand=cooperated."""
+
+    class Meta:
+        model = User
+        fields = ['id', 'full_name']
+        read_only_fields = fields
@@ -0,0 +1,58 @@
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from common.generations import track_generations
+
+from .backends import invalidate_all_permissions, invalidate_user_permissions
+from .models import User
+
+
+def user_relations_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # User.groups e User.user_permissions, pelos dois lados da relação
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_user_permissions([instance.pk])
+    elif pk_set:
+        invalidate_user_permissions(pk_set)
+    else:
+        invalidate_all_permissions()
+
+
+def group_permissions_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate_all_permissions()
+
+
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # O login só atualiza last_login, que não afeta as permissões
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_user_permissions([instance.pk])
+
+
+def permissions_removed(sender, **kwargs):
+    invalidate_all_permissions()
+
+
+for through in (User.groups.through, User.user_permissions.through):
+    m2m_changed.connect(
+        user_relations_changed,
+        sender=through,
+        dispatch_uid=f'permissions_m2m_{through.__name__}',
+    )
+m2m_changed.connect(
+    group_permissions_changed,
+    sender=Group.permissions.through,
+    dispatch_uid='permissions_group_permissions',
+)
+post_save.connect(user_changed, sender=User, dispatch_uid='permissions_user_save')
+post_delete.connect(user_changed, sender=User, dispatch_uid='permissions_user_delete')
+for model in (Group, Permission):
+    post_delete.connect(
+        permissions_removed,
+        sender=model,
+        dispatch_uid=f'permissions_delete_{model.__name__}',
+    )
+# O nome do cooperado aparece nas ofertas, distribuições e compras
+track_generations(User, ignore_fields={'last_login'})
@@ -1,3 +1,94 @@
-from django.test import TestCase
+from datetime import date
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from catalog.models import Client, Product
+from common.models import Region
+from coopapp.test_runner import LOCAL_CACHES
+from jobs.models import Job
+from operations.models import Distribution, Offer, Order
+from transactions.models import Buy
+
+from .models import User
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class PermissionCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.north = Region.objects.create(name='Norte')
+        cls.south = Region.objects.create(name='Sul')
+        cls.regional = User.objects.create_user(
+            'regional', full_name='Regional', region=cls.north
+        )
+        cls.group = Group.objects.create(name='Pedidos')
+        cls.group.permissions.add(
+            *Permission.objects.filter(
+                codename__in=['change_order', 'change_distribution', 'change_buy']
+            )
+        )
+        cls.regional.groups.add(cls.group)
+        cls.product = Product.objects.create(
+            name='Alface', production_time=1, default_purchase_value=2, shelf_life=5
+        )
+        cls.cooperated = User.objects.create_user(
+            'produtor', full_name='Produtor', region=cls.south
+        )
+        cls.order = Order.objects.create(
+            client=Client.objects.create(name='Escola', region=cls.north),
+            product=cls.product,
+            quantity=10,
+            unit_price=3,
+            total_value=30,
+            delivery_date=date(2030, 1, 5),
+        )
+        offer = Offer.objects.create(
+            product=cls.product,
+            cooperated=cls.cooperated,
+            quantity=20,
+            start_date=date(2030, 1, 1),
+            end_date=date(2030, 1, 10),
+        )
+        cls.distribution = Distribution.objects.create(
+            order=cls.order, offer=offer, quantity=4
+        )
+
+    def setUp(self):
+        # O rollback de cada teste desfaz as linhas, e os ids se repetem, mas não as
+        # permissões guardadas no cache em memória
+        caches[settings.PERMISSION_CACHE_ALIAS].clear()
+
+    def user(self):
+        # Nova instância, como em outra requisição
+        return User.objects.get(pk=self.regional.pk)
+
+    def test_cached_permissions_and_region_scope(self):
+        user = self.user()
+        self.assertTrue(user.has_perm('operations.change_order', self.order))
+        self.order.client = Client.objects.create(name='Feira', region=self.south)
+        self.assertFalse(user.has_perm('operations.change_order', self.order))
+        # Permissões vêm do cache
+        user = self.user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm('operations.change_order'))
+
+        self.group.permissions.clear()
+        self.assertFalse(self.user().has_perm('operations.change_order'))
+
+    def test_distribution_and_buy_follow_the_order_region(self):
+        user = self.user()
+        self.assertTrue(user.has_perm('operations.change_distribution', self.distribution))
+        distributed = Buy(distribution=self.distribution, quantity_received=4)
+        self.assertTrue(user.has_perm('transactions.change_buy', distributed))
+        # Compra avulsa: região do cooperado
+        standalone = Buy(product=self.product, cooperated=self.cooperated)
+        self.assertFalse(user.has_perm('transactions.change_buy', standalone))
+
+    def test_unmapped_models_are_denied_to_regional_admins(self):
+        user = self.user()
+        self.assertTrue(user.has_perm('operations.change_order'))
+        self.assertFalse(user.has_perm('operations.change_order', Job()))
+        self.assertTrue(user.has_perm('operations.change_order', self.product))